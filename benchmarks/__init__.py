@@ -0,0 +1,3 @@
+"""
+Benchmarks for aio-rak-net. Run a benchmark from the repository root with ``python -m benchmarks.<name>``
+"""
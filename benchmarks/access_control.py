@@ -0,0 +1,73 @@
+"""
+Benchmark for :class:`rak_net.AccessControl` lookups with a large number of prefixes.
+
+Usage: ``python -m benchmarks.access_control [--prefixes 100000] [--lookups 200000]``
+"""
+from __future__ import annotations
+import argparse
+import random
+from ipaddress import IPv4Address, IPv6Address, ip_network
+from time import perf_counter
+from rak_net import AccessControl
+
+
+def random_networks(count: int, rng: random.Random) -> list[str]:
+    # Random addresses collide once masked to short prefixes, so networks are drawn until enough distinct ones are found
+    networks: dict[str, None] = {}
+    while len(networks) < count:
+        if rng.random() < 0.8:
+            network: str = f"{IPv4Address(rng.getrandbits(32))}/{rng.randint(8, 32)}"
+        else:
+            network = f"{IPv6Address(rng.getrandbits(128))}/{rng.randint(16, 128)}"
+        networks[str(ip_network(network, strict=False))] = None
+    return list(networks)
+
+
+def random_hostnames(count: int, rng: random.Random) -> list[str]:
+    return [
+        str(IPv4Address(rng.getrandbits(32))) if rng.random() < 0.8 else str(IPv6Address(rng.getrandbits(128)))
+        for _ in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--prefixes', type=int, default=100_000)
+    parser.add_argument('--lookups', type=int, default=200_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    networks: list[str] = random_networks(args.prefixes, rng)
+    access_control = AccessControl()
+    start: float = perf_counter()
+    for index, network in enumerate(networks):
+        if index % 10:
+            access_control.ban(network)
+        else:
+            access_control.ban(network, 3600)
+    insert_time: float = perf_counter() - start
+    print(f"inserted {len(access_control)} prefixes in {insert_time:.3f}s "
+          f"({insert_time / args.prefixes * 1e6:.2f} us/prefix)")
+
+    hostnames: list[str] = random_hostnames(args.lookups, rng)
+    # Hosts guaranteed to hit a banned prefix
+    hostnames[::4] = [network.split('/')[0] for network in networks[:len(hostnames[::4])]]
+    is_allowed = access_control.is_allowed
+    start = perf_counter()
+    banned: int = 0
+    for hostname in hostnames:
+        if not is_allowed(hostname):
+            banned += 1
+    lookup_time: float = perf_counter() - start
+    print(f"{args.lookups} lookups ({banned} banned) in {lookup_time:.3f}s "
+          f"({lookup_time / args.lookups * 1e6:.2f} us/lookup, {args.lookups / lookup_time:,.0f} lookups/s)")
+
+    start = perf_counter()
+    for network in networks[:10_000]:
+        access_control.remove(network)
+    print(f"removed 10000 prefixes in {perf_counter() - start:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark for :meth:`rak_net.Server.broadcast` against queueing a fresh frame for every connection.
+
+Usage: ``python -m benchmarks.broadcast [--connections 1000] [--size 300] [--rounds 50]``
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+from time import perf_counter
+from rak_net import Server, Connection
+from rak_net.frame import Frame
+from rak_net.utils import InternetAddress
+
+
+def create_connections(server: Server, count: int) -> list[Connection]:
+    connections: list[Connection] = []
+    for index in range(count):
+        address = InternetAddress('127.0.0.1', 20000 + index)
+        connection = Connection(address, 1400, server)
+        connection.connected = True
+        server.connections[address.token] = connection
+        connections.append(connection)
+    return connections
+
+
+async def per_connection(server: Server, connections: list[Connection], payload: bytes, reliability: int) -> None:
+    for connection in connections:
+        await connection.add_to_queue(Frame(reliability=reliability, body=bytes(bytearray(payload))))
+
+
+async def broadcast(server: Server, connections: list[Connection], payload: bytes, reliability: int) -> None:
+    await server.broadcast(payload, connections, reliability=reliability)
+
+
+async def measure(method, count: int, size: int, rounds: int, reliability: int) -> tuple[float, float]:
+    server = Server(10, '127.0.0.1', 0)
+    connections: list[Connection] = create_connections(server, count)
+    payload: bytes = bytes(range(256)) * (size // 256) + bytes(size % 256)
+    queue_time: float = 0
+    flush_time: float = 0
+    for _ in range(rounds):
+        start: float = perf_counter()
+        await method(server, connections, payload, reliability)
+        queue_time += perf_counter() - start
+        start = perf_counter()
+        for connection in connections:
+            await connection.send_queue()
+        flush_time += perf_counter() - start
+        # Let the socket send loop drain between rounds
+        await asyncio.sleep(0)
+    await server.socket.close()
+    return queue_time / rounds, flush_time / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--size', type=int, nargs='+', default=[300, 4000])
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--reliability', type=int, default=3)
+    args = parser.parse_args()
+    for size in args.size:
+        for name, method in (('per-connection', per_connection), ('broadcast', broadcast)):
+            queue_time, flush_time = asyncio.run(measure(method, args.connections, size, args.rounds, args.reliability))
+            print(f"{size:>6} bytes x {args.connections} connections, {name:>14}: queue {queue_time * 1e3:.3f} ms "
+                  f"({queue_time / args.connections * 1e6:.2f} us/connection), flush {flush_time * 1e3:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Micro-benchmarks for encoding and decoding frames, frame sets, ACKs and the handshake packets.
+
+Covers every packet class of :mod:`rak_net.protocol.packet.protocol_packets`, frame sets of 1, 10 and 100 frames
+for every reliability, and ACKs with sparse and dense sequence numbers. Every case is timed with :mod:`timeit`
+and the best of a few repeats is kept. ``--save`` stores the results as a baseline and ``--compare`` checks
+a run against one, exiting with status 1 in case a case got slower by more than ``--threshold``.
+
+Usage: ``python -m benchmarks.codec [--filter frame_set] [--repeat 5] [--save base.json] [--compare base.json] [--threshold 0.1]``
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+import timeit
+from typing import Callable
+from rak_net.frame import Frame
+from rak_net.protocol import ProtocolInfo
+from rak_net.protocol.packet import protocol_packets
+from rak_net.utils import InternetAddress
+
+ADDRESS: InternetAddress = InternetAddress('192.168.1.20', 19132)
+GUID: int = 0x1234_5678_9abc_def0
+# Field values of every packet class, Acknowledgement is covered by Ack and Nack
+PACKETS: dict[type, dict] = {
+    protocol_packets.Ack: {'sequence_numbers': list(range(0, 64, 2))},
+    protocol_packets.Nack: {'sequence_numbers': list(range(0, 64, 2))},
+    protocol_packets.ConnectionRequest: {'client_guid': GUID, 'request_timestamp': 123456},
+    protocol_packets.ConnectionRequestAccepted: {
+        'client_address': ADDRESS, 'system_index': 0, 'system_addresses': [InternetAddress('255.255.255.255', 19132)] * 20,
+        'request_timestamp': 123456, 'accepted_timestamp': 123457,
+    },
+    protocol_packets.Disconnect: {},
+    protocol_packets.FrameSet: {'sequence_number': 1000, 'frames': [Frame(reliability=3, body=bytes(100)) for _ in range(10)]},
+    protocol_packets.IncompatibleProtocolVersion: {'protocol_version': 10, 'magic': ProtocolInfo.MAGIC, 'server_guid': GUID},
+    protocol_packets.NewIncomingConnection: {
+        'server_address': ADDRESS, 'system_addresses': [InternetAddress('255.255.255.255', 19132)] * 20,
+        'request_timestamp': 123456, 'accepted_timestamp': 123457,
+    },
+    protocol_packets.OfflinePing: {'client_timestamp': 123456, 'magic': ProtocolInfo.MAGIC, 'client_guid': GUID},
+    protocol_packets.OfflinePong: {
+        'client_timestamp': 123456, 'server_guid': GUID, 'magic': ProtocolInfo.MAGIC,
+        'server_name': 'MCPE;Dedicated Server;527;1.19.1;0;10;13253860892328930865;Bedrock level;Survival;1;19132;19133;',
+    },
+    protocol_packets.OnlinePing: {'client_timestamp': 123456},
+    protocol_packets.OnlinePong: {'client_timestamp': 123456, 'server_timestamp': 123457},
+    protocol_packets.OpenConnectionReply1: {'magic': ProtocolInfo.MAGIC, 'server_guid': GUID, 'use_security': False, 'mtu_size': 1400},
+    protocol_packets.OpenConnectionReply2: {
+        'magic': ProtocolInfo.MAGIC, 'server_guid': GUID, 'client_address': ADDRESS, 'mtu_size': 1400, 'use_encryption': False,
+    },
+    protocol_packets.OpenConnectionRequest1: {'magic': ProtocolInfo.MAGIC, 'protocol_version': 10, 'mtu_size': 1400},
+    protocol_packets.OpenConnectionRequest2: {'magic': ProtocolInfo.MAGIC, 'server_address': ADDRESS, 'mtu_size': 1400, 'client_guid': GUID},
+}
+RELIABILITIES: dict[int, str] = {
+    0: 'unreliable', 1: 'unreliable_sequenced', 2: 'reliable', 3: 'reliable_ordered', 4: 'reliable_sequenced',
+}
+
+
+def create_packet(cls: type, fields: dict):
+    packet = cls()
+    for name, value in fields.items():
+        setattr(packet, name, list(value) if isinstance(value, list) else value)
+    return packet
+
+
+def encode_case(cls: type, fields: dict) -> Callable[[], None]:
+    def encode() -> None:
+        create_packet(cls, fields).encode()
+    return encode
+
+
+def decode_case(cls: type, data: bytes) -> Callable[[], None]:
+    def decode() -> None:
+        cls(data).decode()
+    return decode
+
+
+def create_frames(count: int, reliability: int, size: int = 32) -> list[Frame]:
+    return [
+        Frame(reliability=reliability, reliable_frame_index=index, sequenced_frame_index=index,
+              ordered_frame_index=index, body=bytes(size))
+        for index in range(count)
+    ]
+
+
+def collect_cases() -> dict[str, Callable[[], None]]:
+    """
+    :return: Callables to time, by name
+    """
+    missing: set[str] = {name for name in protocol_packets.__all__ if name != 'Acknowledgement'} - {cls.__name__ for cls in PACKETS}
+    if missing:
+        raise RuntimeError(f"Packet classes without benchmark fields: {', '.join(sorted(missing))}")
+    cases: dict[str, Callable[[], None]] = {}
+    for cls, fields in PACKETS.items():
+        packet = create_packet(cls, fields)
+        packet.encode()
+        cases[f'packet.{cls.__name__}.encode'] = encode_case(cls, fields)
+        cases[f'packet.{cls.__name__}.decode'] = decode_case(cls, bytes(packet.data))
+    for reliability, name in RELIABILITIES.items():
+        frame: Frame = create_frames(1, reliability)[0]
+        frame.encode()
+        cases[f'frame.{name}.encode'] = lambda reliability=reliability: create_frames(1, reliability)[0].encode()
+        cases[f'frame.{name}.decode'] = lambda data=bytes(frame.data): Frame(data).decode()
+        for count in (1, 10, 100):
+            fields: dict = {'sequence_number': 1000, 'frames': create_frames(count, reliability)}
+            frame_set = create_packet(protocol_packets.FrameSet, fields)
+            frame_set.encode()
+            cases[f'frame_set.{name}.{count}.encode'] = encode_case(protocol_packets.FrameSet, fields)
+            cases[f'frame_set.{name}.{count}.decode'] = decode_case(protocol_packets.FrameSet, bytes(frame_set.data))
+    for density, sequence_numbers in (('dense', list(range(1000))), ('sparse', list(range(0, 2000, 2)))):
+        fields = {'sequence_numbers': sequence_numbers}
+        ack = create_packet(protocol_packets.Ack, fields)
+        ack.encode()
+        cases[f'ack.{density}.1000.encode'] = encode_case(protocol_packets.Ack, fields)
+        cases[f'ack.{density}.1000.decode'] = decode_case(protocol_packets.Ack, bytes(ack.data))
+    return cases
+
+
+def measure(function: Callable[[], None], repeat: int) -> float:
+    """
+    :return: Best time per call (in nanoseconds) over the repeats
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--filter', default='', help='Only run the cases whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', help='File the results are stored to, as a baseline')
+    parser.add_argument('--compare', help='Baseline to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Slowdown against the baseline flagged as a regression')
+    args = parser.parse_args()
+    baseline: dict[str, float] = {}
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+    results: dict[str, float] = {}
+    regressions: list[str] = []
+    for name, function in collect_cases().items():
+        if args.filter not in name:
+            continue
+        results[name] = duration = measure(function, args.repeat)
+        line: str = f"{name:<44} {duration:>12.0f} ns"
+        if name in baseline:
+            change: float = (duration - baseline[name]) / baseline[name]
+            line += f"   {change:+7.1%}"
+            if change > args.threshold:
+                line += '  REGRESSION'
+                regressions.append(name)
+        print(line)
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({'python': sys.version.split()[0], 'results': results}, file, indent=2)
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
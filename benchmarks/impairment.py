@@ -0,0 +1,100 @@
+"""
+Benchmark for goodput and tail latency of the reliability layer over impaired network paths.
+
+A server and a client run in this process over loopback, with both of their sockets wrapped in
+:class:`rak_net.impairment.ImpairedSocket` so both directions of the path suffer the impairments of a profile.
+The client streams reliable ordered payloads which the server echoes back, and every round trip is timed.
+
+Usage: ``python -m benchmarks.impairment [--profiles wifi lte 3g lossy] [--duration 10] [--rate 200] [--size 200] [--seed 1]``
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+from time import perf_counter_ns
+from rak_net import Server, Client, Connection, Event
+from rak_net.frame import Frame
+from rak_net.impairment import Impairment, ImpairedSocket, PROFILES
+
+
+def percentile(values: list[int], fraction: float) -> float:
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0
+
+
+async def run(profile: str, duration: float, rate: float, size: int, seed: int) -> dict:
+    loop = asyncio.get_running_loop()
+    server = Server(10, '127.0.0.1', 0, loop=loop)
+    server.socket = ImpairedSocket(server.socket, send=Impairment.from_profile(profile, seed=seed),
+                                   clock=server.clock, loop=loop)
+    client = Client(10, loop=loop)
+    client.socket = ImpairedSocket(client.socket, send=Impairment.from_profile(profile, seed=seed + 1),
+                                   clock=client.clock, loop=loop)
+
+    async def echo(connection: Connection, payload: memoryview, channel: int, reliability: int) -> None:
+        await connection.add_to_queue(Frame(reliability=reliability, order_channel=channel, body=bytes(payload)))
+
+    latencies: list[int] = []
+
+    def on_echo(connection: Connection, payload: memoryview, channel: int, reliability: int) -> None:
+        latencies.append(perf_counter_ns() - int.from_bytes(payload[1:9], 'little'))
+
+    server.add_listener(Event.FRAME, echo)
+    client.add_listener(Event.FRAME, on_echo)
+    server_task = loop.create_task(server.start())
+    connection: Connection = await client.connect('127.0.0.1', server.address.port, timeout=30)
+    padding: bytes = bytes(size - 9)
+    sent: int = 0
+    began: int = perf_counter_ns()
+    end: int = began + int(duration * 1e9)
+    while (now := perf_counter_ns()) < end:
+        due: int = int((now - began) / 1e9 * rate) - sent
+        for _ in range(due):
+            await connection.add_to_queue(Frame(reliability=3, body=b'\xfe' + perf_counter_ns().to_bytes(8, 'little') + padding))
+        sent += due
+        await asyncio.sleep(1 / rate)
+    # Wait for the stragglers, as long as the echoes keep coming
+    received: int = -1
+    while len(latencies) < sent and received != len(latencies):
+        received = len(latencies)
+        await asyncio.sleep(2)
+    elapsed: float = (perf_counter_ns() - began) / 1e9
+    latencies.sort()
+    stats = connection.stats
+    uplink: Impairment = client.socket.send_impairment
+    downlink: Impairment = server.socket.send_impairment
+    await client.close()
+    server_task.cancel()
+    await server.socket.close()
+    return {
+        'sent': sent,
+        'echoed': len(latencies),
+        'goodput': len(latencies) * size * 8 / elapsed / 1e3,
+        'p50': percentile(latencies, .5) / 1e6,
+        'p99': percentile(latencies, .99) / 1e6,
+        'p999': percentile(latencies, .999) / 1e6,
+        'max': latencies[-1] / 1e6 if latencies else 0,
+        'srtt': stats.srtt,
+        'resend_ratio': stats.resend_ratio,
+        'uplink': uplink,
+        'downlink': downlink,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument('--duration', type=float, default=10, help='Seconds of streaming per profile')
+    parser.add_argument('--rate', type=float, default=200, help='Payloads sent per second')
+    parser.add_argument('--size', type=int, default=200, help='Size of the payloads')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    for profile in args.profiles:
+        result: dict = asyncio.run(run(profile, args.duration, args.rate, args.size, args.seed))
+        print(f"{profile}: {result['echoed']}/{result['sent']} echoed, goodput {result['goodput']:.1f} kbit/s, "
+              f"latency p50 {result['p50']:.1f} ms, p99 {result['p99']:.1f} ms, p99.9 {result['p999']:.1f} ms, "
+              f"max {result['max']:.1f} ms, srtt {result['srtt']:.1f} ms, client resend ratio {result['resend_ratio']:.2%}")
+        print(f"  uplink {result['uplink']}")
+        print(f"  downlink {result['downlink']}")
+
+
+if __name__ == '__main__':
+    main()
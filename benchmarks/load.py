@@ -0,0 +1,388 @@
+"""
+Loopback load generator measuring the throughput and latency a :class:`rak_net.Server` sustains.
+
+The server runs in its own process and echoes every application frame back with the same reliability and channel.
+Generator processes open many :class:`rak_net.Client` connections to it, one socket each since the server tells
+connections apart by address, all served by the event loop of the process rather than by a thread per socket.
+Every connection sends a mix of traffic and the round trip of every echoed payload is timed.
+
+Traffic kinds, given as packets per second per client with ``--mix``:
+
+- ``movement``: small unreliable payloads
+- ``chat``: reliable ordered payloads
+- ``bulk``: large reliable ordered payloads, fragmented
+- ``ping``: tiny unreliable payloads, a flood at high rates
+
+Results cover packets per second and CPU time per packet of the server, goodput, latency percentiles per kind
+and resend ratios. ``--json`` writes them out and ``--compare`` reports the change against a previous run.
+
+Usage: ``python -m benchmarks.load [--clients 1000] [--processes 2] [--duration 10] [--mix movement=20,chat=2,bulk=0.2] [--json out.json] [--compare base.json]``
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import multiprocessing
+import subprocess
+import time
+from collections import deque
+from time import perf_counter_ns, process_time
+from rak_net import Server, Client, Connection, Event
+from rak_net.frame import Frame
+
+PROTOCOL_VERSION: int = 10
+# Kind -> (payload size, reliability, order channel)
+KINDS: dict[str, tuple[int, int, int]] = {
+    'movement': (48, 0, 0),
+    'chat': (128, 3, 0),
+    'bulk': (8192, 3, 1),
+    'ping': (16, 0, 0),
+}
+KIND_IDS: dict[int, str] = {index: kind for index, kind in enumerate(KINDS)}
+KIND_INDICES: dict[str, int] = {kind: index for index, kind in KIND_IDS.items()}
+
+
+def percentile(values: list[int], fraction: float) -> float:
+    """
+    :return: Percentile of sorted values, 0 in case there are none
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    rates: dict[str, float] = {}
+    for item in mix.split(','):
+        kind, _, rate = item.partition('=')
+        if kind not in KINDS:
+            raise argparse.ArgumentTypeError(f"Unknown traffic kind {kind!r}, expected one of {', '.join(KINDS)}")
+        rates[kind] = float(rate)
+    return rates
+
+
+# Server process
+
+async def serve(pipe) -> None:
+    loop = asyncio.get_running_loop()
+    server = Server(PROTOCOL_VERSION, '127.0.0.1', 0, loop=loop)
+
+    async def echo(connection: Connection, payload: memoryview, channel: int, reliability: int) -> None:
+        await connection.add_to_queue(Frame(reliability=reliability, order_channel=channel, body=bytes(payload)))
+
+    server.add_listener(Event.FRAME, echo)
+    task = loop.create_task(server.start())
+    pipe.send(server.address.port)
+    metrics = server.metrics
+    mark: tuple = ()
+    while True:
+        message: str = await loop.run_in_executor(None, pipe.recv)
+        snapshot: tuple = (
+            process_time(), time.perf_counter(), metrics.datagrams_received.value, metrics.datagrams_sent.value,
+            metrics.bytes_received.value, metrics.bytes_sent.value, metrics.resent_datagrams.value,
+        )
+        if message == 'mark':
+            mark = snapshot
+        else:
+            pipe.send({
+                'connections': len(server.connections),
+                'cpu': snapshot[0] - mark[0],
+                'elapsed': snapshot[1] - mark[1],
+                'datagrams_in': snapshot[2] - mark[2],
+                'datagrams_out': snapshot[3] - mark[3],
+                'bytes_in': snapshot[4] - mark[4],
+                'bytes_out': snapshot[5] - mark[5],
+                'resent_datagrams': snapshot[6] - mark[6],
+            })
+            break
+    task.cancel()
+    await server.socket.close()
+
+
+def serve_process(pipe) -> None:
+    asyncio.run(serve(pipe))
+
+
+# Generator processes
+
+class LoadClient(Client):
+    """
+    Client receiving from a non-blocking socket watched by the event loop, instead of a blocking receive in an executor,
+    so thousands of them fit in one process. It is ticked by the generator rather than by a tick loop of its own.
+    """
+
+    async def start(self) -> None:
+        self._received: deque[tuple] = deque()
+        self._draining: bool = False
+        self.socket._socket.setblocking(False)
+        self._loop.add_reader(self.socket._socket.fileno(), self._on_readable)
+
+    def _on_readable(self) -> None:
+        while True:
+            try:
+                self._received.append(self.socket._socket.recvfrom(65535))
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                self.metrics.receive_errors.inc()
+                break
+        if not self._draining:
+            self._draining = True
+            self._loop.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        try:
+            while self._received:
+                await self._dispatch(self._received.popleft())
+        finally:
+            self._draining = False
+
+    async def close(self) -> None:
+        self._loop.remove_reader(self.socket._socket.fileno())
+        await super().close()
+
+
+class Recorder:
+    """
+    Counts and round-trip times of the payloads sent within the measured window
+    """
+
+    def __init__(self):
+        self.window: tuple[int, int] = (0, 0)
+        self.sent: dict[str, int] = dict.fromkeys(KINDS, 0)
+        self.echoed: dict[str, int] = dict.fromkeys(KINDS, 0)
+        self.echoed_bytes: int = 0
+        self.latencies: dict[str, list[int]] = {kind: [] for kind in KINDS}
+
+    def on_frame(self, connection: Connection, payload: memoryview, channel: int, reliability: int) -> None:
+        sent_at: int = int.from_bytes(payload[2:10], 'little')
+        if self.window[0] <= sent_at < self.window[1]:
+            kind: str = KIND_IDS[payload[1]]
+            self.echoed[kind] += 1
+            self.echoed_bytes += len(payload)
+            self.latencies[kind].append(perf_counter_ns() - sent_at)
+
+
+async def generate(clients: int, port: int, rates: dict[str, float], warmup: float, duration: float, tps: int, pipe) -> dict:
+    loop = asyncio.get_running_loop()
+    recorder = Recorder()
+    connect_start: float = time.perf_counter()
+    load_clients: list[LoadClient] = []
+    connections: list[Connection] = []
+    failures: int = 0
+    for batch in range(0, clients, 100):
+        batch_clients = [LoadClient(PROTOCOL_VERSION, '127.0.0.1', loop=loop, tps=tps) for _ in range(min(100, clients - batch))]
+        results = await asyncio.gather(
+            *(client.connect('127.0.0.1', port, timeout=10) for client in batch_clients), return_exceptions=True
+        )
+        for client, result in zip(batch_clients, results):
+            load_clients.append(client)
+            if isinstance(result, BaseException):
+                failures += 1
+            else:
+                client.add_listener(Event.FRAME, recorder.on_frame)
+                connections.append(result)
+    connect_time: float = time.perf_counter() - connect_start
+    pipe.send('ready')
+    await loop.run_in_executor(None, pipe.recv)
+    interval: float = 1 / tps
+    began: int = perf_counter_ns()
+    recorder.window = (began + int(warmup * 1e9), began + int((warmup + duration) * 1e9))
+    # Payloads to send, carried over between ticks, for every connection and kind
+    credits: list[dict[str, float]] = [dict.fromkeys(rates, 0.0) for _ in connections]
+    padding: dict[str, bytes] = {kind: bytes(KINDS[kind][0] - 10) for kind in rates}
+    cpu_start: float = 0.0
+    cpu: float = 0.0
+    previous: int = began
+    # Keep ticking for a while after the window, for the last echoes to arrive
+    while (now := perf_counter_ns()) < recorder.window[1] + 1_000_000_000:
+        if not cpu_start and now >= recorder.window[0]:
+            cpu_start = process_time()
+        if now < recorder.window[1]:
+            elapsed: float = (now - previous) / 1e9
+            for connection, pending in zip(connections, credits):
+                for kind, rate in rates.items():
+                    pending[kind] += rate * elapsed
+                    count: int = int(pending[kind])
+                    if count:
+                        pending[kind] -= count
+                        size, reliability, channel = KINDS[kind]
+                        body: bytes = b'\xfe' + bytes((KIND_INDICES[kind],)) + perf_counter_ns().to_bytes(8, 'little') + padding[kind]
+                        for _ in range(count):
+                            await connection.add_to_queue(Frame(reliability=reliability, order_channel=channel, body=body))
+                        if recorder.window[0] <= now:
+                            recorder.sent[kind] += count
+        elif not cpu:
+            cpu = process_time() - cpu_start
+        previous = now
+        for client in load_clients:
+            await client.tick()
+        await asyncio.sleep(max(0.0, interval - (perf_counter_ns() - now) / 1e9))
+    resent: int = sum(connection.stats.resent_datagrams for connection in connections)
+    frame_sets: int = sum(connection.frame_sets_sent + connection.stats.resent_datagrams for connection in connections)
+    for client in load_clients:
+        await client.close()
+    return {
+        'connected': len(connections),
+        'failures': failures,
+        'connect_time': connect_time,
+        'cpu': cpu,
+        'sent': recorder.sent,
+        'echoed': recorder.echoed,
+        'echoed_bytes': recorder.echoed_bytes,
+        'latencies': recorder.latencies,
+        'resent_datagrams': resent,
+        'frame_sets': frame_sets,
+    }
+
+
+def generate_process(clients: int, port: int, rates: dict[str, float], warmup: float, duration: float, tps: int, pipe) -> None:
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+    pipe.send(asyncio.run(generate(clients, port, rates, warmup, duration, tps, pipe)))
+
+
+# Coordination and reporting
+
+def run(args: argparse.Namespace) -> dict:
+    context = multiprocessing.get_context('spawn')
+    server_pipe, server_child_pipe = context.Pipe()
+    server_process = context.Process(target=serve_process, args=(server_child_pipe,), daemon=True)
+    server_process.start()
+    port: int = server_pipe.recv()
+    shares: list[int] = [args.clients // args.processes + (index < args.clients % args.processes) for index in range(args.processes)]
+    pipes: list = []
+    processes: list = []
+    for share in shares:
+        pipe, child_pipe = context.Pipe()
+        process = context.Process(
+            target=generate_process, args=(share, port, args.mix, args.warmup, args.duration, args.tps, child_pipe), daemon=True
+        )
+        process.start()
+        pipes.append(pipe)
+        processes.append(process)
+    for pipe in pipes:
+        assert pipe.recv() == 'ready'
+    for pipe in pipes:
+        pipe.send('go')
+    time.sleep(args.warmup)
+    server_pipe.send('mark')
+    time.sleep(args.duration)
+    server_pipe.send('stop')
+    server: dict = server_pipe.recv()
+    workers: list[dict] = [pipe.recv() for pipe in pipes]
+    for process in (server_process, *processes):
+        process.join(5)
+    return summarise(args, server, workers)
+
+
+def summarise(args: argparse.Namespace, server: dict, workers: list[dict]) -> dict:
+    elapsed: float = server['elapsed']
+    datagrams: int = server['datagrams_in'] + server['datagrams_out']
+    kinds: dict[str, dict] = {}
+    all_latencies: list[int] = []
+    for kind in args.mix:
+        latencies: list[int] = sorted(value for worker in workers for value in worker['latencies'][kind])
+        all_latencies.extend(latencies)
+        sent: int = sum(worker['sent'][kind] for worker in workers)
+        echoed: int = sum(worker['echoed'][kind] for worker in workers)
+        kinds[kind] = {
+            'sent': sent,
+            'echoed': echoed,
+            'echo_ratio': echoed / sent if sent else 0.0,
+            'p50_ms': percentile(latencies, .5) / 1e6,
+            'p99_ms': percentile(latencies, .99) / 1e6,
+            'p999_ms': percentile(latencies, .999) / 1e6,
+        }
+    all_latencies.sort()
+    client_frame_sets: int = sum(worker['frame_sets'] for worker in workers)
+    try:
+        commit: str | None = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'config': {
+            'clients': args.clients, 'processes': args.processes, 'duration': args.duration,
+            'warmup': args.warmup, 'tps': args.tps, 'mix': args.mix,
+        },
+        'connected': sum(worker['connected'] for worker in workers),
+        'connect_failures': sum(worker['failures'] for worker in workers),
+        'connect_time_s': max(worker['connect_time'] for worker in workers),
+        'server_connections': server['connections'],
+        'server_pps': datagrams / elapsed,
+        'server_mbps_in': server['bytes_in'] * 8 / elapsed / 1e6,
+        'server_mbps_out': server['bytes_out'] * 8 / elapsed / 1e6,
+        'server_cpu_us_per_datagram': server['cpu'] / datagrams * 1e6 if datagrams else 0.0,
+        'server_cpu_utilisation': server['cpu'] / elapsed,
+        'server_resend_ratio': server['resent_datagrams'] / server['datagrams_out'] if server['datagrams_out'] else 0.0,
+        'client_resend_ratio': sum(worker['resent_datagrams'] for worker in workers) / client_frame_sets if client_frame_sets else 0.0,
+        'goodput_mbps': sum(worker['echoed_bytes'] for worker in workers) * 8 / args.duration / 1e6,
+        'generator_cpu_utilisation': sum(worker['cpu'] for worker in workers) / args.duration,
+        'p50_ms': percentile(all_latencies, .5) / 1e6,
+        'p99_ms': percentile(all_latencies, .99) / 1e6,
+        'p999_ms': percentile(all_latencies, .999) / 1e6,
+        'kinds': kinds,
+    }
+
+
+def report(results: dict, baseline: dict = None) -> None:
+    def line(label: str, key: str, unit: str, kind: str = None) -> None:
+        value: float = results[key] if kind is None else results['kinds'][kind][key]
+        text: str = f"  {label:<28} {value:>12.3f} {unit}"
+        if baseline is not None:
+            base: float | None = baseline.get(key) if kind is None else baseline.get('kinds', {}).get(kind, {}).get(key)
+            if base:
+                text += f"   ({(value - base) / base:+.1%} vs {base:.3f})"
+        print(text)
+
+    print(f"{results['connected']} clients connected in {results['connect_time_s']:.2f} s "
+          f"({results['connect_failures']} failed), {results['server_connections']} on the server")
+    line('server packets/s', 'server_pps', 'pps')
+    line('server in', 'server_mbps_in', 'Mbit/s')
+    line('server out', 'server_mbps_out', 'Mbit/s')
+    line('server CPU per datagram', 'server_cpu_us_per_datagram', 'us')
+    line('server CPU utilisation', 'server_cpu_utilisation', '')
+    line('server resend ratio', 'server_resend_ratio', '')
+    line('client resend ratio', 'client_resend_ratio', '')
+    line('goodput (echoed)', 'goodput_mbps', 'Mbit/s')
+    line('generator CPU utilisation', 'generator_cpu_utilisation', '')
+    line('latency p50', 'p50_ms', 'ms')
+    line('latency p99', 'p99_ms', 'ms')
+    line('latency p99.9', 'p999_ms', 'ms')
+    for kind, values in results['kinds'].items():
+        print(f"  {kind}: {values['echoed']}/{values['sent']} echoed")
+        line(f'{kind} p50', 'p50_ms', 'ms', kind)
+        line(f'{kind} p99', 'p99_ms', 'ms', kind)
+        line(f'{kind} p99.9', 'p999_ms', 'ms', kind)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--processes', type=int, default=2, help='Generator processes the clients are spread over')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds measured')
+    parser.add_argument('--warmup', type=float, default=2, help='Seconds of traffic before measuring')
+    parser.add_argument('--tps', type=int, default=100, help='Ticks per second of the clients')
+    parser.add_argument('--mix', type=parse_mix, default='movement=20,chat=2,bulk=0.2',
+                        help=f"Packets per second per client for every traffic kind, among {', '.join(KINDS)}")
+    parser.add_argument('--json', help='File the results are written to')
+    parser.add_argument('--compare', help='Results of a previous run to compare against')
+    args = parser.parse_args()
+    results: dict = run(args)
+    baseline: dict | None = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    report(results, baseline)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
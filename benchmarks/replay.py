@@ -0,0 +1,99 @@
+"""
+Replay of captured traffic into a :class:`rak_net.Server`, measuring how fast the server processes it.
+
+The datagrams a server received in a capture, written by :class:`rak_net.capture.Capture` or any pcap tool,
+are delivered to a fresh server over an in-memory transport with the source addresses they were captured with,
+at their original pace, accelerated, or as fast as possible. Replies of the server are discarded.
+Captures of production incidents thereby become benchmarks which can be run again and again.
+
+Usage: ``python -m benchmarks.replay capture.pcap [--address 10.0.0.1:19132] [--speed 1] [--protocol-version 10]``
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+from collections import Counter
+from time import perf_counter, process_time
+from rak_net import Server, Connection, Event
+from rak_net.capture import CapturedDatagram, read_capture, replay
+from rak_net.protocol import ProtocolInfo
+from rak_net.transport import MemoryNetwork, MemoryTransport
+
+
+def server_address(datagrams: list[CapturedDatagram]) -> tuple[str, int]:
+    # The server is the address most datagrams were sent to
+    return Counter(datagram.destination for datagram in datagrams).most_common(1)[0][0]
+
+
+def protocol_version(datagrams: list[CapturedDatagram]) -> int | None:
+    for datagram in datagrams:
+        if datagram.data[:1] == bytes((ProtocolInfo.OPEN_CONNECTION_REQUEST_1,)) and len(datagram.data) > 17:
+            # Packet id and offline magic come first
+            return datagram.data[17]
+    return None
+
+
+async def run(datagrams: list[CapturedDatagram], address: tuple[str, int], version: int, speed: float) -> dict:
+    network = MemoryNetwork()
+    transport = MemoryTransport(network)
+    server = Server(version, address[0], address[1], transport=transport)
+    frames: int = 0
+
+    def on_frame(connection: Connection, payload: memoryview, channel: int, reliability: int) -> None:
+        nonlocal frames
+        frames += 1
+
+    server.add_listener(Event.FRAME, on_frame)
+    server_task = asyncio.get_running_loop().create_task(server.start())
+    cpu_start: float = process_time()
+    began: float = perf_counter()
+    delivered: int = await replay(iter(datagrams), network, transport.address, captured_destination=address, speed=speed)
+    while transport.pending:
+        await asyncio.sleep(0)
+    # The last datagram taken out is handled on the next iterations
+    for _ in range(16):
+        await asyncio.sleep(0)
+    elapsed: float = perf_counter() - began
+    cpu: float = process_time() - cpu_start
+    size: int = sum(len(datagram.data) for datagram in datagrams if datagram.destination == address)
+    result: dict = {
+        'delivered': delivered,
+        'bytes': size,
+        'elapsed': elapsed,
+        'cpu': cpu,
+        'connections': int(server.metrics.handshakes.value),
+        'frames': frames,
+        'replies': network.undeliverable,
+    }
+    server_task.cancel()
+    await transport.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('capture', help='Path of the pcap file')
+    parser.add_argument('--address', help='Address of the server in the capture, as host:port. Defaults to the busiest destination')
+    parser.add_argument('--speed', type=float, default=1, help='Acceleration of the original pace, 0 for as fast as possible')
+    parser.add_argument('--protocol-version', type=int, help='Protocol version of the server. Defaults to the one of the first handshake')
+    args = parser.parse_args()
+    datagrams: list[CapturedDatagram] = list(read_capture(args.capture))
+    if not datagrams:
+        parser.error(f"{args.capture} holds no UDP datagrams")
+    if args.address is not None:
+        hostname, _, port = args.address.rpartition(':')
+        address: tuple[str, int] = (hostname.strip('[]'), int(port))
+    else:
+        address = server_address(datagrams)
+    version: int = args.protocol_version or protocol_version(datagrams) or 10
+    captured: list[CapturedDatagram] = [datagram for datagram in datagrams if datagram.destination == address]
+    span: float = captured[-1].timestamp - captured[0].timestamp if captured else 0.0
+    print(f"{args.capture}: {len(captured)} datagrams to {address[0]}:{address[1]} over {span:.1f} s, protocol version {version}")
+    result: dict = asyncio.run(run(datagrams, address, version, args.speed))
+    print(f"replayed {result['delivered']} datagrams in {result['elapsed']:.3f} s at speed {args.speed:g}: "
+          f"{result['delivered'] / result['elapsed']:.0f} datagrams/s, {result['bytes'] * 8 / result['elapsed'] / 1e6:.2f} Mbit/s, "
+          f"{result['cpu'] / max(1, result['delivered']) * 1e6:.1f} us CPU per datagram")
+    print(f"  {result['connections']} handshakes, {result['frames']} application frames, {result['replies']} replies discarded")
+
+
+if __name__ == '__main__':
+    main()
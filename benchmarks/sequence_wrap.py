@@ -0,0 +1,131 @@
+"""
+Stress test pushing a pair of connections past the 24-bit wraparound of sequence numbers and frame indices.
+
+Every run starts the counters of a fresh pair of connections shortly before ``0xFFFFFF`` and sends reliable
+and unreliable frames across a lossy, reordering in-memory link until the counters have wrapped around.
+It fails in case a reliable frame is not delivered exactly once.
+
+Usage: ``python -m benchmarks.sequence_wrap [--wraps 3] [--lead 20000] [--loss 0.02] [--reorder 0.05]``
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import random
+from time import perf_counter
+from rak_net import Server, Connection, Event
+from rak_net.utils import InternetAddress, SequenceTool
+
+
+class Link:
+    """
+    One direction of an in-memory link, dropping and reordering datagrams
+    """
+
+    def __init__(self, rng: random.Random, loss: float, reorder: float):
+        self.rng: random.Random = rng
+        self.loss: float = loss
+        self.reorder: float = reorder
+        self.datagrams: list[bytes] = []
+        self.sent: int = 0
+
+    async def send_data(self, data: bytes, address: InternetAddress) -> None:
+        self.sent += 1
+        if self.rng.random() < self.loss:
+            return
+        self.datagrams.append(bytes(data))
+        if len(self.datagrams) > 1 and self.rng.random() < self.reorder:
+            self.datagrams[-1], self.datagrams[-2] = self.datagrams[-2], self.datagrams[-1]
+
+    async def deliver(self, connection: Connection) -> None:
+        datagrams: list[bytes] = self.datagrams
+        self.datagrams = []
+        for data in datagrams:
+            await connection.handle(data)
+
+
+def create_connection(link: Link, port: int, start: int) -> tuple[Server, Connection]:
+    server = Server(10, '127.0.0.1', 0)
+    server.send_data = link.send_data
+    connection = Connection(InternetAddress('127.0.0.1', port), 1400, server, recovery_window=4096)
+    connection.connected = True
+    connection.send_sequence_number = start
+    connection.send_reliable_frame_index = start
+    connection.send_order_channel_index[0] = start
+    connection.receive_sequence_number = SequenceTool.add(start, -1)
+    connection.receive_reliable_frame_index = start
+    return server, connection
+
+
+async def run(seed: int, lead: int, loss: float, reorder: float, size: int) -> tuple[int, int, float]:
+    """
+    :return: Number of datagrams sent, number of reliable frames delivered and duration of the run
+    """
+    rng = random.Random(seed)
+    start: int = SequenceTool.add(-lead, rng.randrange(lead // 2))
+    forward, backward = Link(rng, loss, reorder), Link(rng, loss, reorder)
+    sender_server, sender = create_connection(forward, 19132, start)
+    receiver_server, receiver = create_connection(backward, 19133, start)
+    delivered: dict[int, int] = {}
+
+    def on_frame(connection: Connection, payload: memoryview, channel: int, reliability: int) -> None:
+        if reliability:
+            key: int = int.from_bytes(payload[1:5], 'little')
+            delivered[key] = delivered.get(key, 0) + 1
+
+    receiver_server.add_listener(Event.FRAME, on_frame)
+    # Payloads start with an id no internal packet uses
+    padding: bytes = bytes(size - 5)
+    sent: int = 0
+    began: float = perf_counter()
+    # Frame sets unacknowledged for a few rounds are resent, standing in for the resend timer
+    round_times: list[float] = [0.0] * 4
+    # Send until the datagram sequence numbers, which advance slowest, have wrapped around
+    while SequenceTool.diff(sender.send_sequence_number, start) < 2 * lead:
+        for sequence_number in sender.recovery_queue.expired(round_times.pop(0)):
+            await sender.resend(sequence_number)
+        round_times.append(sender_server.clock.monotonic())
+        payloads: list[bytes] = []
+        for _ in range(64):
+            payloads.append(b'\xfe' + sent.to_bytes(4, 'little') + padding)
+            sent += 1
+        await sender.send_many(payloads, reliability=3)
+        await sender.send_many([b'\xfe' * size] * 8, reliability=0)
+        await forward.deliver(receiver)
+        await receiver.update()
+        await backward.deliver(sender)
+        await sender.update()
+    # Resend whatever is still unacknowledged until everything got through
+    while sender.pending_frames:
+        for sequence_number in sender.recovery_queue.expired(float('inf')):
+            await sender.resend(sequence_number)
+        await forward.deliver(receiver)
+        await receiver.update()
+        await backward.deliver(sender)
+    duration: float = perf_counter() - began
+    missing: list[int] = [key for key in range(sent) if key not in delivered]
+    duplicated: list[int] = [key for key, count in delivered.items() if count != 1]
+    for connection in (sender, receiver):
+        connection._cancel_timers()
+    await sender_server.socket.close()
+    await receiver_server.socket.close()
+    if missing or duplicated:
+        raise AssertionError(f"Run {seed}: {len(missing)} frames missing, {len(duplicated)} delivered more than once")
+    return forward.sent, sent, duration
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--wraps', type=int, default=3)
+    parser.add_argument('--lead', type=int, default=20000, help="Datagrams sent before the wraparound")
+    parser.add_argument('--loss', type=float, default=0.02)
+    parser.add_argument('--reorder', type=float, default=0.05)
+    parser.add_argument('--size', type=int, default=64)
+    args = parser.parse_args()
+    for seed in range(args.wraps):
+        datagrams, frames, duration = asyncio.run(run(seed, args.lead, args.loss, args.reorder, args.size))
+        print(f"wrap {seed + 1}: {datagrams} datagrams, {frames} reliable frames delivered exactly once "
+              f"in {duration:.2f} s ({datagrams / duration:.0f} datagrams/s, {frames / duration:.0f} frames/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark for the cost of :meth:`rak_net.Server.tick` against the number of connections.
+
+Usage: ``python -m benchmarks.tick [--connections 1000 5000 20000] [--duration 3]``
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+from time import perf_counter
+from rak_net import Server, Connection
+from rak_net.utils import InternetAddress
+
+
+async def measure(count: int, duration: float, active: float) -> tuple[float, float, float, int]:
+    """
+    :return: Median, 99th percentile and maximum tick duration, and number of ticks.
+        Keep-alive pings firing together show up in the tail rather than the median
+    """
+    server = Server(10, '127.0.0.1', 0)
+    connections: list[Connection] = []
+    for index in range(count):
+        address = InternetAddress('127.0.0.1', 20000 + index % 40000)
+        address.hostname = f'127.0.0.{1 + index // 40000}'
+        connection = Connection(address, 1400, server)
+        connection.connected = True
+        server.connections[address.token] = connection
+        connections.append(connection)
+    active_connections: list[Connection] = connections[:int(count * active)]
+    # The first tick catches up with the time taken to open the connections
+    await server.tick()
+    durations: list[float] = []
+    end: float = perf_counter() + duration
+    while perf_counter() < end:
+        for connection in active_connections:
+            server.mark_dirty(connection)
+        start: float = perf_counter()
+        await server.tick()
+        durations.append(perf_counter() - start)
+        await asyncio.sleep(server.tick_sleep_time)
+    await server.socket.close()
+    durations.sort()
+    return durations[len(durations) // 2], durations[min(len(durations) - 1, int(len(durations) * .99))], durations[-1], len(durations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--connections', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--duration', type=float, default=3, help='Seconds of ticking per connection count')
+    parser.add_argument('--active', type=float, default=0.0, help='Fraction of connections marked dirty every tick')
+    args = parser.parse_args()
+    for count in args.connections:
+        median, p99, maximum, ticks = asyncio.run(measure(count, args.duration, args.active))
+        print(f"{count:>7} connections: {ticks} ticks, median {median * 1e3:.3f} ms "
+              f"({median / count * 1e9:.1f} ns/connection), p99 {p99 * 1e3:.3f} ms, max {maximum * 1e3:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
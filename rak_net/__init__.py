@@ -1,5 +1,8 @@
 from .server import Server
+from .client import Client
 from .connection import Connection
 from .socket import AsyncUDPSocket
+from .access_control import AccessControl
+from .events import Event
 
 __version__ = "0.0.1a"
@@ -0,0 +1,130 @@
+from __future__ import annotations
+from ipaddress import ip_network
+from socket import inet_pton, AF_INET, AF_INET6
+from time import monotonic
+from .utils import PrefixTrie
+
+__all__ = 'AccessControl',
+
+
+# Prefix of an IPv4-Mapped IPv6 address (``::ffff:0:0/96``)
+_V4_MAPPED_PREFIX: bytes = b"\x00" * 10 + b"\xff\xff"
+
+
+class AccessControl:
+    """
+    CIDR based Allow/Ban list for the server.
+    Rules are stored in a :class:`rak_net.utils.PrefixTrie` and the most specific (longest) matching rule wins.
+    Rules can be added or removed at any time while the server is running.
+
+    :param default_allow: Whether addresses not matching any rule are allowed. Defaults to True
+    """
+
+    __slots__ = '_trie', 'default_allow'
+
+    def __init__(self, *, default_allow: bool = True):
+        self._trie: PrefixTrie = PrefixTrie()
+        self.default_allow: bool = default_allow
+        """Whether addresses not matching any rule are allowed"""
+
+    def __len__(self) -> int:
+        return len(self._trie)
+
+    @staticmethod
+    def _parse_network(network: str) -> tuple[bytes, int]:
+        parsed = ip_network(network, strict=False)
+        return parsed.network_address.packed, parsed.prefixlen
+
+    @staticmethod
+    def _pack(hostname: str) -> bytes:
+        if ':' not in hostname:
+            return inet_pton(AF_INET, hostname)
+        packed: bytes = inet_pton(AF_INET6, hostname.split('%', 1)[0])
+        if packed[:12] == _V4_MAPPED_PREFIX:
+            return packed[12:]
+        return packed
+
+    def _add_rule(self, network: str, allowed: bool, duration: float | None) -> None:
+        packed, prefix_length = self._parse_network(network)
+        expires_at: float | None = None if duration is None else monotonic() + duration
+        self._trie.insert(packed, prefix_length, (allowed, expires_at))
+
+    def ban(self, network: str, duration: float = None) -> None:
+        """
+        Method to ban a network, replaces any existing rule for the same network
+
+        :param network: Network to be banned in CIDR notation, e.g. ``10.0.0.0/8``. A bare address bans only that address
+        :param duration: Duration (in seconds) of the ban. Bans are permanent in case no duration is provided
+        """
+        self._add_rule(network, False, duration)
+
+    def allow(self, network: str, duration: float = None) -> None:
+        """
+        Method to allow a network, replaces any existing rule for the same network
+
+        :param network: Network to be allowed in CIDR notation, e.g. ``10.1.2.0/24``
+        :param duration: Duration (in seconds) of the rule. Rules are permanent in case no duration is provided
+        """
+        self._add_rule(network, True, duration)
+
+    def remove(self, network: str) -> bool:
+        """
+        Method to remove the rule for a network
+
+        :param network: Network in CIDR notation for which the rule is to be removed
+        :return: Whether a rule was removed
+        """
+        packed, prefix_length = self._parse_network(network)
+        return self._trie.remove(packed, prefix_length) is not None
+
+    def clear(self) -> None:
+        """
+        Method to remove all the rules
+        """
+        self._trie.clear()
+
+    def purge_expired(self) -> int:
+        """
+        Method to remove all expired rules. Expired rules are otherwise only removed lazily when they are matched.
+
+        :return: Number of rules removed
+        """
+        now: float = monotonic()
+        expired: list[tuple[bytes, int]] = [
+            (packed, prefix_length) for packed, prefix_length, (_, expires_at) in self._trie.items()
+            if expires_at is not None and expires_at <= now
+        ]
+        for packed, prefix_length in expired:
+            self._trie.remove(packed, prefix_length)
+        return len(expired)
+
+    def is_packed_allowed(self, packed: bytes) -> bool:
+        """
+        Method to check whether a packed address is allowed
+
+        :param packed: Packed IPv4 (4 bytes) or IPv6 (16 bytes) address
+        :return: Boolean depicting whether the address is allowed
+        """
+        trie: PrefixTrie = self._trie
+        match: tuple | None = trie.longest_match(packed)
+        while match is not None:
+            prefix_length, (allowed, expires_at) = match
+            if expires_at is None or expires_at > monotonic():
+                return allowed
+            trie.remove(packed, prefix_length)
+            match = trie.longest_match(packed)
+        return self.default_allow
+
+    def is_allowed(self, hostname: str) -> bool:
+        """
+        Method to check whether a hostname (as returned by the socket) is allowed
+
+        :param hostname: IPv4 or IPv6 hostname
+        :return: Boolean depicting whether the hostname is allowed
+        """
+        if not len(self._trie):
+            return self.default_allow
+        try:
+            return self.is_packed_allowed(self._pack(hostname))
+        except OSError:
+            return self.default_allow
@@ -0,0 +1,274 @@
+from __future__ import annotations
+import struct
+import time
+from asyncio import sleep
+from collections import deque
+from ipaddress import IPv4Address, IPv6Address, ip_address
+from typing import TYPE_CHECKING, BinaryIO, Iterator, NamedTuple
+if TYPE_CHECKING:
+    from .transport import MemoryNetwork
+
+__all__ = 'CapturedDatagram', 'Capture', 'read_capture', 'replay'
+
+
+_PCAP_HEADER: struct.Struct = struct.Struct('<IHHiIII')
+_RECORD_HEADER: struct.Struct = struct.Struct('<IIII')
+_IPV4_HEADER: struct.Struct = struct.Struct('!BBHHHBBH4s4s')
+_IPV6_HEADER: struct.Struct = struct.Struct('!IHBB16s16s')
+_UDP_HEADER: struct.Struct = struct.Struct('!HHHH')
+_MAGIC: int = 0xA1B2C3D4
+# Packets start with their IP header, version 4 or 6
+_LINKTYPE_RAW: int = 101
+
+
+class CapturedDatagram(NamedTuple):
+    """
+    Datagram read from a capture
+    """
+    timestamp: float
+    """Time (in seconds since the epoch) at which the datagram was captured"""
+    source: tuple[str, int]
+    """Address of the sender, as ``(hostname, port)``"""
+    destination: tuple[str, int]
+    """Address of the recipient, as ``(hostname, port)``"""
+    data: bytes
+    """Payload of the datagram"""
+
+
+def _address(hostname: str) -> IPv4Address | IPv6Address:
+    try:
+        return ip_address(hostname.split('%', 1)[0])
+    except ValueError:
+        # Hostnames are not resolved on the hot path
+        return IPv4Address('127.0.0.1') if hostname == 'localhost' else IPv4Address(0)
+
+
+def _checksum(header: bytes) -> int:
+    total: int = sum(struct.unpack(f'!{len(header) // 2}H', header))
+    while total > 0xFFFF:
+        total = (total & 0xFFFF) + (total >> 16)
+    return ~total & 0xFFFF
+
+
+def _packet(data: bytes, source: tuple, destination: tuple) -> bytes:
+    source_ip: IPv4Address | IPv6Address = _address(source[0])
+    destination_ip: IPv4Address | IPv6Address = _address(destination[0])
+    udp: bytes = _UDP_HEADER.pack(source[1], destination[1], 8 + len(data), 0)
+    if source_ip.version == destination_ip.version == 4:
+        header: bytes = _IPV4_HEADER.pack(0x45, 0, 28 + len(data), 0, 0, 64, 17, 0, source_ip.packed, destination_ip.packed)
+        header = header[:10] + _checksum(header).to_bytes(2, 'big') + header[12:]
+    else:
+        if source_ip.version == 4:
+            source_ip = IPv6Address(f'::ffff:{source_ip}')
+        if destination_ip.version == 4:
+            destination_ip = IPv6Address(f'::ffff:{destination_ip}')
+        header = _IPV6_HEADER.pack(6 << 28, 8 + len(data), 17, 64, source_ip.packed, destination_ip.packed)
+    return header + udp + data
+
+
+class Capture:
+    """
+    Capture of the datagrams sent and received by a socket, in the pcap format, so it opens in Wireshark and tcpdump
+    as well as in :func:`read_capture` and :func:`replay`. Every datagram is written as a UDP packet carrying the
+    addresses of both ends, on raw IP link-layer headers.
+
+    By default datagrams are written to the file as they go. With a ring size, only the latest datagrams are kept
+    in memory, bounding the cost of an always-on capture, and written out by :meth:`dump` once an incident happened::
+
+        capture = Capture('incident.pcap', ring_size=100_000)
+        server = Server(10, '0.0.0.0', 19132, transport=AsyncUDPSocket(True, 4, '0.0.0.0', 19132, capture=capture))
+        ...
+        capture.dump()
+
+    :param path: Path of the capture file. Optional in ring-buffer mode, in which :meth:`dump` may be given one instead
+    :param ring_size: Number of latest datagrams kept in memory, ``None`` to write every datagram to the file
+    :param snap_length: Largest number of bytes of a datagram captured. Defaults to 65535
+    """
+
+    __slots__ = 'path', 'ring_size', 'snap_length', 'datagrams', '_file', '_ring'
+
+    def __init__(self, path: str = None, *, ring_size: int = None, snap_length: int = 65535):
+        if path is None and ring_size is None:
+            raise ValueError("A path is required unless the capture is a ring buffer")
+        self.path: str | None = path
+        """Path of the capture file"""
+        self.ring_size: int | None = ring_size
+        """Number of latest datagrams kept in memory, ``None`` in case datagrams are written as they go"""
+        self.snap_length: int = snap_length
+        self.datagrams: int = 0
+        """Number of datagrams captured"""
+        self._file: BinaryIO | None = None
+        self._ring: deque[tuple[float, bytes, tuple, tuple]] | None = None
+        if ring_size is None:
+            self._file = open(path, 'wb')
+            self._write_header(self._file)
+        else:
+            self._ring = deque(maxlen=ring_size)
+
+    def _write_header(self, file: BinaryIO) -> None:
+        file.write(_PCAP_HEADER.pack(_MAGIC, 2, 4, 0, 0, self.snap_length + 48, _LINKTYPE_RAW))
+
+    def _write_record(self, file: BinaryIO, timestamp: float, data: bytes, source: tuple, destination: tuple) -> None:
+        packet: bytes = _packet(data[:self.snap_length], source, destination)
+        # The original length counts the headers along with the full payload
+        size: int = len(packet) + max(0, len(data) - self.snap_length)
+        seconds: int = int(timestamp)
+        file.write(_RECORD_HEADER.pack(seconds, int((timestamp - seconds) * 1e6), len(packet), size))
+        file.write(packet)
+
+    def record(self, data: bytes, source: tuple, destination: tuple, timestamp: float = None) -> None:
+        """
+        Method to capture a datagram
+
+        :param data: Payload of the datagram
+        :param source: Address of the sender, as ``(hostname, port)``
+        :param destination: Address of the recipient, as ``(hostname, port)``
+        :param timestamp: Time (in seconds since the epoch) of the datagram. Defaults to the current time
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self.datagrams += 1
+        if self._ring is not None:
+            # Packets are only built when dumped, keeping the always-on cost to an append
+            self._ring.append((timestamp, data if isinstance(data, bytes) else bytes(data), source, destination))
+        elif self._file is not None:
+            self._write_record(self._file, timestamp, data, source, destination)
+
+    def dump(self, path: str = None) -> int:
+        """
+        Method to write the datagrams kept by a ring-buffer capture to a file, they are kept for later dumps
+
+        :param path: Path of the file. Defaults to :attr:`path`
+        :return: Number of datagrams written
+        """
+        path = path if path is not None else self.path
+        if self._ring is None:
+            raise ValueError("Only a ring-buffer capture can be dumped")
+        if path is None:
+            raise ValueError("A path is required to dump the capture")
+        with open(path, 'wb') as file:
+            self._write_header(file)
+            for timestamp, data, source, destination in tuple(self._ring):
+                self._write_record(file, timestamp, data, source, destination)
+        return len(self._ring)
+
+    def flush(self) -> None:
+        """
+        Method to flush the datagrams written to the file
+        """
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        """
+        Method to close the capture, a ring-buffer capture with a path is dumped to it
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        elif self._ring is not None and self.path is not None:
+            self.dump()
+
+    def __repr__(self):
+        mode: str = f'ring of {self.ring_size}' if self._ring is not None else self.path
+        return f'<Capture: {self.datagrams} datagrams, {mode}>'
+
+
+def read_capture(path: str) -> Iterator[CapturedDatagram]:
+    """
+    Function to read the UDP datagrams of a pcap file, such as one written by :class:`Capture`.
+    Raw IP and Ethernet link layers are supported, other packets are skipped.
+
+    :param path: Path of the capture file
+    :return: Iterator of the datagrams, in the order they were captured
+    """
+    with open(path, 'rb') as file:
+        header: bytes = file.read(_PCAP_HEADER.size)
+        if len(header) < _PCAP_HEADER.size:
+            raise ValueError(f"{path} is not a pcap file")
+        magic: int = int.from_bytes(header[:4], 'little')
+        if magic in (_MAGIC, 0xA1B23C4D):
+            byte_order: str = '<'
+        elif magic in (0xD4C3B2A1, 0x4D3CB2A1):
+            byte_order = '>'
+        else:
+            raise ValueError(f"{path} is not a pcap file")
+        # Nanosecond captures use a different magic number
+        fraction: float = 1e-9 if magic in (0xA1B23C4D, 0x4D3CB2A1) else 1e-6
+        link_type: int = struct.unpack(f'{byte_order}I', header[20:24])[0] & 0xFFFF
+        record_header: struct.Struct = struct.Struct(f'{byte_order}IIII')
+        while True:
+            record: bytes = file.read(record_header.size)
+            if len(record) < record_header.size:
+                return
+            seconds, fractions, length, _ = record_header.unpack(record)
+            packet: bytes = file.read(length)
+            if link_type == 1:
+                # Ethernet, with at most one VLAN tag
+                offset: int = 18 if packet[12:14] == b'\x81\x00' else 14
+                packet = packet[offset:]
+            elif link_type not in (_LINKTYPE_RAW, 228, 229):
+                continue
+            datagram: CapturedDatagram | None = _parse_packet(packet, seconds + fractions * fraction)
+            if datagram is not None:
+                yield datagram
+
+
+def _parse_packet(packet: bytes, timestamp: float) -> CapturedDatagram | None:
+    if not packet:
+        return None
+    version: int = packet[0] >> 4
+    if version == 4:
+        offset: int = (packet[0] & 0x0F) * 4
+        if packet[9] != 17:
+            return None
+        source_ip: str = str(IPv4Address(packet[12:16]))
+        destination_ip: str = str(IPv4Address(packet[16:20]))
+    elif version == 6:
+        offset = 40
+        if packet[6] != 17:
+            return None
+        source_ip = _unmap(IPv6Address(packet[8:24]))
+        destination_ip = _unmap(IPv6Address(packet[24:40]))
+    else:
+        return None
+    source_port, destination_port, length, _ = _UDP_HEADER.unpack_from(packet, offset)
+    data: bytes = packet[offset + 8:offset + length]
+    return CapturedDatagram(timestamp, (source_ip, source_port), (destination_ip, destination_port), data)
+
+
+def _unmap(address: IPv6Address) -> str:
+    return str(address.ipv4_mapped) if address.ipv4_mapped is not None else str(address)
+
+
+async def replay(datagrams: Iterator[CapturedDatagram], network: MemoryNetwork, destination: tuple[str, int], *,
+                 captured_destination: tuple[str, int] = None, speed: float = 1.0) -> int:
+    """
+    Coroutine delivering captured datagrams to the transport bound to an address of a :class:`rak_net.transport.MemoryNetwork`,
+    typically the :class:`rak_net.transport.MemoryTransport` of a server. Datagrams keep the source address they were captured with.
+
+    :param datagrams: Datagrams to be delivered, as returned by :func:`read_capture`
+    :param network: Network through which the datagrams are delivered
+    :param destination: Address to which the datagrams are delivered, as ``(hostname, port)``
+    :param captured_destination: Address of the datagrams to be delivered in the capture, ``None`` to deliver every datagram
+    :param speed: Factor by which the original timing is accelerated, 0 to deliver the datagrams as fast as possible. Defaults to 1
+    :return: Number of datagrams delivered
+    """
+    delivered: int = 0
+    first: float | None = None
+    began: float = time.perf_counter()
+    for datagram in datagrams:
+        if captured_destination is not None and datagram.destination != captured_destination:
+            continue
+        if first is None:
+            first = datagram.timestamp
+        if speed:
+            delay: float = (datagram.timestamp - first) / speed - (time.perf_counter() - began)
+            if delay > 0:
+                await sleep(delay)
+        elif not delivered % 64:
+            # Let the server keep up with the datagrams delivered
+            await sleep(0)
+        network.deliver(datagram.data, datagram.source, destination)
+        delivered += 1
+    return delivered
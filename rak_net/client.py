@@ -0,0 +1,194 @@
+from __future__ import annotations
+import socket
+from asyncio import FIRST_COMPLETED, Future, Task, wait
+from typing import Iterable
+from .server import Server
+from .connection import Connection
+from .events import Event
+from .frame import Frame
+from .mtu_discovery import MtuDiscovery
+from .protocol import ProtocolInfo
+from .protocol.packet import protocol_packets
+from .utils import InternetAddress
+
+__all__ = 'Client',
+
+
+class _Handshake:
+    """
+    State of a connection being opened by a :class:`Client`
+    """
+
+    __slots__ = 'address', 'discovery', 'future', 'mtu_size', 'stage'
+
+    def __init__(self, address: InternetAddress, discovery: MtuDiscovery, future: Future):
+        self.address: InternetAddress = address
+        self.discovery: MtuDiscovery = discovery
+        self.future: Future = future
+        self.mtu_size: int = 0
+        # 1 while probing with Open-Connection-Request-1, 2 once Open-Connection-Request-2 is sent
+        self.stage: int = 1
+
+
+class Client(Server):
+    """
+    Rak-Net Client interface.
+    Opens connections to servers over a single socket, so a client can hold many connections at once,
+    to different servers or to the same one. Connections are regular :class:`Connection` objects,
+    and the listeners, flush policy, metrics and profiler work the same as for a :class:`Server`.
+
+    :param protocol_version: Protocol Version for Rak-Net
+    :param hostname: Hostname to which the socket of the client is bound. Defaults to ``0.0.0.0`` (``::`` for IPv6)
+    :param port: Port to which the socket of the client is bound. Defaults to 0, an ephemeral port
+    :param ipv: IP-Version of the client
+    :param kwargs: Other keyword arguments of :class:`Server`
+    """
+
+    def __init__(self, protocol_version: int, hostname: str = None, port: int = 0, *, ipv: int = 4, **kwargs):
+        if hostname is None:
+            hostname = '0.0.0.0' if ipv == 4 else '::'
+        super().__init__(protocol_version, hostname, port, ipv=ipv, **kwargs)
+        self._handshakes: dict[str, _Handshake] = {}
+        self._task: Task | None = None
+        self.listeners.add(Event.NEW_INCOMING_CONNECTION, self._on_connected)
+
+    def _on_connected(self, connection: Connection) -> None:
+        handshake: _Handshake | None = self._handshakes.pop(connection.address.token, None)
+        if handshake is not None and not handshake.future.done():
+            handshake.future.set_result(connection)
+
+    async def connect(self, hostname: str, port: int, *, timeout: float = 10, interval: float = 0.5,
+                      sizes: Iterable[int] = None) -> Connection:
+        """
+        Coroutine to open a connection to a server.
+        The MTU-Size is discovered by probing descending sizes (see :class:`rak_net.mtu_discovery.MtuDiscovery`),
+        requests are resent every `interval` until the server answers.
+
+        :param hostname: Hostname of the server
+        :param port: Port of the server
+        :param timeout: Period (in seconds) after which the attempt is given up. Defaults to 10
+        :param interval: Period (in seconds) after which an unanswered request is resent. Defaults to 0.5
+        :param sizes: MTU-Sizes to probe, largest first. Defaults to the sizes of :class:`rak_net.mtu_discovery.MtuDiscovery`
+        :return: The connection, once the handshake is complete
+        :raises ConnectionRefusedError: In case the server uses another protocol version, or no server is reported listening
+        :raises TimeoutError: In case the handshake does not complete within `timeout`
+        """
+        if self._task is None:
+            self._task = self._loop.create_task(self.start())
+        family: int = socket.AF_INET if self.address.version == 4 else socket.AF_INET6
+        info: list = await self._loop.getaddrinfo(hostname, port, family=family, type=socket.SOCK_DGRAM)
+        address: InternetAddress = InternetAddress(info[0][4][0], port, self.address.version)
+        if address.token in self.connections or address.token in self._handshakes:
+            raise ConnectionError(f"Already connected or connecting to {address.token}")
+        discovery: MtuDiscovery = MtuDiscovery(self.protocol_version) if sizes is None else MtuDiscovery(self.protocol_version, sizes)
+        handshake: _Handshake = _Handshake(address, discovery, self._loop.create_future())
+        self._handshakes[address.token] = handshake
+        deadline: float = self.clock.monotonic() + timeout
+        try:
+            while True:
+                await self._send_handshake_request(handshake)
+                remaining: float = deadline - self.clock.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Handshake with {address.token} timed out")
+                # Intervals are measured by the clock of the client, so handshakes work in virtual time too
+                sleeper: Task = self._loop.create_task(self.clock.sleep(min(interval, remaining)))
+                try:
+                    await wait((handshake.future, sleeper), return_when=FIRST_COMPLETED)
+                finally:
+                    sleeper.cancel()
+                if handshake.future.done():
+                    return handshake.future.result()
+        finally:
+            self._handshakes.pop(address.token, None)
+            if not handshake.future.done():
+                handshake.future.cancel()
+                connection: Connection | None = self.connections.get(address.token)
+                if connection is not None and not connection.connected:
+                    connection._cancel_timers()
+                    await self.remove_connection(address)
+
+    async def _send_handshake_request(self, handshake: _Handshake) -> None:
+        if handshake.stage == 1:
+            data: bytes | None = handshake.discovery.next_request()
+            if data is None:
+                # Every size was tried, keep trying with the smallest one
+                handshake.discovery = MtuDiscovery(self.protocol_version, handshake.discovery.sizes[-1:], attempts=1 << 30)
+                data = handshake.discovery.next_request()
+            await self.send_data(data, handshake.address)
+        elif handshake.address.token not in self.connections:
+            packet: protocol_packets.OpenConnectionRequest2 = protocol_packets.OpenConnectionRequest2()
+            packet.magic = ProtocolInfo.MAGIC
+            packet.server_address = handshake.address
+            packet.mtu_size = handshake.mtu_size
+            packet.client_guid = self.guid
+            packet.encode()
+            await self.send_data(packet.data, handshake.address)
+        else:
+            await self._send_connection_request(self.connections[handshake.address.token])
+
+    async def _send_connection_request(self, connection: Connection) -> None:
+        packet: protocol_packets.ConnectionRequest = protocol_packets.ConnectionRequest()
+        packet.client_guid = self.guid
+        packet.request_timestamp = self.get_time_ms()
+        packet.encode()
+        await connection.add_to_queue(Frame(reliability=0, body=packet.data))
+        await connection.update()
+
+    async def _on_unreachable(self, address: tuple, error: int) -> None:
+        handshake: _Handshake | None = self._handshakes.get(InternetAddress(address[0], address[1], self.address.version).token)
+        if handshake is not None and not handshake.future.done():
+            # No server is listening, there is no point in probing until the timeout
+            handshake.future.set_exception(ConnectionRefusedError(f"{handshake.address.token} is unreachable"))
+            return
+        await super()._on_unreachable(address, error)
+
+    async def _dispatch(self, recv: tuple) -> None:
+        if not self.access_control.is_allowed(recv[1][0]):
+            self.metrics.datagrams_dropped.inc()
+            return
+        address: InternetAddress = InternetAddress(recv[1][0], recv[1][1], self.address.version)
+        connection: Connection | None = self.connections.get(address.token)
+        if connection is not None:
+            timestamp: float | None = recv[2] if len(recv) > 2 else None
+            if self.inbound is not None:
+                self.inbound.submit(connection, recv[0], timestamp)
+            else:
+                await connection.handle(recv[0], timestamp=timestamp)
+            return
+        handshake: _Handshake | None = self._handshakes.get(address.token)
+        if handshake is None:
+            return
+        packet_id: int = recv[0][0]
+        if packet_id == ProtocolInfo.OPEN_CONNECTION_REPLY_1 and handshake.stage == 1:
+            handshake.mtu_size = handshake.discovery.handle_reply(recv[0])
+            handshake.stage = 2
+            await self._send_handshake_request(handshake)
+        elif packet_id == ProtocolInfo.OPEN_CONNECTION_REPLY_2 and handshake.stage == 2:
+            packet: protocol_packets.OpenConnectionReply2 = protocol_packets.OpenConnectionReply2(recv[0])
+            packet.decode()
+            await self.add_connection(address, min(packet.mtu_size, handshake.mtu_size))
+            self.metrics.handshakes.inc()
+            await self._send_connection_request(self.connections[address.token])
+        elif packet_id == ProtocolInfo.INCOMPATIBLE_PROTOCOL_VERSION:
+            packet: protocol_packets.IncompatibleProtocolVersion = protocol_packets.IncompatibleProtocolVersion(recv[0])
+            packet.decode()
+            self.metrics.handshakes_rejected.inc()
+            if not handshake.future.done():
+                handshake.future.set_exception(ConnectionRefusedError(
+                    f"{address.token} uses protocol version {packet.protocol_version}, not {self.protocol_version}"
+                ))
+
+    async def close(self) -> None:
+        """
+        Coroutine to disconnect all the connections and close the socket of the client
+        """
+        for connection in list(self.connections.values()):
+            await connection.disconnect()
+            await connection.update()
+        await self.socket.drain()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        # The task of start() stops ticking only once it runs again
+        self._stop_ticking()
+        await self.socket.close()
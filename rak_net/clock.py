@@ -0,0 +1,158 @@
+from __future__ import annotations
+import time
+from asyncio import AbstractEventLoop, Future, TimerHandle, get_event_loop, sleep as _sleep
+from heapq import heappush, heappop
+from typing import Any, Callable
+
+__all__ = 'Clock', 'VirtualClock'
+
+
+class Clock:
+    """
+    Source of time for a server and its connections, reading the clocks of the system.
+    Every timeout, resend, flush and tick is measured against the clock of the server,
+    so a :class:`VirtualClock` can take its place for deterministic simulations.
+
+    :param loop: Asyncio-Loop running the delayed callbacks. Uses :func:`asyncio.get_event_loop` in case no loop is provided
+    """
+
+    def __init__(self, loop: AbstractEventLoop = None):
+        self._loop: AbstractEventLoop = loop if loop is not None else get_event_loop()
+
+    def time(self) -> float:
+        """
+        :return: Wall-clock time (in seconds since the epoch)
+        """
+        return time.time()
+
+    def monotonic(self) -> float:
+        """
+        :return: Monotonic time (in seconds)
+        """
+        return time.monotonic()
+
+    def call_later(self, delay: float, callback: Callable, *args: Any) -> TimerHandle:
+        """
+        Method to call a callback after a delay
+
+        :param delay: Delay (in seconds)
+        :param callback: Callback to be called
+        :param args: Arguments of the callback
+        :return: Handle with a ``cancel`` method
+        """
+        return self._loop.call_later(delay, callback, *args)
+
+    async def sleep(self, delay: float) -> None:
+        """
+        Coroutine waiting for a delay
+
+        :param delay: Delay (in seconds)
+        """
+        await _sleep(delay)
+
+
+class _VirtualHandle:
+    __slots__ = 'when', 'sequence', 'callback', 'args', 'cancelled'
+
+    def __init__(self, when: float, sequence: int, callback: Callable, args: tuple):
+        self.when: float = when
+        self.sequence: int = sequence
+        self.callback: Callable = callback
+        self.args: tuple = args
+        self.cancelled: bool = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def __lt__(self, other: _VirtualHandle) -> bool:
+        # Callbacks due at the same time run in the order they were scheduled
+        return (self.when, self.sequence) < (other.when, other.sequence)
+
+
+class VirtualClock(Clock):
+    """
+    Clock whose time only moves when it is advanced, for simulations running as fast as the code allows.
+    Callbacks and sleeps are due in virtual time and run as the clock passes them.
+
+    Driving a simulation is a matter of advancing the clock, with :meth:`advance` or :meth:`run`,
+    the tasks woken up run in between steps.
+
+    :param start: Monotonic time the clock starts at. Defaults to 0
+    :param epoch: Wall-clock time matching the start. Defaults to the current time of the system
+    :param settle: Number of loop iterations run after every step of :meth:`run`, for the tasks woken up to react. Defaults to 16
+    :param loop: Asyncio-Loop of the simulation. Uses :func:`asyncio.get_event_loop` in case no loop is provided
+    """
+
+    def __init__(self, start: float = 0.0, *, epoch: float = None, settle: int = 16, loop: AbstractEventLoop = None):
+        super().__init__(loop)
+        self.now: float = start
+        """Current monotonic time"""
+        self.settle: int = settle
+        self._offset: float = (epoch if epoch is not None else time.time()) - start
+        self._handles: list[_VirtualHandle] = []
+        self._counter: int = 0
+
+    def time(self) -> float:
+        return self.now + self._offset
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def call_later(self, delay: float, callback: Callable, *args: Any) -> _VirtualHandle:
+        self._counter += 1
+        handle: _VirtualHandle = _VirtualHandle(self.now + max(0.0, delay), self._counter, callback, args)
+        heappush(self._handles, handle)
+        return handle
+
+    async def sleep(self, delay: float) -> None:
+        future: Future = self._loop.create_future()
+        handle: _VirtualHandle = self.call_later(delay, _set_result, future)
+        try:
+            await future
+        finally:
+            handle.cancel()
+
+    @property
+    def next_deadline(self) -> float | None:
+        """Time at which the next callback is due, ``None`` in case none is scheduled"""
+        while self._handles and self._handles[0].cancelled:
+            heappop(self._handles)
+        return self._handles[0].when if self._handles else None
+
+    def advance(self, seconds: float) -> None:
+        """
+        Method to move the clock forward, running the callbacks due on the way in order
+
+        :param seconds: Time (in seconds) by which the clock is moved forward
+        """
+        target: float = self.now + seconds
+        while self._handles and self._handles[0].when <= target:
+            handle: _VirtualHandle = heappop(self._handles)
+            if not handle.cancelled:
+                self.now = max(self.now, handle.when)
+                handle.callback(*handle.args)
+        self.now = target
+
+    async def run(self, duration: float, *, step: float = None) -> None:
+        """
+        Coroutine moving the clock forward, letting the tasks run in between steps
+
+        :param duration: Time (in seconds) by which the clock is moved forward
+        :param step: Largest step (in seconds). In case it is not provided, the clock jumps from one due callback to the next
+        """
+        end: float = self.now + duration
+        while True:
+            for _ in range(self.settle):
+                await _sleep(0)
+            if self.now >= end:
+                break
+            deadline: float | None = self.next_deadline
+            target: float = end if deadline is None else min(end, max(deadline, self.now))
+            if step is not None:
+                target = min(target, self.now + step)
+            self.advance(target - self.now)
+
+
+def _set_result(future: Future) -> None:
+    if not future.done():
+        future.set_result(None)
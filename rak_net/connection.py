@@ -1,70 +1,203 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
-from asyncio import Lock as _Lock, iscoroutine, iscoroutinefunction
+from typing import TYPE_CHECKING, Iterable
+from asyncio import Lock as _Lock
 from .protocol.packet import protocol_packets
 from .protocol import ProtocolInfo
 from .frame import Frame
-from time import time
-from .utils import ReliabilityTool
+from .events import Event
+from .session import Session
+from .stats import ConnectionStats
+from math import ceil
+from time import perf_counter_ns
+from zlib import crc32
+from .profiler import Stage
 if TYPE_CHECKING:
-    from .utils import InternetAddress
+    from .utils import InternetAddress, Timer, RecoveryRing
+    from .inbound import InboundQueue
+    from .flush_policy import FlushPolicy
+    from .profiler import Profiler
     from .server import Server
 
 
+def _session_attribute(name: str) -> property:
+    # Protocol state lives in the session, the connection exposes it under the same names
+    def get(self: Connection):
+        return getattr(self.session, name)
+
+    def set(self: Connection, value) -> None:
+        setattr(self.session, name, value)
+
+    return property(get, set, doc=f"See :attr:`rak_net.session.Session.{name}`")
+
+
 class Connection:
     """
-    Class representing a connection
+    Class representing a connection.
+    The protocol state is kept by a :class:`rak_net.session.Session`, the connection is its asyncio adapter:
+    it feeds the session the datagrams received, hands the datagrams it produces to the server
+    and handles the frames it returns, along with the timers of the connection.
 
     :param address: Address of the connection
     :param mtu_size: MTU-Size of the connection
     :param server: Server using which the connection is made
     :param timeout: Timeout period of the connection
     :param lock: Lock for the connection. Will be created if not supplied
+    :param ping_interval: Interval (in seconds) between keep-alive pings. Defaults to 1.
+        The first ping, and the first timeout check, are spread over two intervals by the address of the connection,
+        so connections opened in a burst do not ping and time out in lock-step
+    :param fragment_timeout: Period (in seconds) after which an incomplete fragmented packet is discarded. Defaults to 10
+    :param resend_timeout: Period (in seconds) after which the reliable frames of an unacknowledged frame set are resent. Defaults to 1
+    :param recovery_window: Number of unacknowledged frame sets with reliable frames kept for resending. Defaults to 1024
     """
 
-    __slots__ = ('address', 'mtu_size', 'server', 'connected', 'recovery_queue', 'ack_queue', 'nack_queue',
-                 'fragmented_packets', 'compound_id', 'receive_sequence_numbers', 'send_sequence_number',
-                 'receive_sequence_number', 'send_reliable_frame_index', 'receive_reliable_frame_index',
-                 'queue', 'send_order_channel_index', 'send_sequence_channel_index', 'last_receive_time',
-                 'ms', 'last_ping_time', '_timeout', '_lock', 'interface')
+    __slots__ = ('address', 'server', 'connected', 'session', 'last_receive_time', 'last_ping_time', '_timeout', '_lock',
+                 'interface', '_ping_interval', '_ping_deadline', '_timeout_timer', '_ping_timer', '_session_timer', '_session_deadline',
+                 'inbound_queue', '_frame_batch', 'flush_policy', 'queue_start_time', 'last_queue_time', 'queue_interval',
+                 'stats', 'receive_delay', 'unreachable_strikes')
+
+    mtu_size: int = _session_attribute('mtu_size')
+    recovery_queue: RecoveryRing = _session_attribute('recovery_queue')
+    pending_frames: dict[int, tuple[memoryview, int]] = _session_attribute('pending_frames')
+    ack_queue: list[int] = _session_attribute('ack_queue')
+    nack_queue: list[int] = _session_attribute('nack_queue')
+    fragmented_packets: dict[int, dict[int, Frame]] = _session_attribute('fragmented_packets')
+    compound_id: int = _session_attribute('compound_id')
+    receive_sequence_numbers: set[int] = _session_attribute('receive_sequence_numbers')
+    send_sequence_number: int = _session_attribute('send_sequence_number')
+    receive_sequence_number: int = _session_attribute('receive_sequence_number')
+    send_reliable_frame_index: int = _session_attribute('send_reliable_frame_index')
+    receive_reliable_frame_index: int = _session_attribute('receive_reliable_frame_index')
+    receive_reliable_frame_indices: set[int] = _session_attribute('receive_reliable_frame_indices')
+    queue: protocol_packets.FrameSet = _session_attribute('queue')
+    send_order_channel_index: list[int] = _session_attribute('send_order_channel_index')
+    send_sequence_channel_index: list[int] = _session_attribute('send_sequence_channel_index')
+    frames_sent: int = _session_attribute('frames_sent')
+    frame_sets_sent: int = _session_attribute('frame_sets_sent')
 
-    def __init__(self, address: InternetAddress, mtu_size: int, server: Server, *, timeout: int = 10, lock: _Lock = None):
+    def __init__(self, address: InternetAddress, mtu_size: int, server: Server, *, timeout: int = 10, lock: _Lock = None,
+                 ping_interval: float = 1, fragment_timeout: float = 10, resend_timeout: float = 1, recovery_window: int = 1024):
         self.address: InternetAddress = address
-        self.mtu_size: int = mtu_size
         self.server: Server = server
         self.connected: bool = False
-        self.recovery_queue: dict[int, protocol_packets.FrameSet] = {}
-        self.ack_queue: list[int] = []
-        self.nack_queue: list[int] = []
-        self.fragmented_packets: dict[int, (int, Frame)] = {}
-        self.compound_id: int = 0
-        self.receive_sequence_numbers: list[int] = []
-        self.send_sequence_number: int = 0
-        self.receive_sequence_number: int = 0
-        self.send_reliable_frame_index: int = 0
-        self.receive_reliable_frame_index: int = 0
-        self.queue: protocol_packets.FrameSet = protocol_packets.FrameSet()
-        self.send_order_channel_index: list[int] = [0] * 32
-        self.send_sequence_channel_index: list[int] = [0] * 32
-        self.last_receive_time: float = time()
-        self.ms: int = 0
-        self.last_ping_time: float = time()
+        self.stats: ConnectionStats = ConnectionStats(self)
+        """:class:`rak_net.stats.ConnectionStats` of the connection"""
+        self.session: Session = Session(
+            mtu_size, resend_timeout=resend_timeout, fragment_timeout=fragment_timeout, recovery_window=recovery_window,
+            stats=self.stats, metrics=server.metrics, profiler=server.profiler, label=address.token
+        )
+        """:class:`rak_net.session.Session` keeping the protocol state of the connection"""
+        self.last_receive_time: float = self.server.clock.time()
+        self.last_ping_time: float = self.server.clock.time()
         self._timeout = timeout
         self._lock = lock or _Lock()
+        self._ping_interval: float = ping_interval
+        self._session_timer: Timer | None = None
+        self._session_deadline: float = 0.0
+        # Derived from the address rather than drawn at random, so simulations stay reproducible
+        jitter: float = ping_interval * (2 * crc32(address.token.encode()) / 0xFFFFFFFF - 1)
+        self._timeout_timer: Timer | None = server.timer_wheel.schedule(timeout + jitter, self._on_timeout_timer)
+        self._ping_deadline: float = server.timer_wheel.now + ping_interval + jitter
+        self._ping_timer: Timer | None = server.timer_wheel.schedule(ping_interval + jitter, self._on_ping_timer)
+        self._frame_batch: list[tuple[memoryview, int, int]] | None = None
+        self.flush_policy: FlushPolicy = server.flush_policy
+        """:class:`rak_net.flush_policy.FlushPolicy` of the connection, defaults to the policy of the server"""
+        self.queue_start_time: float = 0.0
+        """Time (from :meth:`rak_net.clock.Clock.monotonic`) at which the oldest pending data was queued, 0 in case nothing is pending"""
+        self.last_queue_time: float = 0.0
+        """Time (from :meth:`rak_net.clock.Clock.monotonic`) at which data was last queued"""
+        self.queue_interval: float = 0.0
+        """Smoothed interval between queued data, maintained by flush policies which need it"""
+        self.inbound_queue: InboundQueue | None = None
+        """:class:`rak_net.inbound.InboundQueue` of the connection, in case the server handles datagrams through an :class:`rak_net.inbound.InboundScheduler`"""
+        self.receive_delay: float = 0.0
+        """Time (in seconds) the datagram being handled waited in the process since its arrival, 0 in case its arrival time is unknown"""
+        self.unreachable_strikes: int = 0
+        """Number of times the peer was reported unreachable since it last sent data"""
+
+    @property
+    def ms(self) -> int:
+        """Smoothed round-trip time (in milliseconds), see :attr:`stats`"""
+        return int(self.stats.srtt)
 
     async def update(self) -> None:
         """
-        Method to update the connection
+        Method to update the connection, sends the ACK-Queue, NACK-Queue and the frame queue.
+        Timeouts, pings and resends are driven by the server's :class:`rak_net.utils.TimerWheel` instead.
         """
-        if (time() - self.last_receive_time) >= self._timeout:
+        self.queue_start_time = 0.0
+        self.session.flush()
+        await self._transmit()
+
+    @property
+    def frames_per_datagram(self) -> float:
+        """Average number of frames sent per frame set"""
+        return self.frames_sent / self.frame_sets_sent if self.frame_sets_sent else 0.0
+
+    async def _queued(self) -> None:
+        now: float = self.server.clock.monotonic()
+        if not self.queue_start_time:
+            self.queue_start_time = now
+            self.server.mark_dirty(self)
+        if self.flush_policy.on_queue(self, now):
+            await self.update()
+
+    async def _transmit(self) -> None:
+        for datagram in self.session.poll_transmit(self.server.clock.monotonic()):
+            await self.send_data(datagram)
+        self._arm_session_timer()
+
+    def _arm_session_timer(self) -> None:
+        # A single timer wakes the session up at its next timeout, it is only moved when that gets earlier
+        if self._timeout_timer is None:
+            return
+        deadline: float | None = self.session.next_timeout()
+        if deadline is None:
+            return
+        if self._session_timer is not None:
+            if deadline >= self._session_deadline:
+                return
+            self._session_timer.cancel()
+        self._session_deadline = deadline
+        self._session_timer = self.server.timer_wheel.schedule(
+            max(0.0, deadline - self.server.clock.monotonic()), self._on_session_timer
+        )
+
+    async def _on_session_timer(self) -> None:
+        self._session_timer = None
+        await self._transmit()
+
+    def _cancel_timers(self) -> None:
+        for timer in (self._timeout_timer, self._ping_timer, self._session_timer):
+            if timer is not None:
+                timer.cancel()
+        self._timeout_timer = self._ping_timer = self._session_timer = None
+
+    async def _on_timeout_timer(self) -> None:
+        elapsed: float = self.server.clock.time() - self.last_receive_time
+        if elapsed >= self._timeout:
+            self._timeout_timer = None
             await self.disconnect()
+        else:
+            self._timeout_timer = self.server.timer_wheel.schedule(self._timeout - elapsed, self._on_timeout_timer)
+
+    async def _on_ping_timer(self) -> None:
+        # Pings keep their phase through late ticks, rather than falling in step with the connections fired along
+        now: float = self.server.timer_wheel.now
+        self._ping_deadline += self._ping_interval * max(1, ceil((now - self._ping_deadline) / self._ping_interval))
+        self._ping_timer = self.server.timer_wheel.schedule(self._ping_deadline - now, self._on_ping_timer)
         if self.connected:
-            if (time() - self.last_ping_time) >= 1:
-                self.last_ping_time = time()
-                await self.ping()
-        await self.send_ack_queue()
-        await self.send_nack_queue()
-        await self.send_queue()
+            self.last_ping_time = self.server.clock.time()
+            await self.ping()
+
+    async def resend(self, sequence_number: int) -> None:
+        """
+        Method to resend the still unacknowledged reliable frames of a frame set.
+        The frames are repacked into as few new frame sets as the MTU-Size allows.
+
+        :param sequence_number: Sequence number with which the frame set was last sent
+        """
+        self.session.resend(sequence_number)
+        await self._transmit()
 
     async def ping(self) -> None:
         """
@@ -86,21 +219,41 @@ class Connection:
         :param address: Address to which the data is to be sent
         """
         address = address or self.address
+        self.stats.datagrams_out += 1
+        self.stats.bytes_out += len(data)
         return await self.server.send_data(data, address)
 
-    async def handle(self, data: bytes) -> None:
+    async def handle(self, data: bytes, *, timestamp: float = None) -> None:
         """
-        Function to handle the incoming connection data
+        Function to handle the incoming connection data.
+        With the arrival time of the data, round-trip times are measured up to the arrival rather than up to the handling,
+        and the time the data waited in the process is recorded in :attr:`stats`
 
         :param data: Incoming data to be handled
+        :param timestamp: Arrival time of the data (in seconds since the epoch), as given by sockets with timestamps enabled
         """
-        self.last_receive_time = time()
-        if data[0] == ProtocolInfo.ACK:
-            await self.handle_ack(data)
-        elif data[0] == ProtocolInfo.NACK:
-            await self.handle_nack(data)
-        elif (data[0] & ProtocolInfo.FRAME_SET) != 0:
-            await self.handle_frame_set(data)
+        self.last_receive_time = self.server.clock.time()
+        self.unreachable_strikes = 0
+        now: float = self.server.clock.monotonic()
+        if timestamp is not None:
+            self.receive_delay = max(0.0, self.last_receive_time - timestamp)
+            now -= self.receive_delay
+            self.stats.add_queueing_latency(self.receive_delay * 1000)
+            self.server.metrics.queueing_latency.observe(self.receive_delay)
+        else:
+            # The delay of a previous datagram does not apply to this one
+            self.receive_delay = 0.0
+        session: Session = self.session
+        frames: list[Frame] = session.receive_datagram(data, now)
+        if frames:
+            await self._handle_frames(frames)
+        if session.transmit_queue:
+            # Resends requested by a NACK
+            await self._transmit()
+        elif session.fragmented_packets:
+            self._arm_session_timer()
+        if (data[0] & ProtocolInfo.FRAME_SET) != 0 and (session.ack_queue or session.nack_queue):
+            await self._queued()
 
     async def handle_ack(self, data: bytes) -> None:
         """
@@ -108,12 +261,7 @@ class Connection:
 
         :param data: Data to be handled
         """
-        packet: protocol_packets.Ack = protocol_packets.Ack(data)
-        packet.decode()
-        for sequence_number in packet.sequence_numbers:
-            if sequence_number in self.recovery_queue:
-                async with self._lock:
-                    del self.recovery_queue[sequence_number]
+        self.session.receive_ack(data, self.server.clock.monotonic())
 
     async def handle_nack(self, data: bytes) -> None:
         """
@@ -121,18 +269,8 @@ class Connection:
 
         :param data: Data to be handled
         """
-        packet: protocol_packets.Nack = protocol_packets.Nack(data)
-        packet.decode()
-        for sequence_number in packet.sequence_numbers:
-            if sequence_number in self.recovery_queue:
-                async with self._lock:
-                    lost_packet: protocol_packets.FrameSet = self.recovery_queue[sequence_number]
-                lost_packet.sequence_number = self.send_sequence_number
-                self.send_sequence_number += 1
-                lost_packet.encode()
-                await self.send_data(lost_packet.data)
-                async with self._lock:
-                    del self.recovery_queue[sequence_number]
+        self.session.receive_nack(data)
+        await self._transmit()
 
     async def handle_frame_set(self, data: bytes) -> None:
         """
@@ -140,29 +278,27 @@ class Connection:
 
         :param data: Data to be handled
         """
-        packet: protocol_packets.FrameSet = protocol_packets.FrameSet(data)
-        packet.decode()
-        if packet.sequence_number not in self.receive_sequence_numbers:
-            async with self._lock:
-                if packet.sequence_number in self.nack_queue:
-                    self.nack_queue.remove(packet.sequence_number)
-                self.receive_sequence_numbers.append(packet.sequence_number)
-                self.ack_queue.append(packet.sequence_number)
-            hole_size: int = packet.sequence_number - self.receive_sequence_number
-            if hole_size > 0:
-                for sequence_number in range(self.receive_sequence_number + 1, hole_size):
-                    if sequence_number not in self.receive_sequence_numbers:
-                        async with self._lock:
-                            self.nack_queue.append(sequence_number)
-            self.receive_sequence_number = packet.sequence_number
-            for frame in packet.frames:
-                if not ReliabilityTool.reliable(frame.reliability):
-                    await self.handle_frame(frame)
-                else:
-                    hole_size: int = frame.reliable_frame_index - self.receive_reliable_frame_index
-                    if hole_size == 0:
-                        await self.handle_frame(frame)
-                        self.receive_reliable_frame_index += 1
+        frames: list[Frame] = self.session.receive_frame_set(data, self.server.clock.monotonic())
+        if frames:
+            await self._handle_frames(frames)
+
+    async def _handle_frames(self, frames: list[Frame]) -> None:
+        profiler: Profiler = self.server.profiler
+        if self.server.listeners.on_frames:
+            self._frame_batch = []
+        for frame in frames:
+            start: int = perf_counter_ns() if profiler.enabled else 0
+            await self.handle_frame(frame)
+            if start:
+                profiler.record(Stage.HANDLE_FRAME, start, f'{self.address.token} 0x{frame.body[:1].hex()}')
+        if self._frame_batch is not None:
+            batch: list[tuple[memoryview, int, int]] = self._frame_batch
+            self._frame_batch = None
+            if batch:
+                start = perf_counter_ns() if profiler.enabled else 0
+                await self.server.listeners.dispatch(Event.FRAMES, self, batch)
+                if start:
+                    profiler.record(Stage.CALLBACK, start, f'{Event.FRAMES} x{len(self.server.listeners.on_frames)}')
 
     async def handle_fragmented_frame(self, frame: Frame) -> None:
         """
@@ -170,16 +306,10 @@ class Connection:
 
         :param frame: Frame to be handled
         """
-        if frame.compound_id not in self.fragmented_packets:
-            self.fragmented_packets[frame.compound_id] = {frame.index: frame}
+        new_frame: Frame | None = self.session.receive_fragment(frame, self.server.clock.monotonic())
+        if new_frame is None:
+            self._arm_session_timer()
         else:
-            self.fragmented_packets[frame.compound_id][frame.index] = frame
-        if len(self.fragmented_packets[frame.compound_id]) == frame.compound_size:
-            new_frame: Frame = Frame()
-            new_frame.body = b""
-            for i in range(0, frame.compound_size):
-                new_frame.body += self.fragmented_packets[frame.compound_id][i].body
-            del self.fragmented_packets[frame.compound_id]
             await self.handle_frame(new_frame)
 
     async def handle_frame(self, frame: Frame) -> None:
@@ -195,162 +325,146 @@ class Connection:
                 if frame.body[0] == ProtocolInfo.CONNECTION_REQUEST:
                     new_frame: Frame = Frame()
                     new_frame.reliability = 0
-                    new_frame.body = await self.server.handler.handle_connection_request(frame.body, self.address, self.server)
+                    new_frame.body = await self.server.handler.handle_connection_request(frame.body, self.address, server=self.server)
                     await self.add_to_queue(new_frame)
                 elif frame.body[0] == ProtocolInfo.CONNECTION_REQUEST_ACCEPTED:
                     new_frame: Frame = Frame()
                     new_frame.reliability = 0
-                    new_frame.body = await self.server.handler.handle_connection_request_accepted(frame.body, self.address, self.server)
+                    new_frame.body = await self.server.handler.handle_connection_request_accepted(frame.body, self.address, server=self.server)
                     await self.add_to_queue(new_frame)
                     self.connected = True
+                    await self.server.listeners.dispatch(Event.NEW_INCOMING_CONNECTION, self)
                 elif frame.body[0] == ProtocolInfo.NEW_INCOMING_CONNECTION:
                     packet: protocol_packets.NewIncomingConnection = protocol_packets.NewIncomingConnection(frame.body)
                     packet.decode()
                     if packet.server_address.port == self.server.address.port:
                         self.connected = True
-                        if hasattr(self.server, "interface"):
-                            if hasattr(self.server.interface, "on_new_incoming_connection"):
-                                if iscoroutine(self.server.interface.on_new_incoming_connection):
-                                    await self.server.interface.on_new_incoming_connection
-                                elif iscoroutinefunction(self.server.interface.on_new_incoming_connection):
-                                    await self.server.interface.on_new_incoming_connection(self)
-                                else:
-                                    self.server.interface.on_new_incoming_connection(self)
+                        await self.server.listeners.dispatch(Event.NEW_INCOMING_CONNECTION, self)
             elif frame.body[0] == ProtocolInfo.ONLINE_PING:
                 new_frame: Frame = Frame()
                 new_frame.reliability = 0
-                new_frame.body = await self.server.handler.handle_online_ping(frame.body, self.address, self.server)
+                new_frame.body = await self.server.handler.handle_online_ping(frame.body, self.address, server=self.server)
                 await self.add_to_queue(new_frame)
             elif frame.body[0] == ProtocolInfo.ONLINE_PONG:
                 packet: protocol_packets.OnlinePong = protocol_packets.OnlinePong(frame.body)
                 packet.decode()
-                self.ms = (self.server.get_time_ms() - packet.client_timestamp)
+                self.stats.add_rtt(self.server.get_time_ms() - packet.client_timestamp - self.receive_delay * 1000)
             elif frame.body[0] == ProtocolInfo.DISCONNECT:
                 await self.disconnect()
             else:
-                if hasattr(self.server, "interface"):
-                    if hasattr(self.server.interface, "on_frame"):
-                        if iscoroutine(self.server.interface.on_frame):
-                            await self.server.interface.on_frame
-                        elif iscoroutinefunction(self.server.interface.on_frame):
-                            await self.server.interface.on_frame(self)
-                        else:
-                            self.server.interface.on_frame(self)
+                for offloader in self.server.offloaders:
+                    offloader.submit(self, frame.body)
+                payload: memoryview = memoryview(frame.body)
+                profiler: Profiler = self.server.profiler
+                for callback, is_async in self.server.listeners.on_frame:
+                    start: int = perf_counter_ns() if profiler.enabled else 0
+                    if is_async:
+                        await callback(self, payload, frame.order_channel, frame.reliability)
+                    else:
+                        callback(self, payload, frame.order_channel, frame.reliability)
+                    if start:
+                        profiler.record(Stage.CALLBACK, start, getattr(callback, '__qualname__', repr(callback)))
+                if self._frame_batch is not None:
+                    self._frame_batch.append((payload, frame.order_channel, frame.reliability))
 
     async def send_queue(self) -> None:
         """
         Method to send the queue
         """
-        if len(self.queue.frames) > 0:
-            self.queue.sequence_number = self.send_sequence_number
-            self.send_sequence_number += 1
-            self.recovery_queue[self.queue.sequence_number] = self.queue
-            self.queue.encode()
-            await self.send_data(self.queue.data)
-            self.queue = protocol_packets.FrameSet()
+        self.session.flush_queue()
+        await self._transmit()
 
     async def append_frame(self, frame: Frame, immediate: bool = False) -> None:
         """
         Method to append a frame to the queue
 
         :param frame: Frame to be appended
-        :param immediate: Adds to the front of queue if True, defaults to False and adds to back of the queue
-        """
-        if immediate:
-            packet: protocol_packets.FrameSet = protocol_packets.FrameSet()
-            packet.frames.append(frame)
-            packet.sequence_number = self.send_sequence_number
-            self.send_sequence_number += 1
-            async with self._lock:
-                self.recovery_queue[packet.sequence_number] = packet
-            packet.encode()
-            await self.send_data(packet.data)
-        else:
-            frame_size: int = frame.size
-            queue_size: int = self.queue.size
-            if frame_size + queue_size >= self.mtu_size:
-                await self.send_queue()
-            self.queue.frames.append(frame)
+        :param immediate: Sends the frame in a frame set of its own right away if True, defaults to False and adds to back of the queue
+        """
+        self.session.append_frame(frame, immediate)
+        if self.session.transmit_queue:
+            await self._transmit()
+
+    def split_body(self, body: bytes) -> list[bytes]:
+        """
+        Method to split a frame body into fragments fitting the MTU-Size of the connection,
+        along with the frame set header and the header of a fragmented frame
+
+        :param body: Body to be split
+        :return: List of fragment bodies
+        """
+        return self.session.split_body(body)
 
-    async def add_to_queue(self, frame: Frame) -> None:
+    async def add_to_queue(self, frame: Frame, *, fragments: list[bytes] = None) -> None:
         """
         Method to process and add a frame to the queue
         :param frame: Frame to be added
+        :param fragments: Pre-computed fragments of the frame body, as returned by :meth:`split_body`.
+            In case it is not provided, the body is split only if the frame does not fit the MTU-Size
         """
-        if ReliabilityTool.ordered(frame.reliability):
-            frame.ordered_frame_index = self.send_order_channel_index[frame.order_channel]
-            self.send_order_channel_index[frame.order_channel] += 1
-        elif ReliabilityTool.sequenced(frame.reliability):
-            frame.ordered_frame_index = self.send_order_channel_index[frame.order_channel]
-            frame.sequenced_frame_index = self.send_sequence_channel_index[frame.order_channel]
-            self.send_sequence_channel_index[frame.order_channel] += 1
-        if frame.size > self.mtu_size:
-            fragmented_body: list[bytes] = []
-            for i in range(0, len(frame.body), self.mtu_size):
-                fragmented_body.append(frame.body[i:i + self.mtu_size])
-            for index, body in enumerate(fragmented_body):
-                new_frame: Frame = Frame()
-                new_frame.fragmented = True
-                new_frame.reliability = frame.reliability
-                new_frame.compound_id = self.compound_id
-                new_frame.compound_size = len(fragmented_body)
-                new_frame.index = index
-                new_frame.body = body
-                if ReliabilityTool.reliable(frame.reliability):
-                    new_frame.reliable_frame_index = self.send_reliable_frame_index
-                    self.send_reliable_frame_index += 1
-                if ReliabilityTool.sequenced_or_ordered(frame.reliability):
-                    new_frame.ordered_frame_index = frame.ordered_frame_index
-                    new_frame.order_channel = frame.order_channel
-                if ReliabilityTool.sequenced(frame.reliability):
-                    new_frame.sequenced_frame_index = frame.sequenced_frame_index
-                await self.append_frame(new_frame, True)
-            self.compound_id += 1
-        else:
-            if ReliabilityTool.reliable(frame.reliability):
-                frame.reliable_frame_index = self.send_reliable_frame_index
-                self.send_reliable_frame_index += 1
-            await self.append_frame(frame, False)
+        queued: bool = self.session.send(frame, fragments=fragments)
+        if self.session.transmit_queue:
+            await self._transmit()
+        if queued:
+            await self._queued()
+
+    async def send_many(self, payloads: Iterable[bytes], reliability: int = 0, channel: int = 0) -> None:
+        """
+        Method to send many payloads at once.
+        Indices are assigned in bulk and the payloads are packed into as few frame sets as the MTU-Size allows in a single pass.
+        Frames already in the queue are sent first and all frame sets are handed to the socket right away,
+        so the order of the payloads is preserved.
+
+        :param payloads: Payloads to be sent
+        :param reliability: Reliability of the frames. Defaults to 0
+        :param channel: Order channel of the frames. Defaults to 0
+        """
+        self.session.send_many(payloads, reliability, channel)
+        await self._transmit()
 
     async def send_ack_queue(self) -> None:
         """
         Method to send data in the ACK-Queue
         """
-        if len(self.ack_queue) > 0:
-            packet: protocol_packets.Ack = protocol_packets.Ack()
-            packet.sequence_numbers = self.ack_queue.copy()
-            packet.encode()
-            self.ack_queue.clear()
-            await self.send_data(packet.data)
+        self.session.flush_acks()
+        await self._transmit()
 
     async def send_nack_queue(self) -> None:
         """
         Method to send data in the NACK-Queue
         """
-        if len(self.nack_queue) > 0:
-            packet: protocol_packets.Nack = protocol_packets.Nack()
-            packet.sequence_numbers = self.nack_queue.copy()
-            packet.encode()
-            self.nack_queue.clear()
-            await self.send_data(packet.data)
+        self.session.flush_nacks()
+        await self._transmit()
 
     async def disconnect(self) -> None:
         """
         Method to disconnect the connection
         """
+        if self.server.connections.get(self.address.token) is not self:
+            return
         new_frame: Frame = Frame()
         new_frame.reliability = 0
         new_frame.body = b"\x15"
         await self.add_to_queue(new_frame)
-        await self.server.remove_connection(self.address)
-        if hasattr(self.server, "interface"):
-            if hasattr(self.server.interface, "on_disconnect"):
-                if iscoroutine(self.server.interface.on_disconnect):
-                    await self.server.interface.on_disconnect
-                elif iscoroutinefunction(self.server.interface.on_disconnect):
-                    await self.server.interface.on_disconnect(self)
-                else:
-                    self.server.interface.on_disconnect(self)
+        # Sent before the connection is dropped, rather than left in the queue
+        await self.update()
+        await self.drop()
+
+    async def drop(self) -> None:
+        """
+        Method to close the connection without notifying the peer, for peers which are already gone.
+        Closing a connection more than once has no effect
+        """
+        if self.server.connections.get(self.address.token) is not self:
+            return
+        self._cancel_timers()
+        if self.inbound_queue is not None:
+            self.inbound_queue.clear()
+        if await self.server.remove_connection(self.address) is not self:
+            # Closed concurrently while waiting for the lock
+            return
+        self.server.metrics.disconnects.inc()
+        await self.server.listeners.dispatch(Event.DISCONNECT, self)
 
     def __repr__(self):
         return f'<Connection: {self.address.token}>'
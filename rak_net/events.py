@@ -0,0 +1,84 @@
+from __future__ import annotations
+from typing import Callable
+from asyncio import iscoroutinefunction
+from .utils import ReadOnly as _ReadOnly
+
+__all__ = 'Event', 'EventListeners'
+
+
+class Event(_ReadOnly):
+    """
+    Enum for events of a server, the values are also the names of the matching interface methods
+
+    - ``on_new_incoming_connection(connection)``, called once a connection completes the handshake
+    - ``on_frame(connection, payload, channel, reliability)``, called for every application frame
+      with the body of the frame as a :class:`memoryview`
+    - ``on_frames(connection, frames)``, called once per datagram with a list of ``(payload, channel, reliability)``
+      tuples for all the application frames of the datagram
+    - ``on_disconnect(connection)``, called once a connection is disconnected
+    """
+    NEW_INCOMING_CONNECTION: str = 'on_new_incoming_connection'
+    FRAME: str = 'on_frame'
+    FRAMES: str = 'on_frames'
+    DISCONNECT: str = 'on_disconnect'
+
+
+class EventListeners:
+    """
+    Registry of event listeners of a server.
+    Listeners are classified as synchronous or asynchronous once, on registration,
+    and are stored as lists of ``(callback, is_async)`` tuples for each event.
+    """
+
+    __slots__ = 'on_new_incoming_connection', 'on_frame', 'on_frames', 'on_disconnect'
+
+    def __init__(self):
+        self.on_new_incoming_connection: list[tuple[Callable, bool]] = []
+        """Listeners for :attr:`Event.NEW_INCOMING_CONNECTION`"""
+        self.on_frame: list[tuple[Callable, bool]] = []
+        """Listeners for :attr:`Event.FRAME`"""
+        self.on_frames: list[tuple[Callable, bool]] = []
+        """Listeners for :attr:`Event.FRAMES`"""
+        self.on_disconnect: list[tuple[Callable, bool]] = []
+        """Listeners for :attr:`Event.DISCONNECT`"""
+
+    def _get(self, event: str) -> list[tuple[Callable, bool]]:
+        if event not in Event:
+            raise ValueError(f"Unknown event {event!r}")
+        return getattr(self, event)
+
+    def add(self, event: str, callback: Callable) -> None:
+        """
+        Method to add a listener for an event
+
+        :param event: Event to listen for, one of :class:`Event`
+        :param callback: Function or coroutine function to be called on the event
+        """
+        self._get(event).append((callback, iscoroutinefunction(callback)))
+
+    def remove(self, event: str, callback: Callable) -> None:
+        """
+        Method to remove a listener for an event
+
+        :param event: Event for which the listener was added
+        :param callback: Callback of the listener
+        """
+        listeners: list[tuple[Callable, bool]] = self._get(event)
+        for index, (listener, _) in enumerate(listeners):
+            if listener == callback:
+                del listeners[index]
+                return
+        raise ValueError(f"{callback!r} is not listening for {event!r}")
+
+    async def dispatch(self, event: str, *args) -> None:
+        """
+        Method to call all the listeners of an event
+
+        :param event: Event to be dispatched
+        :param args: Arguments for the listeners
+        """
+        for callback, is_async in getattr(self, event):
+            if is_async:
+                await callback(*args)
+            else:
+                callback(*args)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .connection import Connection
+
+__all__ = (
+    'FlushPolicy',
+    'TickFlushPolicy',
+    'ImmediateFlushPolicy',
+    'TimeWindowFlushPolicy',
+    'SizeThresholdFlushPolicy',
+    'AdaptiveFlushPolicy',
+)
+
+
+class FlushPolicy:
+    """
+    Base-Class for flush policies.
+    A flush policy decides when the queues of a connection (frames, ACKs and NACKs) are sent,
+    trading latency against the number of frames packed into a datagram.
+    A frame set is always sent once the next frame would exceed the MTU-Size, regardless of the policy.
+
+    The same policy instance may be shared by many connections, so per-connection state is kept on the connection:
+    :attr:`Connection.queue_start_time` holds the time at which the oldest pending data was queued.
+    """
+
+    __slots__ = ()
+
+    def on_queue(self, connection: Connection, now: float) -> bool:
+        """
+        Method called whenever data is queued to a connection
+
+        :param connection: Connection to which the data was queued
+        :param now: Current time, from :meth:`rak_net.clock.Clock.monotonic` of the server
+        :return: Whether the queues of the connection are to be sent right away
+        """
+        return False
+
+    def on_tick(self, connection: Connection, now: float, interval: float) -> bool:
+        """
+        Method called on every tick for connections with pending data
+
+        :param connection: Connection with pending data
+        :param now: Current time, from :meth:`rak_net.clock.Clock.monotonic` of the server
+        :param interval: Interval (in seconds) until the next tick
+        :return: Whether the queues of the connection are to be sent, otherwise they are held until the next tick
+        """
+        return True
+
+
+class TickFlushPolicy(FlushPolicy):
+    """
+    Flush policy sending pending data once every tick. This is the default policy.
+    """
+
+    __slots__ = ()
+
+
+class ImmediateFlushPolicy(FlushPolicy):
+    """
+    Flush policy sending data as soon as it is queued, favouring latency over throughput
+    """
+
+    __slots__ = ()
+
+    def on_queue(self, connection: Connection, now: float) -> bool:
+        return True
+
+
+class TimeWindowFlushPolicy(FlushPolicy):
+    """
+    Flush policy holding pending data for a time window, to pack more frames into a datagram.
+    Pending data is sent on the last tick before the window would be exceeded.
+
+    :param window: Maximum time (in microseconds) for which pending data is held
+    """
+
+    __slots__ = 'window',
+
+    def __init__(self, window: float):
+        self.window: float = window / 1_000_000
+        """Maximum time (in seconds) for which pending data is held"""
+
+    def on_queue(self, connection: Connection, now: float) -> bool:
+        return now - connection.queue_start_time >= self.window
+
+    def on_tick(self, connection: Connection, now: float, interval: float) -> bool:
+        return now - connection.queue_start_time + interval >= self.window
+
+
+class SizeThresholdFlushPolicy(FlushPolicy):
+    """
+    Flush policy sending pending data once the frame queue reaches a size.
+
+    :param threshold: Size (in bytes) of the frame queue at which it is sent
+    :param max_delay: Maximum time (in microseconds) for which pending data is held below the threshold.
+        In case it is not provided, pending data is sent every tick
+    """
+
+    __slots__ = 'threshold', 'max_delay'
+
+    def __init__(self, threshold: int, max_delay: float = None):
+        self.threshold: int = threshold
+        """Size (in bytes) of the frame queue at which it is sent"""
+        self.max_delay: float | None = None if max_delay is None else max_delay / 1_000_000
+        """Maximum time (in seconds) for which pending data is held below the threshold"""
+
+    def on_queue(self, connection: Connection, now: float) -> bool:
+        return connection.queue.size >= self.threshold
+
+    def on_tick(self, connection: Connection, now: float, interval: float) -> bool:
+        return self.max_delay is None or now - connection.queue_start_time + interval >= self.max_delay
+
+
+class AdaptiveFlushPolicy(FlushPolicy):
+    """
+    Flush policy adapting the hold time to the connection.
+    Pending data is held for a fraction of the round-trip time (clamped between a minimum and maximum window),
+    but only while data is being queued fast enough for another frame to be expected within the window.
+    A frame set is sent early once it is filled to a fraction of the MTU-Size.
+
+    :param rtt_fraction: Fraction of the round-trip time for which pending data may be held. Defaults to 0.1
+    :param min_window: Minimum hold time (in microseconds). Defaults to 0
+    :param max_window: Maximum hold time (in microseconds). Defaults to 20000
+    :param fill: Fraction of the MTU-Size at which the frame queue is sent right away. Defaults to 0.9
+    :param smoothing: Smoothing factor of the queueing rate estimate. Defaults to 0.125
+    """
+
+    __slots__ = 'rtt_fraction', 'min_window', 'max_window', 'fill', 'smoothing'
+
+    def __init__(self, *, rtt_fraction: float = 0.1, min_window: float = 0, max_window: float = 20_000,
+                 fill: float = 0.9, smoothing: float = 0.125):
+        self.rtt_fraction: float = rtt_fraction
+        self.min_window: float = min_window / 1_000_000
+        self.max_window: float = max_window / 1_000_000
+        self.fill: float = fill
+        self.smoothing: float = smoothing
+
+    def window(self, connection: Connection) -> float:
+        """
+        Method to get the current hold time of a connection
+
+        :param connection: Connection for which to get the hold time
+        :return: Hold time (in seconds)
+        """
+        window: float = connection.ms / 1000 * self.rtt_fraction
+        return min(self.max_window, max(self.min_window, window))
+
+    def on_queue(self, connection: Connection, now: float) -> bool:
+        window: float = self.window(connection)
+        # Any gap longer than the window means the connection was idle, capping keeps the estimate responsive
+        gap: float = min(now - connection.last_queue_time, 2 * window)
+        connection.queue_interval += (gap - connection.queue_interval) * self.smoothing
+        connection.last_queue_time = now
+        if connection.queue.size >= connection.mtu_size * self.fill:
+            return True
+        # Holding only pays off in case another frame is expected within the window
+        return connection.queue_interval > window or now - connection.queue_start_time >= window
+
+    def on_tick(self, connection: Connection, now: float, interval: float) -> bool:
+        return now - connection.queue_start_time + interval >= self.window(connection)
@@ -88,6 +88,13 @@ class Frame(binary_stream):
         """
         Method to encode the frame
         """
+        self.encode_header()
+        self.write(self.body)
+
+    def encode_header(self) -> None:
+        """
+        Method to encode the frame's header, everything except the body
+        """
         self.write_unsigned_byte((self.reliability << 5) | (0x10 if self.fragmented else 0))
         self.write_unsigned_short_be(len(self.body) << 3)
         if ReliabilityTool.reliable(self.reliability):
@@ -101,7 +108,6 @@ class Frame(binary_stream):
             self.write_unsigned_int_be(self.compound_size)
             self.write_unsigned_short_be(self.compound_id)
             self.write_unsigned_int_be(self.index)
-        self.write(self.body)
 
     @property
     def size(self):
@@ -0,0 +1,270 @@
+from __future__ import annotations
+import random
+from asyncio import AbstractEventLoop, Queue, Task, get_event_loop
+from typing import Any, Awaitable, Callable
+from .clock import Clock
+from .transport import Transport
+
+__all__ = 'Impairment', 'ImpairedSocket', 'PROFILES'
+
+
+PROFILES: dict[str, dict[str, float]] = {
+    'wifi': {'delay': .005, 'jitter': .005, 'loss': .005},
+    'lte': {'delay': .03, 'jitter': .015, 'loss': .01, 'burst_loss': .002, 'burst_length': 4, 'reorder': .01,
+            'bandwidth': 2_500_000},
+    '3g': {'delay': .1, 'jitter': .05, 'loss': .02, 'burst_loss': .005, 'burst_length': 6, 'reorder': .02,
+           'duplicate': .001, 'bandwidth': 200_000, 'buffer': 64_000},
+    'lossy': {'loss': .1, 'burst_loss': .01, 'burst_length': 8},
+}
+"""Keyword arguments of :class:`Impairment` imitating common networks, one way"""
+
+
+class Impairment:
+    """
+    Impairments of one direction of a network path.
+    It only decides the fate of every datagram, :class:`ImpairedSocket` carries it out. Decisions are drawn
+    from a :class:`random.Random` of its own, so a seeded impairment always treats a sequence of datagrams the same way.
+
+    :param loss: Probability for a datagram to be lost independently of the others
+    :param burst_loss: Probability for a burst of losses to start at a datagram (Gilbert-Elliott model)
+    :param burst_length: Mean number of datagrams lost in a burst. Defaults to 3
+    :param reorder: Probability for a datagram to be held back by `reorder_delay`, behind the datagrams sent after it
+    :param reorder_delay: Time (in seconds) by which reordered datagrams are held back. Defaults to 0.01
+    :param duplicate: Probability for a datagram to be delivered twice
+    :param delay: One-way delay (in seconds)
+    :param jitter: Largest random delay (in seconds) added to `delay`, drawn uniformly
+    :param bandwidth: Rate (in bytes per second) at which datagrams leave, ``None`` for no limit
+    :param buffer: Bytes waiting for the bandwidth after which datagrams are dropped, ``None`` for no limit
+    :param seed: Seed of the random decisions
+    """
+
+    __slots__ = ('loss', 'burst_loss', 'burst_length', 'reorder', 'reorder_delay', 'duplicate', 'delay', 'jitter',
+                 'bandwidth', 'buffer', 'datagrams', 'dropped', 'overflowed', 'duplicated', 'reordered',
+                 '_random', '_bursting', '_link_free_at')
+
+    def __init__(self, *, loss: float = 0.0, burst_loss: float = 0.0, burst_length: float = 3.0, reorder: float = 0.0,
+                 reorder_delay: float = 0.01, duplicate: float = 0.0, delay: float = 0.0, jitter: float = 0.0,
+                 bandwidth: float = None, buffer: int = None, seed: int = None):
+        self.loss: float = loss
+        self.burst_loss: float = burst_loss
+        self.burst_length: float = burst_length
+        self.reorder: float = reorder
+        self.reorder_delay: float = reorder_delay
+        self.duplicate: float = duplicate
+        self.delay: float = delay
+        self.jitter: float = jitter
+        self.bandwidth: float | None = bandwidth
+        self.buffer: int | None = buffer
+        self.datagrams: int = 0
+        """Number of datagrams submitted"""
+        self.dropped: int = 0
+        """Number of datagrams lost, including those dropped for the buffer"""
+        self.overflowed: int = 0
+        """Number of datagrams dropped as the buffer was full"""
+        self.duplicated: int = 0
+        """Number of datagrams delivered twice"""
+        self.reordered: int = 0
+        """Number of datagrams held back"""
+        self._random: random.Random = random.Random(seed)
+        self._bursting: bool = False
+        self._link_free_at: float = 0.0
+
+    @classmethod
+    def from_profile(cls, name: str, *, seed: int = None, **overrides) -> Impairment:
+        """
+        Method to create an impairment from one of the :data:`PROFILES`
+
+        :param name: Name of the profile
+        :param seed: Seed of the random decisions
+        :param overrides: Keyword arguments replacing those of the profile
+        :return: The impairment
+        """
+        return cls(**{**PROFILES[name], **overrides}, seed=seed)
+
+    def schedule(self, size: int, now: float) -> list[float]:
+        """
+        Method to decide the fate of a datagram
+
+        :param size: Size of the datagram
+        :param now: Current time (in seconds)
+        :return: Times at which the datagram is delivered. Empty in case it is lost, two times in case it is duplicated
+        """
+        self.datagrams += 1
+        rng: random.Random = self._random
+        if self._bursting:
+            self._bursting = rng.random() >= 1 / self.burst_length
+        elif self.burst_loss and rng.random() < self.burst_loss:
+            self._bursting = True
+        if self._bursting or (self.loss and rng.random() < self.loss):
+            self.dropped += 1
+            return []
+        departure: float = now
+        if self.bandwidth is not None:
+            start: float = max(now, self._link_free_at)
+            if self.buffer is not None and (start - now) * self.bandwidth + size > self.buffer:
+                self.dropped += 1
+                self.overflowed += 1
+                return []
+            departure = self._link_free_at = start + size / self.bandwidth
+        times: list[float] = [departure + self.delay + (rng.uniform(0, self.jitter) if self.jitter else 0.0)]
+        if self.reorder and rng.random() < self.reorder:
+            self.reordered += 1
+            times[0] += self.reorder_delay
+        if self.duplicate and rng.random() < self.duplicate:
+            self.duplicated += 1
+            times.append(times[0] + (rng.uniform(0, self.jitter) if self.jitter else 0.0))
+        return times
+
+    def __repr__(self):
+        return (f'<Impairment: {self.datagrams} datagrams, {self.dropped} dropped, '
+                f'{self.duplicated} duplicated, {self.reordered} reordered>')
+
+
+class ImpairedSocket(Transport):
+    """
+    Wrapper of a :class:`rak_net.transport.Transport`, such as an :class:`rak_net.AsyncUDPSocket`, impairing the datagrams
+    it sends and receives, for testing and benchmarking the reliability layer on a single machine.
+    It is a transport itself, so it replaces the socket of a server or client in place::
+
+        server.socket = ImpairedSocket(server.socket, send=Impairment.from_profile('lte', seed=1), clock=server.clock)
+
+    Delays and bandwidth are measured by the clock, so with the :class:`rak_net.clock.VirtualClock` of a server
+    over a :class:`rak_net.transport.MemoryTransport`, a seeded impairment plays out the same on every machine.
+
+    :param socket: Socket to be wrapped
+    :param send: Impairment of the datagrams sent, ``None`` to send them as is
+    :param receive: Impairment of the datagrams received, ``None`` to receive them as is
+    :param clock: :class:`rak_net.clock.Clock` scheduling the delayed datagrams, typically the clock of the server.
+        In case it is not provided, a new instance reading the system clocks would be created
+    :param loop: Asyncio-Loop running the delayed sends. Uses :func:`asyncio.get_event_loop` in case no loop is provided
+    """
+
+    def __init__(self, socket: Transport, *, send: Impairment = None, receive: Impairment = None, clock: Clock = None,
+                 loop: AbstractEventLoop = None):
+        self.socket: Transport = socket
+        """Wrapped socket"""
+        self.send_impairment: Impairment | None = send
+        """Impairment of the datagrams sent"""
+        self.receive_impairment: Impairment | None = receive
+        """Impairment of the datagrams received"""
+        self._loop: AbstractEventLoop = loop if loop is not None else get_event_loop()
+        self.clock: Clock = clock if clock is not None else Clock(self._loop)
+        """:class:`rak_net.clock.Clock` of the delays"""
+        self._received: Queue = Queue()
+        self._pump: Task | None = None
+        self._tasks: set[Task] = set()
+
+    def __getattr__(self, name: str):
+        return getattr(self.socket, name)
+
+    @property
+    def is_closed(self) -> bool:
+        """
+        Whether the wrapped socket is closed or not
+        """
+        return self.socket.is_closed
+
+    @property
+    def address(self) -> tuple:
+        """
+        Address to which the wrapped socket is bound
+        """
+        return self.socket.address
+
+    @property
+    def send_queue_depth(self) -> int:
+        """
+        Number of datagrams waiting in the wrapped socket, those held back by the impairment are not counted
+        """
+        return self.socket.send_queue_depth
+
+    @property
+    def on_unreachable(self) -> Callable[[tuple, int], Awaitable[Any]] | None:
+        """
+        Coroutine function awaited by the wrapped socket for unreachable peers
+        """
+        return self.socket.on_unreachable
+
+    @on_unreachable.setter
+    def on_unreachable(self, value: Callable[[tuple, int], Awaitable[Any]] | None) -> None:
+        self.socket.on_unreachable = value
+
+    def receive_backlog(self) -> int | None:
+        """
+        Method to measure the data waiting in the wrapped socket
+
+        :return: Number of bytes waiting, ``None`` in case the socket cannot tell
+        """
+        return self.socket.receive_backlog()
+
+    def prime(self, hostname: str = None, port: int = None) -> None:
+        """
+        Method to bind the wrapped socket
+
+        :param hostname: Hostname to which the socket is to be bound
+        :param port: Port to which the socket is to be bound
+        """
+        self.socket.prime(hostname, port)
+
+    async def send(self, data: bytes, hostname: str = "localhost", port: int = 0) -> None:
+        """
+        Method for sending data to a host and port, through the send impairment
+
+        :param data: Data to be sent
+        :param hostname: Host to which the data is to be sent
+        :param port: Port to which the data is to be sent
+        """
+        if self.send_impairment is None:
+            return await self.socket.send(data, hostname, port)
+        now: float = self.clock.monotonic()
+        for when in self.send_impairment.schedule(len(data), now):
+            if when <= now:
+                await self.socket.send(data, hostname, port)
+            else:
+                self.clock.call_later(when - now, self._send_later, data, hostname, port)
+
+    def _send_later(self, data: bytes, hostname: str, port: int) -> None:
+        if not self.socket.is_closed:
+            task: Task = self._loop.create_task(self.socket.send(data, hostname, port))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def recieve(self, *, size: int = 65535) -> tuple:
+        """
+        Method to recieve the data from the socket, through the receive impairment
+
+        :param size: Size of data to be recieved. Defaults to 65535
+        :return: Returns a tuple of data and address in format ``(`data`, (`hostname`, `port`))``
+        """
+        if self.receive_impairment is None:
+            return await self.socket.recieve(size=size)
+        if self._pump is None:
+            self._pump = self._loop.create_task(self._receive_loop(size))
+        return await self._received.get()
+
+    async def _receive_loop(self, size: int) -> None:
+        while not self.socket.is_closed:
+            recv: tuple = await self.socket.recieve(size=size)
+            if not recv[0]:
+                self._received.put_nowait(recv)
+                continue
+            now: float = self.clock.monotonic()
+            for when in self.receive_impairment.schedule(len(recv[0]), now):
+                if when <= now:
+                    self._received.put_nowait(recv)
+                else:
+                    self.clock.call_later(when - now, self._received.put_nowait, recv)
+
+    async def drain(self) -> None:
+        """
+        Coroutine waiting until every datagram queued in the wrapped socket is sent
+        """
+        await self.socket.drain()
+
+    async def close(self) -> None:
+        """
+        Method for closing the socket
+        """
+        if self._pump is not None:
+            self._pump.cancel()
+        await self.socket.close()
@@ -0,0 +1,186 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from asyncio import Queue, Task, sleep
+from collections import deque
+from .utils import ReadOnly as _ReadOnly
+if TYPE_CHECKING:
+    from .connection import Connection
+    from .server import Server
+
+__all__ = 'InboundOverflow', 'InboundQueue', 'InboundScheduler'
+
+
+class InboundOverflow(_ReadOnly):
+    """
+    Enum for behaviours of a full :class:`InboundQueue`
+    """
+    # Drop the incoming datagram
+    DROP_NEWEST: str = 'drop_newest'
+    # Drop the oldest queued datagram to make room for the incoming one
+    DROP_OLDEST: str = 'drop_oldest'
+    # Drop the incoming datagram and disconnect the connection
+    DISCONNECT: str = 'disconnect'
+
+
+class InboundQueue:
+    """
+    Bounded queue of datagrams received for a connection, waiting to be handled
+
+    :param connection: Connection the queue belongs to
+    :param maxsize: Maximum number of queued datagrams
+    """
+
+    __slots__ = 'connection', 'maxsize', 'scheduled', 'received', 'dropped', 'max_depth', '_items'
+
+    def __init__(self, connection: Connection, maxsize: int):
+        self.connection: Connection = connection
+        """Connection the queue belongs to"""
+        self.maxsize: int = maxsize
+        """Maximum number of queued datagrams"""
+        self.scheduled: bool = False
+        """Whether the queue is being drained, or is waiting to be drained"""
+        self.received: int = 0
+        """Number of datagrams accepted into the queue"""
+        self.dropped: int = 0
+        """Number of datagrams dropped due to overflow"""
+        self.max_depth: int = 0
+        """Highest number of datagrams queued at once"""
+        self._items: deque[tuple[bytes, float | None]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def depth(self) -> int:
+        """Number of datagrams currently queued"""
+        return len(self._items)
+
+    def clear(self) -> None:
+        """
+        Method to discard all the queued datagrams
+        """
+        self._items.clear()
+
+    def __repr__(self):
+        return f'<InboundQueue: {self.connection.address.token} depth={len(self._items)}>'
+
+
+class InboundScheduler:
+    """
+    Scheduler handling datagrams of each connection from its own :class:`InboundQueue`.
+    Datagrams of a connection are always handled in order, one at a time,
+    while a slow connection does not hold back the reception of the others.
+
+    :param server: Server for which the scheduler is intended
+    :param queue_size: Maximum number of queued datagrams per connection
+    :param workers: Number of worker tasks shared by all connections, served round-robin one datagram at a time.
+        0 spawns a task per connection whenever it has queued datagrams. Defaults to 0
+    :param overflow: Behaviour when a queue is full, one of :class:`InboundOverflow`. Defaults to ``InboundOverflow.DROP_NEWEST``
+    """
+
+    __slots__ = 'server', 'queue_size', 'workers', 'overflow', 'dropped', '_ready', '_tasks'
+
+    def __init__(self, server: Server, queue_size: int, *, workers: int = 0, overflow: str = InboundOverflow.DROP_NEWEST):
+        if overflow not in InboundOverflow:
+            raise ValueError(f"Unknown overflow behaviour {overflow!r}")
+        self.server: Server = server
+        self.queue_size: int = queue_size
+        """Maximum number of queued datagrams per connection"""
+        self.workers: int = workers
+        """Number of shared worker tasks, 0 for a task per connection"""
+        self.overflow: str = overflow
+        """Behaviour when a queue is full"""
+        self.dropped: int = 0
+        """Number of datagrams dropped due to overflow, across all connections"""
+        self._ready: Queue | None = None
+        self._tasks: set[Task] = set()
+
+    @property
+    def depth(self) -> int:
+        """Number of datagrams queued across all connections"""
+        return sum(len(connection.inbound_queue) for connection in self.server.connections.values()
+                   if connection.inbound_queue is not None)
+
+    def submit(self, connection: Connection, data: bytes, timestamp: float = None) -> None:
+        """
+        Method to queue a datagram to be handled by a connection
+
+        :param connection: Connection which is to handle the datagram
+        :param data: Datagram to be handled
+        :param timestamp: Arrival time of the datagram (in seconds since the epoch), if known
+        """
+        queue: InboundQueue | None = connection.inbound_queue
+        if queue is None:
+            queue = connection.inbound_queue = InboundQueue(connection, self.queue_size)
+        items: deque[tuple[bytes, float | None]] = queue._items
+        if len(items) >= queue.maxsize:
+            queue.dropped += 1
+            self.dropped += 1
+            if self.overflow == InboundOverflow.DROP_OLDEST:
+                items.popleft()
+            else:
+                if self.overflow == InboundOverflow.DISCONNECT and connection.address.token in self.server.connections:
+                    queue.clear()
+                    self._spawn(connection.disconnect())
+                return
+        items.append((data, timestamp))
+        queue.received += 1
+        if len(items) > queue.max_depth:
+            queue.max_depth = len(items)
+        if not queue.scheduled:
+            queue.scheduled = True
+            if self.workers:
+                self._ensure_workers()
+                self._ready.put_nowait(queue)
+            else:
+                self._spawn(self._drain(queue))
+
+    def _spawn(self, coroutine) -> None:
+        task: Task = self.server._loop.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _ensure_workers(self) -> None:
+        if self._ready is None:
+            self._ready = Queue()
+            for _ in range(self.workers):
+                self._spawn(self._worker())
+
+    async def _handle(self, queue: InboundQueue) -> None:
+        data, timestamp = queue._items.popleft()
+        try:
+            await queue.connection.handle(data, timestamp=timestamp)
+        except Exception as e:
+            self.server._loop.call_exception_handler({
+                'message': f'Exception while handling a datagram of {queue.connection!r}',
+                'exception': e,
+            })
+
+    async def _drain(self, queue: InboundQueue) -> None:
+        try:
+            while queue._items:
+                await self._handle(queue)
+                # Yield to the event loop so that reception and other connections are not starved
+                await sleep(0)
+        finally:
+            queue.scheduled = False
+
+    async def _worker(self) -> None:
+        ready: Queue = self._ready
+        while True:
+            queue: InboundQueue = await ready.get()
+            if queue._items:
+                await self._handle(queue)
+            if queue._items:
+                ready.put_nowait(queue)
+            else:
+                queue.scheduled = False
+            await sleep(0)
+
+    def close(self) -> None:
+        """
+        Method to cancel all the tasks of the scheduler
+        """
+        for task in list(self._tasks):
+            task.cancel()
+        self._ready = None
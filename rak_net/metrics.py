@@ -0,0 +1,325 @@
+from __future__ import annotations
+from asyncio import StreamReader, StreamWriter, start_server, AbstractServer
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+__all__ = 'Counter', 'Gauge', 'Histogram', 'MetricsRegistry', 'RakNetMetrics'
+
+
+class Counter:
+    """
+    Metric counting up from 0
+
+    :param name: Name of the metric
+    :param help: Description of the metric
+    """
+
+    __slots__ = 'name', 'help', 'value'
+
+    type: str = 'counter'
+
+    def __init__(self, name: str, help: str = ''):
+        self.name: str = name
+        self.help: str = help
+        self.value: int = 0
+        """Current value of the counter"""
+
+    def inc(self, amount: int = 1) -> None:
+        """
+        Method to increase the counter
+
+        :param amount: Amount by which the counter is increased. Defaults to 1
+        """
+        self.value += amount
+
+    def samples(self) -> Iterable[tuple[str, float]]:
+        """
+        Method to collect the samples of the metric
+
+        :return: Iterable of ``(name, value)`` tuples
+        """
+        yield self.name, self.value
+
+
+class Gauge:
+    """
+    Metric going up and down, either set directly or read from a function whenever it is collected
+
+    :param name: Name of the metric
+    :param help: Description of the metric
+    :param function: Function returning the value of the gauge. In case it is not provided, :attr:`value` is used
+    """
+
+    __slots__ = 'name', 'help', 'value', 'function'
+
+    type: str = 'gauge'
+
+    def __init__(self, name: str, help: str = '', function: Callable[[], float] = None):
+        self.name: str = name
+        self.help: str = help
+        self.value: float = 0
+        """Current value of the gauge, unless it has a function"""
+        self.function: Callable[[], float] | None = function
+
+    def set(self, value: float) -> None:
+        """
+        Method to set the gauge
+
+        :param value: New value of the gauge
+        """
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        """
+        Method to increase the gauge
+
+        :param amount: Amount by which the gauge is increased. Defaults to 1
+        """
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        """
+        Method to decrease the gauge
+
+        :param amount: Amount by which the gauge is decreased. Defaults to 1
+        """
+        self.value -= amount
+
+    def samples(self) -> Iterable[tuple[str, float]]:
+        """
+        Method to collect the samples of the metric
+
+        :return: Iterable of ``(name, value)`` tuples
+        """
+        yield self.name, self.function() if self.function is not None else self.value
+
+
+class Histogram:
+    """
+    Metric counting observations into fixed buckets
+
+    :param name: Name of the metric
+    :param help: Description of the metric
+    :param buckets: Upper bounds of the buckets, in increasing order. An infinite bucket is always added
+    """
+
+    __slots__ = 'name', 'help', 'buckets', 'counts', 'sum', 'count'
+
+    type: str = 'histogram'
+
+    def __init__(self, name: str, help: str = '', buckets: Iterable[float] = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)):
+        self.name: str = name
+        self.help: str = help
+        self.buckets: tuple[float, ...] = tuple(buckets)
+        """Upper bounds of the buckets"""
+        self.counts: list[int] = [0] * (len(self.buckets) + 1)
+        """Number of observations in every bucket, not cumulative, the last one being the infinite bucket"""
+        self.sum: float = 0
+        """Sum of the observations"""
+        self.count: int = 0
+        """Number of observations"""
+
+    def observe(self, value: float) -> None:
+        """
+        Method to add an observation
+
+        :param value: Value observed
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self) -> Iterable[tuple[str, float]]:
+        """
+        Method to collect the samples of the metric, with cumulative bucket counts
+
+        :return: Iterable of ``(name, value)`` tuples
+        """
+        cumulative: int = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{self.name}_bucket{{le="{bound}"}}', cumulative
+        yield f'{self.name}_bucket{{le="+Inf"}}', self.count
+        yield f'{self.name}_sum', self.sum
+        yield f'{self.name}_count', self.count
+
+
+class MetricsRegistry:
+    """
+    Registry of metrics, rendered in the Prometheus text format.
+    Metrics are plain objects updated in place, collecting them only happens on :meth:`render`.
+    """
+
+    __slots__ = '_metrics',
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def _add(self, metric: Counter | Gauge | Histogram) -> Counter | Gauge | Histogram:
+        existing: Counter | Gauge | Histogram | None = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric):
+                raise ValueError(f"Metric {metric.name!r} is already registered as a {existing.type}")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str = '') -> Counter:
+        """
+        Method to get a counter, registering it in case it does not exist
+
+        :param name: Name of the metric
+        :param help: Description of the metric
+        :return: The :class:`Counter`
+        """
+        return self._add(Counter(name, help))
+
+    def gauge(self, name: str, help: str = '', function: Callable[[], float] = None) -> Gauge:
+        """
+        Method to get a gauge, registering it in case it does not exist
+
+        :param name: Name of the metric
+        :param help: Description of the metric
+        :param function: Function returning the value of the gauge
+        :return: The :class:`Gauge`
+        """
+        return self._add(Gauge(name, help, function))
+
+    def histogram(self, name: str, help: str = '', buckets: Iterable[float] = None) -> Histogram:
+        """
+        Method to get a histogram, registering it in case it does not exist
+
+        :param name: Name of the metric
+        :param help: Description of the metric
+        :param buckets: Upper bounds of the buckets. Defaults to the buckets of :class:`Histogram`
+        :return: The :class:`Histogram`
+        """
+        return self._add(Histogram(name, help) if buckets is None else Histogram(name, help, buckets))
+
+    def unregister(self, name: str) -> None:
+        """
+        Method to remove a metric
+
+        :param name: Name of the metric
+        """
+        del self._metrics[name]
+
+    def __iter__(self):
+        return iter(self._metrics.values())
+
+    def render(self) -> str:
+        """
+        Method to render all the metrics
+
+        :return: Metrics in the Prometheus text format
+        """
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            if metric.help:
+                lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, value in metric.samples():
+                lines.append(f'{name} {value}')
+        lines.append('')
+        return '\n'.join(lines)
+
+    async def serve(self, hostname: str = '127.0.0.1', port: int = 9100, *, path: str = '/metrics') -> AbstractServer:
+        """
+        Coroutine to serve the metrics over HTTP, for Prometheus to scrape
+
+        :param hostname: Hostname to listen on. Defaults to ``127.0.0.1``
+        :param port: Port to listen on. Defaults to 9100
+        :param path: Path on which the metrics are served. Defaults to ``/metrics``
+        :return: The listening server, to be closed once the metrics are not to be served anymore
+        """
+        async def handle(reader: StreamReader, writer: StreamWriter) -> None:
+            try:
+                request_line: bytes = await reader.readline()
+                while (await reader.readline()).strip():
+                    pass
+                parts: list[str] = request_line.decode('latin-1').split()
+                if len(parts) >= 2 and parts[0] in ('GET', 'HEAD') and parts[1].split('?')[0] == path:
+                    status: str = '200 OK'
+                    body: bytes = self.render().encode() if parts[0] == 'GET' else b''
+                else:
+                    status = '404 Not Found'
+                    body = b''
+                writer.write(
+                    f'HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n'
+                    f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode() + body
+                )
+                await writer.drain()
+            finally:
+                writer.close()
+
+        return await start_server(handle, hostname, port)
+
+
+class RakNetMetrics:
+    """
+    Metrics of a server, registered in a :class:`MetricsRegistry`.
+    The server, its socket, handler and connections update them as they go.
+
+    :param registry: Registry in which the metrics are registered. A new one is created in case it is not provided
+    """
+
+    __slots__ = ('registry', 'datagrams_received', 'bytes_received', 'receive_errors', 'datagrams_sent', 'bytes_sent',
+                 'send_errors', 'datagrams_dropped', 'handshakes', 'handshakes_rejected', 'disconnects', 'nacks_received',
+                 'resent_datagrams', 'resent_frames', 'fragments_expired', 'connections', 'tick_duration', 'loop_lag',
+                 'receive_backlog', 'send_queue_depth', 'overload_warnings', 'queueing_latency', 'unreachable_errors',
+                 'unreachable_disconnects', 'offload_backlog', 'offload_dropped')
+
+    def __init__(self, registry: MetricsRegistry = None):
+        self.registry: MetricsRegistry = registry if registry is not None else MetricsRegistry()
+        """:class:`MetricsRegistry` in which the metrics are registered"""
+        counter = self.registry.counter
+        self.datagrams_received: Counter = counter('raknet_datagrams_received_total', 'Datagrams received by the socket')
+        self.bytes_received: Counter = counter('raknet_bytes_received_total', 'Bytes received by the socket')
+        self.receive_errors: Counter = counter('raknet_receive_errors_total', 'Errors raised receiving from the socket')
+        self.datagrams_sent: Counter = counter('raknet_datagrams_sent_total', 'Datagrams sent by the socket')
+        self.bytes_sent: Counter = counter('raknet_bytes_sent_total', 'Bytes sent by the socket')
+        self.send_errors: Counter = counter('raknet_send_errors_total', 'Errors raised sending through the socket')
+        self.datagrams_dropped: Counter = counter('raknet_datagrams_dropped_total', 'Datagrams dropped by the access control')
+        self.handshakes: Counter = counter('raknet_handshakes_total', 'Connections opened')
+        self.handshakes_rejected: Counter = counter(
+            'raknet_handshakes_rejected_total', 'Connection requests rejected for their protocol version or MTU-Size'
+        )
+        self.disconnects: Counter = counter('raknet_disconnects_total', 'Connections closed')
+        self.unreachable_errors: Counter = counter(
+            'raknet_unreachable_errors_total', 'ICMP errors reporting a peer unreachable, read from the error queue of the socket'
+        )
+        self.unreachable_disconnects: Counter = counter(
+            'raknet_unreachable_disconnects_total', 'Connections closed as their peer was reported unreachable'
+        )
+        self.nacks_received: Counter = counter('raknet_nacks_received_total', 'Sent frame sets reported missing by peers')
+        self.resent_datagrams: Counter = counter('raknet_resent_datagrams_total', 'Frame sets sent to resend reliable frames')
+        self.resent_frames: Counter = counter('raknet_resent_frames_total', 'Reliable frames resent')
+        self.fragments_expired: Counter = counter(
+            'raknet_fragments_expired_total', 'Fragmented packets discarded before all their fragments arrived'
+        )
+        self.connections: Gauge = self.registry.gauge('raknet_connections', 'Open connections')
+        self.tick_duration: Histogram = self.registry.histogram(
+            'raknet_tick_duration_seconds', 'Time taken by a server tick',
+            (.0001, .00025, .0005, .001, .0025, .005, .01, .025, .05, .1)
+        )
+        self.offload_backlog: Gauge = self.registry.gauge(
+            'raknet_offload_backlog', 'Frames submitted to the frame offloaders whose results are yet to be delivered'
+        )
+        self.offload_dropped: Counter = counter(
+            'raknet_offload_dropped_total', 'Frames dropped as their connection had too many frames waiting in a frame offloader'
+        )
+        self.loop_lag: Histogram = self.registry.histogram(
+            'raknet_loop_lag_seconds', 'Delay of the event loop in waking up the loop monitor',
+            (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1)
+        )
+        self.receive_backlog: Gauge = self.registry.gauge(
+            'raknet_receive_backlog_bytes', 'Bytes waiting in the receive buffer of the socket, sampled by the loop monitor'
+        )
+        self.send_queue_depth: Gauge = self.registry.gauge(
+            'raknet_send_queue_depth', 'Datagrams waiting in the send queue of the socket, sampled by the loop monitor'
+        )
+        self.overload_warnings: Counter = counter('raknet_overload_warnings_total', 'Overload warnings of the loop monitor')
+        self.queueing_latency: Histogram = self.registry.histogram(
+            'raknet_queueing_latency_seconds', 'Time received datagrams waited in the process, for sockets with timestamps',
+            (.0001, .00025, .0005, .001, .0025, .005, .01, .025, .05, .1)
+        )
@@ -0,0 +1,242 @@
+from __future__ import annotations
+import logging
+import time
+from asyncio import CancelledError, Task, sleep
+from typing import TYPE_CHECKING, Any, Callable
+from .profiler import Stage
+from .utils import ReadOnly as _ReadOnly
+if TYPE_CHECKING:
+    from .connection import Connection
+    from .server import Server
+
+__all__ = 'Overload', 'OverloadWarning', 'LoopMonitor'
+
+
+logger: logging.Logger = logging.getLogger('rak_net.monitor')
+"""Logger of the overload warnings, each record carries its :class:`OverloadWarning` as the ``overload`` attribute"""
+
+
+class Overload(_ReadOnly):
+    """
+    Enum for the kinds of overload detected by a :class:`LoopMonitor`
+    """
+    # The event loop woke the monitor up late, every other task is delayed as much
+    LOOP_LAG: str = 'loop_lag'
+    # A tick took longer than the time between ticks allows
+    TICK_OVERRUN: str = 'tick_overrun'
+    # Received data piles up in the socket faster than it is handled
+    RECEIVE_BACKLOG: str = 'receive_backlog'
+    # Datagrams pile up in the send queue faster than the socket takes them
+    SEND_BACKLOG: str = 'send_backlog'
+
+
+class OverloadWarning:
+    """
+    Structured warning of a :class:`LoopMonitor`, along with the likely culprits
+
+    :param kind: Kind of overload, one of :class:`Overload`
+    :param value: Measured value
+    :param threshold: Threshold the value exceeded
+    :param connections: Busiest connections since the previous warning, as ``(address, datagrams)`` tuples
+    :param callbacks: Slowest listener callbacks recorded by the profiler of the server, as returned by :meth:`rak_net.profiler.Profiler.slowest`
+    """
+
+    __slots__ = 'kind', 'value', 'threshold', 'timestamp', 'connections', 'callbacks'
+
+    def __init__(self, kind: str, value: float, threshold: float, connections: list[tuple[str, int]],
+                 callbacks: list[tuple[int, str, str, float]]):
+        self.kind: str = kind
+        self.value: float = value
+        self.threshold: float = threshold
+        self.timestamp: float = time.time()
+        """Time (in seconds since the epoch) of the warning"""
+        self.connections: list[tuple[str, int]] = connections
+        self.callbacks: list[tuple[int, str, str, float]] = callbacks
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        Method to convert the warning for structured logs
+
+        :return: Dictionary of the fields of the warning, serializable as JSON
+        """
+        return {
+            'kind': self.kind,
+            'value': self.value,
+            'threshold': self.threshold,
+            'timestamp': self.timestamp,
+            'connections': [{'address': address, 'datagrams': datagrams} for address, datagrams in self.connections],
+            'callbacks': [{'duration_ns': duration, 'stage': stage, 'detail': detail}
+                          for duration, stage, detail, _ in self.callbacks],
+        }
+
+    def __str__(self):
+        text: str = f'{self.kind} {self.value:g} exceeds {self.threshold:g}'
+        if self.connections:
+            text += '; busiest connections: ' + ', '.join(f'{address} ({datagrams})' for address, datagrams in self.connections)
+        if self.callbacks:
+            text += '; slowest: ' + ', '.join(f'{stage} {detail} ({duration / 1e6:.1f} ms)'
+                                             for duration, stage, detail, _ in self.callbacks)
+        return text
+
+    def __repr__(self):
+        return f'<OverloadWarning: {self.kind} {self.value:g} > {self.threshold:g}>'
+
+
+class LoopMonitor:
+    """
+    Task watching a server for signs of running out of capacity, before its ticks stretch and clients time out.
+    Every interval it measures how late the event loop woke it up, the longest tick against the time between ticks,
+    the data waiting in the receive buffer of the socket and the datagrams waiting in its send queue.
+    Measurements are exposed as metrics of the server, and those over their threshold raise an :class:`OverloadWarning`,
+    logged to :data:`logger` and passed to the warning callback, naming the busiest connections and the slowest callbacks.
+
+    It costs a wake-up per interval and a comparison per tick, so it can be left running::
+
+        monitor = server.start_monitor(lag_threshold=0.02)
+
+    :param server: Server to be watched
+    :param interval: Interval (in seconds) between measurements. Defaults to 0.5
+    :param lag_threshold: Delay (in seconds) of the loop above which a warning is raised. Defaults to 0.05
+    :param tick_threshold: Fraction of the time between ticks a tick may take before a warning is raised. Defaults to 1
+    :param receive_backlog_threshold: Bytes waiting in the receive buffer above which a warning is raised. Defaults to 262144
+    :param send_backlog_threshold: Datagrams waiting in the send queue above which a warning is raised. Defaults to 1000
+    :param cooldown: Period (in seconds) during which a kind of warning is not raised again. Defaults to 10
+    :param top: Number of connections and callbacks named in a warning. Defaults to 5
+    :param profile_on_warning: Whether to enable the profiler of the server on a warning, so the next ones name the slowest callbacks. Defaults to False
+    :param on_warning: Function called with every :class:`OverloadWarning`
+    """
+
+    __slots__ = ('server', 'interval', 'lag_threshold', 'tick_threshold', 'receive_backlog_threshold', 'send_backlog_threshold',
+                 'cooldown', 'top', 'profile_on_warning', 'on_warning', 'warnings', 'lag', 'max_tick_duration',
+                 'receive_backlog', 'send_queue_depth', '_tick_duration', '_last_warnings', '_traffic', '_task')
+
+    def __init__(self, server: Server, *, interval: float = 0.5, lag_threshold: float = 0.05, tick_threshold: float = 1.0,
+                 receive_backlog_threshold: int = 262144, send_backlog_threshold: int = 1000, cooldown: float = 10,
+                 top: int = 5, profile_on_warning: bool = False, on_warning: Callable[[OverloadWarning], Any] = None):
+        self.server: Server = server
+        self.interval: float = interval
+        self.lag_threshold: float = lag_threshold
+        self.tick_threshold: float = tick_threshold
+        self.receive_backlog_threshold: int = receive_backlog_threshold
+        self.send_backlog_threshold: int = send_backlog_threshold
+        self.cooldown: float = cooldown
+        self.top: int = top
+        self.profile_on_warning: bool = profile_on_warning
+        self.on_warning: Callable[[OverloadWarning], Any] | None = on_warning
+        self.warnings: int = 0
+        """Number of warnings raised"""
+        self.lag: float = 0.0
+        """Latest delay (in seconds) of the event loop"""
+        self.max_tick_duration: float = 0.0
+        """Longest tick (in seconds) of the latest interval"""
+        self.receive_backlog: int | None = None
+        """Latest number of bytes waiting in the receive buffer, ``None`` in case the socket cannot tell"""
+        self.send_queue_depth: int = 0
+        """Latest number of datagrams waiting in the send queue"""
+        self._tick_duration: float = 0.0
+        self._last_warnings: dict[str, float] = {}
+        self._traffic: dict[str, int] = {}
+        self._task: Task | None = None
+
+    def observe_tick(self, duration: float) -> None:
+        """
+        Method called by the server with the duration of every tick
+
+        :param duration: Duration (in seconds) of the tick
+        """
+        if duration > self._tick_duration:
+            self._tick_duration = duration
+
+    def start(self) -> None:
+        """
+        Method to start the monitor task on the loop of the server
+        """
+        if self._task is None:
+            self._task = self.server._loop.create_task(self._run())
+
+    def stop(self) -> None:
+        """
+        Method to stop the monitor task
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                expected: float = time.perf_counter() + self.interval
+                await sleep(self.interval)
+                self.check(max(0.0, time.perf_counter() - expected))
+        except CancelledError:
+            pass
+
+    def check(self, lag: float) -> list[OverloadWarning]:
+        """
+        Method taking the measurements of an interval and raising the warnings due
+
+        :param lag: Delay (in seconds) with which the loop woke the monitor up
+        :return: Warnings raised
+        """
+        metrics = self.server.metrics
+        self.lag = lag
+        metrics.loop_lag.observe(lag)
+        self.max_tick_duration, self._tick_duration = self._tick_duration, 0.0
+        self.receive_backlog = self.server.socket.receive_backlog()
+        if self.receive_backlog is not None:
+            metrics.receive_backlog.set(self.receive_backlog)
+        self.send_queue_depth = self.server.socket.send_queue_depth
+        metrics.send_queue_depth.set(self.send_queue_depth)
+        exceeded: list[tuple[str, float, float]] = []
+        if lag > self.lag_threshold:
+            exceeded.append((Overload.LOOP_LAG, lag, self.lag_threshold))
+        tick_budget: float = self.server.tick_sleep_time * self.tick_threshold
+        if self.max_tick_duration > tick_budget:
+            exceeded.append((Overload.TICK_OVERRUN, self.max_tick_duration, tick_budget))
+        if self.receive_backlog is not None and self.receive_backlog > self.receive_backlog_threshold:
+            exceeded.append((Overload.RECEIVE_BACKLOG, self.receive_backlog, self.receive_backlog_threshold))
+        if self.send_queue_depth > self.send_backlog_threshold:
+            exceeded.append((Overload.SEND_BACKLOG, self.send_queue_depth, self.send_backlog_threshold))
+        now: float = time.monotonic()
+        exceeded = [item for item in exceeded if now - self._last_warnings.get(item[0], -self.cooldown) >= self.cooldown]
+        if not exceeded:
+            return []
+        connections: list[tuple[str, int]] = self.busiest_connections()
+        profiler = self.server.profiler
+        callbacks: list[tuple[int, str, str, float]] = [
+            event for event in profiler.slowest() if event[1] == Stage.CALLBACK
+        ][:self.top] if profiler.enabled else []
+        raised: list[OverloadWarning] = []
+        for kind, value, threshold in exceeded:
+            self._last_warnings[kind] = now
+            warning: OverloadWarning = OverloadWarning(kind, value, threshold, connections, callbacks)
+            raised.append(warning)
+            self.warnings += 1
+            metrics.overload_warnings.inc()
+            logger.warning('Server overloaded: %s', warning, extra={'overload': warning})
+            if self.on_warning is not None:
+                self.on_warning(warning)
+        if self.profile_on_warning and not profiler.enabled:
+            profiler.reset()
+            profiler.enable()
+        return raised
+
+    def busiest_connections(self) -> list[tuple[str, int]]:
+        """
+        Method to rank the connections by the datagrams they received and sent since the previous ranking
+
+        :return: The :attr:`top` busiest connections, as ``(address, datagrams)`` tuples
+        """
+        traffic: dict[str, int] = {}
+        deltas: list[tuple[int, str]] = []
+        connection: Connection
+        for token, connection in self.server.connections.items():
+            total: int = connection.stats.datagrams_in + connection.stats.datagrams_out
+            traffic[token] = total
+            deltas.append((total - self._traffic.get(token, 0), token))
+        self._traffic = traffic
+        deltas.sort(reverse=True)
+        return [(token, delta) for delta, token in deltas[:self.top]]
+
+    def __repr__(self):
+        return f'<LoopMonitor: lag={self.lag * 1000:.1f}ms warnings={self.warnings}>'
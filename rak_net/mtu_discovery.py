@@ -0,0 +1,81 @@
+from __future__ import annotations
+from typing import Iterable
+from .protocol.packet import protocol_packets
+from .protocol import ProtocolInfo
+
+__all__ = 'MtuDiscovery',
+
+
+class MtuDiscovery:
+    """
+    Client-side path MTU discovery for the handshake.
+    `Open-Connection-Request-1` is padded up to the MTU-Size being probed, so it only reaches the server
+    in case the path carries datagrams of that size. Each size is tried a few times before falling back
+    to the next smaller one, and the first reply settles the MTU-Size of the connection.
+
+    It does no IO of its own: :meth:`next_request` is called whenever a request is due
+    (initially and after every unanswered interval) and :meth:`handle_reply` with the reply of the server.
+
+    :param protocol_version: Protocol Version for Rak-Net
+    :param sizes: MTU-Sizes to probe, largest first. Defaults to the sizes fitting 1492, 1200 and 576 byte IPv4 links
+    :param attempts: Number of requests sent for each size before falling back to the next one. Defaults to 4
+    """
+
+    __slots__ = 'protocol_version', 'sizes', 'attempts', 'mtu_size', '_index', '_attempt'
+
+    def __init__(self, protocol_version: int, sizes: Iterable[int] = (1446, 1154, 530), *, attempts: int = 4):
+        self.protocol_version: int = protocol_version
+        """Protocol-Version sent in the requests"""
+        self.sizes: tuple[int, ...] = tuple(sorted(sizes, reverse=True))
+        """MTU-Sizes to probe, largest first"""
+        self.attempts: int = attempts
+        """Number of requests sent for each size"""
+        self.mtu_size: int | None = None
+        """MTU-Size settled on, ``None`` until a reply is handled"""
+        self._index: int = 0
+        self._attempt: int = 0
+
+    @property
+    def probe_size(self) -> int | None:
+        """MTU-Size currently being probed, ``None`` once every size was tried"""
+        return self.sizes[self._index] if self._index < len(self.sizes) else None
+
+    @property
+    def done(self) -> bool:
+        """Whether the MTU-Size is settled"""
+        return self.mtu_size is not None
+
+    def next_request(self) -> bytes | None:
+        """
+        Method to get the next request to be sent
+
+        :return: Encoded `Open-Connection-Request-1`, ``None`` in case the discovery is done or every size was tried
+        """
+        if self.mtu_size is not None:
+            return None
+        if self._attempt == self.attempts:
+            self._index += 1
+            self._attempt = 0
+        size: int | None = self.probe_size
+        if size is None:
+            return None
+        self._attempt += 1
+        packet: protocol_packets.OpenConnectionRequest1 = protocol_packets.OpenConnectionRequest1()
+        packet.magic = ProtocolInfo.MAGIC
+        packet.protocol_version = self.protocol_version
+        packet.mtu_size = size
+        packet.encode()
+        return packet.data
+
+    def handle_reply(self, data: bytes) -> int:
+        """
+        Method to handle `Open-Connection-Reply-1`
+
+        :param data: Data of the reply
+        :return: MTU-Size settled on
+        """
+        packet: protocol_packets.OpenConnectionReply1 = protocol_packets.OpenConnectionReply1(data)
+        packet.decode()
+        # The server derives the size from the padding which got through, capped by its own limit
+        self.mtu_size = min(packet.mtu_size, self.sizes[0])
+        return self.mtu_size
@@ -0,0 +1,156 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Callable
+from asyncio import Task, wrap_future, iscoroutinefunction
+from collections import deque
+from concurrent.futures import Executor, Future as _ConcurrentFuture
+from .frame import Frame
+from .inbound import InboundOverflow
+if TYPE_CHECKING:
+    from .connection import Connection
+    from .server import Server
+
+__all__ = 'FrameOffloader',
+
+
+class FrameOffloader:
+    """
+    Runs a frame handler in a :class:`concurrent.futures.ThreadPoolExecutor` or :class:`concurrent.futures.ProcessPoolExecutor`,
+    keeping CPU-heavy work off the event loop so the network loop keeps receiving and acknowledging.
+
+    The handler is called with the frame body (``bytes``, passed to thread pools without copying) and may return
+    ``None``, a reply as ``bytes`` or a list of replies. Replies are queued to the owning connection on the loop thread,
+    in the order the frames were received by the connection.
+    For a :class:`concurrent.futures.ProcessPoolExecutor` the handler must be picklable, i.e. a module-level function.
+
+    :param server: Server for which the offloader is intended
+    :param function: Handler to run in the executor
+    :param executor: Executor to run the handler in
+    :param reliability: Reliability of the reply frames. Defaults to 0
+    :param order_channel: Order channel of the reply frames. Defaults to 0
+    :param on_result: Optional callback, or coroutine function, called on the loop thread as ``on_result(connection, result)``
+        instead of queueing the result as replies
+    :param serial: Whether frames of a connection are handled one after another instead of concurrently. Defaults to False
+    :param queue_size: Maximum number of frames of a connection waiting for their results, 0 for no limit. Defaults to 1024
+    :param overflow: Behaviour when a connection has `queue_size` frames waiting, one of :class:`rak_net.inbound.InboundOverflow`.
+        Defaults to ``InboundOverflow.DROP_NEWEST``
+    """
+
+    __slots__ = ('server', 'function', 'executor', 'reliability', 'order_channel', 'serial', 'queue_size', 'overflow',
+                 'dropped', '_on_result', '_on_result_is_async', '_pending', '_disconnecting', '_tasks')
+
+    def __init__(self, server: Server, function: Callable[[bytes], Any], executor: Executor, *, reliability: int = 0,
+                 order_channel: int = 0, on_result: Callable = None, serial: bool = False, queue_size: int = 1024,
+                 overflow: str = InboundOverflow.DROP_NEWEST):
+        if overflow not in InboundOverflow:
+            raise ValueError(f"Unknown overflow behaviour {overflow!r}")
+        self.server: Server = server
+        self.function: Callable[[bytes], Any] = function
+        """Handler run in the executor"""
+        self.executor: Executor = executor
+        """Executor the handler is run in"""
+        self.reliability: int = reliability
+        """Reliability of the reply frames"""
+        self.order_channel: int = order_channel
+        """Order channel of the reply frames"""
+        self.serial: bool = serial
+        """Whether frames of a connection are handled one after another"""
+        self.queue_size: int = queue_size
+        """Maximum number of frames of a connection waiting for their results, 0 for no limit"""
+        self.overflow: str = overflow
+        """Behaviour when a connection has too many frames waiting"""
+        self.dropped: int = 0
+        """Number of frames dropped due to overflow, across all connections"""
+        self._on_result: Callable | None = on_result
+        self._on_result_is_async: bool = iscoroutinefunction(on_result)
+        self._pending: dict[Connection, deque] = {}
+        self._disconnecting: set[Connection] = set()
+        self._tasks: set[Task] = set()
+
+    @property
+    def pending(self) -> int:
+        """Number of frames submitted whose results are yet to be delivered"""
+        return sum(len(items) for items in self._pending.values())
+
+    def submit(self, connection: Connection, payload: bytes) -> None:
+        """
+        Method to submit a frame body of a connection to the handler
+
+        :param connection: Connection which received the frame
+        :param payload: Body of the frame
+        """
+        if connection in self._disconnecting:
+            return
+        items: deque | None = self._pending.get(connection)
+        if items is None:
+            items = self._pending[connection] = deque()
+            self._spawn(self._deliver(connection, items))
+        elif self.queue_size and len(items) >= self.queue_size:
+            self.dropped += 1
+            self.server.metrics.offload_dropped.inc()
+            # The first frame is being handled, only those after it can be dropped
+            if self.overflow == InboundOverflow.DROP_OLDEST and len(items) > 1:
+                _discard(items[1])
+                del items[1]
+            else:
+                if self.overflow == InboundOverflow.DISCONNECT and connection.address.token in self.server.connections:
+                    while len(items) > 1:
+                        _discard(items.pop())
+                    # Frames arriving until the connection is removed are dropped, rather than overflowing it again
+                    self._disconnecting.add(connection)
+                    self._spawn(self._disconnect(connection))
+                return
+        items.append(payload if self.serial else self.executor.submit(self.function, payload))
+
+    def _spawn(self, coroutine) -> None:
+        task: Task = self.server._loop.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _disconnect(self, connection: Connection) -> None:
+        try:
+            await connection.disconnect()
+        finally:
+            self._disconnecting.discard(connection)
+
+    async def _deliver(self, connection: Connection, items: deque) -> None:
+        try:
+            while items:
+                item: bytes | _ConcurrentFuture = items[0]
+                if not isinstance(item, _ConcurrentFuture):
+                    item = self.executor.submit(self.function, item)
+                try:
+                    result: Any = await wrap_future(item)
+                except Exception as e:
+                    self.server._loop.call_exception_handler({
+                        'message': f'Exception in offloaded frame handler of {connection!r}',
+                        'exception': e,
+                    })
+                else:
+                    if connection.address.token in self.server.connections:
+                        await self._route(connection, result)
+                items.popleft()
+        finally:
+            del self._pending[connection]
+
+    async def _route(self, connection: Connection, result: Any) -> None:
+        if self._on_result is not None:
+            if self._on_result_is_async:
+                await self._on_result(connection, result)
+            else:
+                self._on_result(connection, result)
+        elif result is not None:
+            for body in ((result,) if isinstance(result, (bytes, bytearray)) else result):
+                await connection.add_to_queue(Frame(reliability=self.reliability, order_channel=self.order_channel, body=bytes(body)))
+
+    def close(self) -> None:
+        """
+        Method to cancel delivery of all pending results. The executor is not shut down.
+        """
+        for task in list(self._tasks):
+            task.cancel()
+
+
+def _discard(item: bytes | _ConcurrentFuture) -> None:
+    if isinstance(item, _ConcurrentFuture):
+        # Frames already running in the executor run to completion, their results are ignored
+        item.cancel()
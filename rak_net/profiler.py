@@ -0,0 +1,142 @@
+from __future__ import annotations
+import signal
+from asyncio import AbstractEventLoop, get_event_loop
+from heapq import heappush, heapreplace
+from time import perf_counter_ns, time
+from .metrics import Histogram, MetricsRegistry
+from .utils import ReadOnly as _ReadOnly
+
+__all__ = 'Stage', 'Profiler'
+
+
+class Stage(_ReadOnly):
+    """
+    Enum for the stages of the hot path timed by a :class:`Profiler`
+    """
+    # Handoff of a received datagram from the socket to the event loop
+    RECEIVE: str = 'receive'
+    # Handling of a received datagram by the server, from the socket to the connection
+    DISPATCH: str = 'dispatch'
+    # Decoding of a frame set
+    DECODE: str = 'decode'
+    # Handling of a decoded frame by the connection
+    HANDLE_FRAME: str = 'handle_frame'
+    # Listener callbacks for an event
+    CALLBACK: str = 'callback'
+    # Encoding of a frame set
+    ENCODE: str = 'encode'
+    # Sending of a datagram through the socket
+    SEND: str = 'send'
+
+
+class Profiler:
+    """
+    Profiler timing the stages of the hot path into histograms, and keeping the slowest events.
+    It is disabled by default. Instrumented code only checks :attr:`enabled` while it is disabled,
+    so it can be left in place and switched on when needed, with :meth:`toggle` or a signal (see :meth:`install_signal_handler`).
+
+    :param slowest: Number of slowest events kept. Defaults to 20
+    :param registry: :class:`rak_net.metrics.MetricsRegistry` in which the histograms are registered, so they are exposed with the other metrics
+    """
+
+    __slots__ = 'enabled', 'histograms', 'slowest_count', '_slowest', '_counter'
+
+    buckets: tuple[int, ...] = (
+        1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000, 25_000_000
+    )
+    """Upper bounds (in nanoseconds) of the buckets of the histograms"""
+
+    def __init__(self, *, slowest: int = 20, registry: MetricsRegistry = None):
+        self.enabled: bool = False
+        """Whether the stages are being timed"""
+        self.histograms: dict[str, Histogram] = {}
+        """:class:`rak_net.metrics.Histogram` of durations (in nanoseconds) for every :class:`Stage`"""
+        for stage in Stage.__members__.values():
+            name: str = f'raknet_stage_{stage}_nanoseconds'
+            help: str = f'Duration of the {stage} stage, while profiling'
+            self.histograms[stage] = Histogram(name, help, self.buckets) if registry is None else registry.histogram(name, help, self.buckets)
+        self.slowest_count: int = slowest
+        """Number of slowest events kept"""
+        self._slowest: list[tuple[int, int, str, str, float]] = []
+        self._counter: int = 0
+
+    def enable(self) -> None:
+        """
+        Method to start timing the stages
+        """
+        self.enabled = True
+
+    def disable(self) -> None:
+        """
+        Method to stop timing the stages
+        """
+        self.enabled = False
+
+    def toggle(self) -> bool:
+        """
+        Method to switch the profiler on or off
+
+        :return: Whether the profiler is enabled now
+        """
+        self.enabled = not self.enabled
+        return self.enabled
+
+    def install_signal_handler(self, signum: int = None, loop: AbstractEventLoop = None) -> None:
+        """
+        Method to toggle the profiler whenever the process receives a signal. Only available on Unix
+
+        :param signum: Signal toggling the profiler. Defaults to ``SIGUSR1``
+        :param loop: Loop on which the signal is handled. Uses :func:`asyncio.get_event_loop` in case no loop is provided
+        """
+        loop = loop if loop is not None else get_event_loop()
+        loop.add_signal_handler(signal.SIGUSR1 if signum is None else signum, self.toggle)
+
+    def record(self, stage: str, start: int, detail: str = '') -> None:
+        """
+        Method to record the duration of a stage, up to now
+
+        :param stage: Stage timed, one of :class:`Stage`
+        :param start: Time (from :func:`time.perf_counter_ns`) at which the stage started
+        :param detail: Description of the event, kept along with the slowest events
+        """
+        duration: int = perf_counter_ns() - start
+        self.histograms[stage].observe(duration)
+        if len(self._slowest) < self.slowest_count:
+            self._counter += 1
+            heappush(self._slowest, (duration, self._counter, stage, detail, time()))
+        elif self._slowest and duration > self._slowest[0][0]:
+            self._counter += 1
+            heapreplace(self._slowest, (duration, self._counter, stage, detail, time()))
+
+    def slowest(self) -> list[tuple[int, str, str, float]]:
+        """
+        Method to get the slowest events recorded
+
+        :return: List of ``(duration, stage, detail, timestamp)`` tuples, slowest first. Durations are in nanoseconds
+        """
+        return [(duration, stage, detail, timestamp) for duration, _, stage, detail, timestamp in sorted(self._slowest, reverse=True)]
+
+    def reset(self) -> None:
+        """
+        Method to clear the histograms and slowest events
+        """
+        for histogram in self.histograms.values():
+            histogram.counts = [0] * len(histogram.counts)
+            histogram.sum = 0
+            histogram.count = 0
+        self._slowest.clear()
+
+    def dump(self) -> str:
+        """
+        Method to summarise the recorded stages
+
+        :return: Text report of the count and mean duration of every stage, followed by the slowest events
+        """
+        lines: list[str] = ['stage          count      mean (us)']
+        for stage, histogram in self.histograms.items():
+            mean: float = histogram.sum / histogram.count / 1000 if histogram.count else 0.0
+            lines.append(f'{stage:<14} {histogram.count:<10} {mean:.2f}')
+        lines.append('slowest events:')
+        for duration, stage, detail, timestamp in self.slowest():
+            lines.append(f'{duration / 1000:>10.1f} us  {stage:<14} {detail}')
+        return '\n'.join(lines)
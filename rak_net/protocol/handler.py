@@ -113,25 +113,32 @@ class Handler:
         new_packet.encode()
         return new_packet.data
 
-    async def handle_open_connection_request_1(self, data: bytes, address: InternetAddress = None, *, server: Server = None) -> bytes:
+    async def handle_open_connection_request_1(self, data: bytes, address: InternetAddress = None, *, server: Server = None) -> bytes | None:
         """
-        Handler to handle `Open-Connection-Request-1`
+        Handler to handle `Open-Connection-Request-1`.
+        The MTU-Size, derived from the padding of the request, is clamped by :meth:`Server.clamp_mtu_size`
 
         :param data: data of the packet
         :param address: :class:`InternetAddress` of the packet
         :param server: Optional server to use the handler with, defaults to ``self.handler``
-        :return: returns the processed data
+        :return: returns the processed data, ``None`` in case the request is too small to be answered
         """
         server = server or self.server
         packet: OpenConnectionRequest1 = OpenConnectionRequest1(data)
         packet.decode()
         if packet.protocol_version == server.protocol_version:
+            mtu_size: int | None = server.clamp_mtu_size(packet.mtu_size)
+            if mtu_size is None:
+                # Clients probe descending sizes, only the ones passing the minimum get a reply
+                server.metrics.handshakes_rejected.inc()
+                return None
             new_packet: OpenConnectionReply1 = OpenConnectionReply1()
             new_packet.magic = ProtocolInfo.MAGIC
             new_packet.server_guid = server.guid
             new_packet.use_security = False
-            new_packet.mtu_size = packet.mtu_size
+            new_packet.mtu_size = mtu_size
         else:
+            server.metrics.handshakes_rejected.inc()
             new_packet: IncompatibleProtocolVersion = IncompatibleProtocolVersion()
             new_packet.protocol_version = server.protocol_version
             new_packet.magic = ProtocolInfo.MAGIC
@@ -139,24 +146,30 @@ class Handler:
         new_packet.encode()
         return new_packet.data
 
-    async def handle_open_connection_request_2(self, data: bytes, address: InternetAddress = None, *, server: Server = None) -> bytes:
+    async def handle_open_connection_request_2(self, data: bytes, address: InternetAddress = None, *, server: Server = None) -> bytes | None:
         """
-        Handler to handle `Open-Connection-Request-2`
+        Handler to handle `Open-Connection-Request-2`.
+        The MTU-Size requested is clamped by :meth:`Server.clamp_mtu_size`
 
         :param data: data of the packet
         :param address: :class:`InternetAddress` of the packet
         :param server: Optional server to use the handler with, defaults to ``self.handler``
-        :return: returns the processed data
+        :return: returns the processed data, ``None`` in case the requested MTU-Size is below the minimum
         """
         server = server or self.server
         packet: OpenConnectionRequest2 = OpenConnectionRequest2(data)
         packet.decode()
+        mtu_size: int | None = server.clamp_mtu_size(packet.mtu_size)
+        if mtu_size is None:
+            server.metrics.handshakes_rejected.inc()
+            return None
         new_packet: OpenConnectionReply2 = OpenConnectionReply2()
         new_packet.magic = ProtocolInfo.MAGIC
         new_packet.server_guid = server.guid
         new_packet.client_address = address
-        new_packet.mtu_size = packet.mtu_size
+        new_packet.mtu_size = mtu_size
         new_packet.use_encryption = False
         new_packet.encode()
-        await server.add_connection(address, packet.mtu_size)
+        await server.add_connection(address, mtu_size)
+        server.metrics.handshakes.inc()
         return new_packet.data
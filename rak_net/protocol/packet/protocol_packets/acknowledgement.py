@@ -31,6 +31,7 @@
 
 from binary_utils.binary_stream import binary_stream
 from ...packet import Packet
+from ....utils import SequenceTool
 
 
 class Acknowledgement(Packet):
@@ -41,6 +42,9 @@ class Acknowledgement(Packet):
     :param pos: Read-Write position for the stream
     """
 
+    max_range_size: int = 65536
+    """Largest range of sequence numbers accepted in a record, larger ones are ignored"""
+
     def __init__(self, data: bytes = b"", *, pos: int = 0):
         super().__init__(data, pos=pos)
         self.sequence_numbers: list[int] = []
@@ -56,9 +60,11 @@ class Acknowledgement(Packet):
             if not single:
                 index: int = self.read_unsigned_triad_le()
                 end_index: int = self.read_unsigned_triad_le()
-                while index <= end_index:
-                    self.sequence_numbers.append(index)
-                    index += 1
+                # Ranges may wrap around past 0xFFFFFF, oversized ones are ignored
+                length: int = SequenceTool.diff(end_index, index) + 1
+                if 0 < length <= self.max_range_size:
+                    for offset in range(length):
+                        self.sequence_numbers.append((index + offset) & SequenceTool.MASK)
             else:
                 self.sequence_numbers.append(self.read_unsigned_triad_le())
         
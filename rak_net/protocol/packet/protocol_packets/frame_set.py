@@ -64,8 +64,11 @@ class FrameSet(Packet):
         """
         self.write_unsigned_triad_le(self.sequence_number)
         for frame in self.frames:
-            frame.encode()
+            # Only the header is encoded per frame, the body is written as is so shared bodies are not copied twice
+            frame.data = b""
+            frame.encode_header()
             self.write(frame.data)
+            self.write(frame.body)
 
     @property
     def size(self) -> int:
@@ -43,7 +43,7 @@ class OpenConnectionReply2(Packet):
     """
 
     def __init__(self, data: bytes = b"", pos: int = 0) -> None:
-        super().__init__(data, pos)
+        super().__init__(data, pos=pos)
         self.packet_id: int = ProtocolInfo.OPEN_CONNECTION_REPLY_2
         self.magic: bytes = b""
         self.server_guid: int = 0
@@ -1,11 +1,25 @@
 from __future__ import annotations
 import sys
 import time
-from asyncio import Lock as _Lock, AbstractEventLoop as _AbstractEventLoop, get_event_loop, sleep, gather
+from time import perf_counter_ns
+from concurrent.futures import Executor
+from typing import Any, Callable, Iterable
+from asyncio import Lock as _Lock, AbstractEventLoop as _AbstractEventLoop, Task, get_event_loop
 from random import randint
-from .utils import InternetAddress
+from .utils import InternetAddress, TimerWheel
 from .socket import AsyncUDPSocket
+from .transport import Transport
+from .clock import Clock
 from .connection import Connection
+from .access_control import AccessControl
+from .inbound import InboundScheduler, InboundOverflow
+from .offload import FrameOffloader
+from .events import Event, EventListeners
+from .flush_policy import FlushPolicy, TickFlushPolicy
+from .metrics import RakNetMetrics
+from .monitor import LoopMonitor
+from .profiler import Profiler, Stage
+from .frame import Frame
 from .protocol import Handler, ProtocolInfo
 
 
@@ -24,52 +38,122 @@ class Server:
     :param tps: Ticks-Per-Second of the server
     :param lock: Lock for protecting resources, is an instance of :class:`asyncio.Lock`. In case it is not provided, a new instance would be created
     :param loop: Asyncio-Loop for the server, in case no loop is provided, :func:`asyncio.get_event_loop` would be used to obtaun the event loop
+    :param access_control: :class:`AccessControl` checked for every incoming datagram. In case it is not provided, a new instance allowing everything would be created
+    :param inbound_queue_size: Size of the per-connection inbound queues. In case it is 0, datagrams are handled inline by the receive loop. Defaults to 0
+    :param inbound_workers: Number of worker tasks draining the inbound queues, 0 spawns a task per connection. Defaults to 0
+    :param inbound_overflow: Behaviour when an inbound queue is full, one of :class:`rak_net.inbound.InboundOverflow`
+    :param flush_policy: Default :class:`rak_net.flush_policy.FlushPolicy` of the connections. Defaults to :class:`rak_net.flush_policy.TickFlushPolicy`
+    :param min_mtu_size: Smallest MTU-Size accepted in the handshake, connections requesting less are ignored. Defaults to 400
+    :param max_mtu_size: Largest MTU-Size granted, the limit of the interface the server is bound to. Defaults to 1464
+    :param metrics: :class:`rak_net.metrics.RakNetMetrics` updated by the server. In case it is not provided, a new instance with its own registry would be created
+    :param profiler: :class:`rak_net.profiler.Profiler` timing the hot path. In case it is not provided, a new disabled instance would be created
+    :param transport: :class:`rak_net.transport.Transport` of the server, bound by the server. In case it is not provided, a new :class:`AsyncUDPSocket` would be created
+    :param clock: :class:`rak_net.clock.Clock` measuring every timeout, resend and tick. In case it is not provided, a new instance reading the system clocks would be created
+    :param timestamps: Whether the :class:`AsyncUDPSocket` created for the server takes the arrival time of every datagram,
+        so round-trip times leave out the time datagrams wait in the process, which is recorded apart. Defaults to False
+    :param unreachable_strikes: Number of times the peer of a connection is reported unreachable by ICMP, with no data from it in between,
+        after which the connection is closed rather than pinged until it times out. 0 leaves the errors unread. Defaults to 3
     """
-    def __init__(self, protocol_version: int, hostname: str, port: int, *, ipv: int = 4, tps: int = 100, lock: _Lock = None, loop: _AbstractEventLoop = None):
+    def __init__(self, protocol_version: int, hostname: str, port: int, *, ipv: int = 4, tps: int = 100, lock: _Lock = None, loop: _AbstractEventLoop = None,
+                 access_control: AccessControl = None, inbound_queue_size: int = 0, inbound_workers: int = 0,
+                 inbound_overflow: str = InboundOverflow.DROP_NEWEST, flush_policy: FlushPolicy = None,
+                 min_mtu_size: int = 400, max_mtu_size: int = 1464, metrics: RakNetMetrics = None, profiler: Profiler = None,
+                 transport: Transport = None, clock: Clock = None, timestamps: bool = False,
+                 unreachable_strikes: int = 3):
         self.tick_sleep_time: float = 1/tps
+        self._loop = loop if loop is not None else get_event_loop()
+        self.clock: Clock = clock if clock is not None else Clock(self._loop)
+        """:class:`rak_net.clock.Clock` of the server"""
         self.protocol_version: int = protocol_version
         """Protocol-Version of the server"""
+        self.min_mtu_size: int = min_mtu_size
+        """Smallest MTU-Size accepted in the handshake"""
+        self.max_mtu_size: int = max_mtu_size
+        """Largest MTU-Size granted to a connection"""
         self.address: InternetAddress = InternetAddress(hostname, port, ipv)
         """:class:`InternetAddress` of the server"""
         self.guid: int = randint(0, sys.maxsize,)
         """GUID of the server"""
-        self.socket: AsyncUDPSocket = AsyncUDPSocket(True, ipv, hostname, port, loop=loop)
-        """Socket within the server"""
+        self.metrics: RakNetMetrics = metrics if metrics is not None else RakNetMetrics()
+        """:class:`rak_net.metrics.RakNetMetrics` of the server, :meth:`rak_net.metrics.MetricsRegistry.serve` exposes them over HTTP"""
+        self.metrics.connections.function = lambda: len(self.connections)
+        self.profiler: Profiler = profiler if profiler is not None else Profiler()
+        """:class:`rak_net.profiler.Profiler` of the server, disabled unless switched on"""
+        self.socket: Transport = transport if transport is not None else AsyncUDPSocket(
+            True, ipv, hostname, port, loop=loop, metrics=self.metrics, profiler=self.profiler, timestamps=timestamps,
+            unreachable=unreachable_strikes > 0
+        )
+        """Socket within the server, the :class:`rak_net.transport.Transport` datagrams go through"""
         self.connections: dict[str, Connection] = {}
-        self.start_time: int = int(time.time() * 1000)
+        self.start_time: int = int(self.clock.time() * 1000)
         """Start-Time of the server"""
-        self._loop = loop if loop is not None else get_event_loop()
         self._lock: _Lock = lock if lock is not None else _Lock()
         self.handler = Handler(self)
         """:class:`Handler` for the server"""
+        self.access_control: AccessControl = access_control if access_control is not None else AccessControl()
+        """:class:`AccessControl` for the server, datagrams from disallowed addresses are dropped before decoding"""
+        self.flush_policy: FlushPolicy = flush_policy if flush_policy is not None else TickFlushPolicy()
+        """Default :class:`rak_net.flush_policy.FlushPolicy` of the connections"""
+        self.timer_wheel: TimerWheel = TimerWheel(self.tick_sleep_time, self.clock.monotonic())
+        """:class:`rak_net.utils.TimerWheel` driving connection timeouts, pings and resends"""
+        self._dirty_connections: set[Connection] = set()
+        self.inbound: InboundScheduler | None = InboundScheduler(
+            self, inbound_queue_size, workers=inbound_workers, overflow=inbound_overflow
+        ) if inbound_queue_size > 0 else None
+        """:class:`rak_net.inbound.InboundScheduler` of the server, ``None`` in case datagrams are handled inline"""
+        self.offloaders: list[FrameOffloader] = []
+        """List of :class:`rak_net.offload.FrameOffloader` receiving application frames"""
+        self.metrics.offload_backlog.function = lambda: sum(offloader.pending for offloader in self.offloaders)
+        self.listeners: EventListeners = EventListeners()
+        """:class:`rak_net.events.EventListeners` of the server"""
+        self.monitor: LoopMonitor | None = None
+        """:class:`rak_net.monitor.LoopMonitor` of the server, ``None`` unless started with :meth:`start_monitor`"""
+        self.unreachable_strikes: int = unreachable_strikes
+        """Number of times the peer of a connection is reported unreachable after which the connection is closed, 0 in case it is never"""
+        if unreachable_strikes > 0:
+            self.socket.on_unreachable = self._on_unreachable
+        self._interface: Any = None
+        self._tick_task: Task | None = None
         self.socket.prime(self.address.hostname, self.address.port)
+        self.address.port = self.socket.address[1]
 
     def get_time_ms(self) -> int:
         """
         Get the time elapsed since server started in miliseconds
         :return: Returns the time elapsed (in miliseconds) since server staretd
         """
-        return int(time.time() * 1000) - self.start_time
+        return int(self.clock.time() * 1000) - self.start_time
+
+    def clamp_mtu_size(self, mtu_size: int) -> int | None:
+        """
+        Method to apply the MTU policy of the server to a requested MTU-Size
+
+        :param mtu_size: MTU-Size requested by a client
+        :return: MTU-Size granted, at most :attr:`max_mtu_size`. ``None`` in case it is below :attr:`min_mtu_size`
+        """
+        if mtu_size < self.min_mtu_size:
+            return None
+        return min(mtu_size, self.max_mtu_size)
 
     async def add_connection(self, address: InternetAddress, mtu_size: int) -> None:
         """
         Method to add a connection to the server
 
         :param address: :class:`InternetAddress` on which to add a connection
-        :param mtu_size:  MTU-Size of the connection
+        :param mtu_size:  MTU-Size of the connection, capped at :attr:`max_mtu_size`
         """
         async with self._lock:
-            self.connections[address.token] = Connection(address, mtu_size, self)
+            self.connections[address.token] = Connection(address, min(mtu_size, self.max_mtu_size), self)
 
     async def remove_connection(self, address: InternetAddress) -> Connection:
         """
         Method to remove the connection form the server
 
         :param address: :class:`InternetAddress` of the connection to be removed
-        :return: :class:`Connection` removed from the server
+        :return: :class:`Connection` removed from the server, ``None`` in case it was already removed
         """
         async with self._lock:
-            return self.connections.pop(address.token)
+            return self.connections.pop(address.token, None)
 
     async def get_connection(self, address: InternetAddress) -> Connection | None:
         """
@@ -90,36 +174,236 @@ class Server:
         """
         return await self.socket.send(data, address.hostname, address.port)
 
+    async def broadcast(self, payload: bytes, connections: Iterable[Connection] = None, *, reliability: int = 0, channel: int = 0) -> None:
+        """
+        Method to send the same payload to many connections.
+        The body is shared by the frames of all the connections and, in case it needs to be fragmented,
+        is split once for every distinct MTU-Size. Only the per-connection indices are assigned for each connection.
+
+        :param payload: Payload to be sent
+        :param connections: Connections to which the payload is to be sent, defaults to all the connections of the server
+        :param reliability: Reliability of the frames. Defaults to 0
+        :param channel: Order channel of the frames. Defaults to 0
+        """
+        body: bytes = bytes(payload)
+        frame_size: int = Frame(reliability=reliability, order_channel=channel, body=body).size
+        fragments_for_mtu: dict[int, list[bytes] | None] = {}
+        for connection in (list(self.connections.values()) if connections is None else connections):
+            mtu_size: int = connection.mtu_size
+            if mtu_size not in fragments_for_mtu:
+                fragments_for_mtu[mtu_size] = connection.split_body(body) if frame_size + 4 > mtu_size else None
+            await connection.add_to_queue(
+                Frame(reliability=reliability, order_channel=channel, body=body),
+                fragments=fragments_for_mtu[mtu_size]
+            )
+
+    def add_listener(self, event: str, callback: Callable) -> None:
+        """
+        Method to add a listener for an event of the server
+
+        :param event: Event to listen for, one of :class:`rak_net.events.Event`
+        :param callback: Function or coroutine function to be called on the event
+        """
+        self.listeners.add(event, callback)
+
+    def remove_listener(self, event: str, callback: Callable) -> None:
+        """
+        Method to remove a listener for an event of the server
+
+        :param event: Event for which the listener was added
+        :param callback: Callback of the listener
+        """
+        self.listeners.remove(event, callback)
+
+    def listen(self, event: str = None) -> Callable:
+        """
+        Decorator to add a listener for an event of the server
+
+        :param event: Event to listen for, defaults to the name of the decorated function
+        :return: Decorator adding the listener and returning the function as is
+        """
+        def decorator(callback: Callable) -> Callable:
+            self.add_listener(event or callback.__name__, callback)
+            return callback
+        return decorator
+
+    @property
+    def interface(self) -> Any:
+        """
+        Interface of the server. Setting an interface adds its ``on_new_incoming_connection``, ``on_frame``, ``on_frames``
+        and ``on_disconnect`` methods, those which exist, as listeners, replacing the listeners of the previous interface
+        """
+        return self._interface
+
+    @interface.setter
+    def interface(self, interface: Any) -> None:
+        if self._interface is not None:
+            for event in Event.__members__.values():
+                if hasattr(self._interface, event):
+                    self.listeners.remove(event, getattr(self._interface, event))
+        self._interface = interface
+        if interface is not None:
+            for event in Event.__members__.values():
+                if hasattr(interface, event):
+                    self.listeners.add(event, getattr(interface, event))
+
+    def offload(self, function: Callable[[bytes], Any], executor: Executor, **kwargs) -> FrameOffloader:
+        """
+        Method to register a frame handler run in an executor for every application frame
+
+        :param function: Handler called with the frame body in the executor
+        :param executor: A :class:`concurrent.futures.ThreadPoolExecutor` or :class:`concurrent.futures.ProcessPoolExecutor`
+        :param kwargs: Keyword arguments for :class:`rak_net.offload.FrameOffloader`
+        :return: The registered :class:`rak_net.offload.FrameOffloader`
+        """
+        offloader: FrameOffloader = FrameOffloader(self, function, executor, **kwargs)
+        self.offloaders.append(offloader)
+        return offloader
+
+    def remove_offloader(self, offloader: FrameOffloader) -> None:
+        """
+        Method to unregister a frame handler registered with :meth:`offload`
+
+        :param offloader: Offloader to be removed
+        """
+        self.offloaders.remove(offloader)
+        offloader.close()
+
+    def start_monitor(self, **kwargs) -> LoopMonitor:
+        """
+        Method to start watching the server for overload, replacing the previous monitor
+
+        :param kwargs: Keyword arguments for :class:`rak_net.monitor.LoopMonitor`
+        :return: The started :class:`rak_net.monitor.LoopMonitor`
+        """
+        self.stop_monitor()
+        self.monitor = LoopMonitor(self, **kwargs)
+        self.monitor.start()
+        return self.monitor
+
+    def stop_monitor(self) -> None:
+        """
+        Method to stop the monitor started with :meth:`start_monitor`
+        """
+        if self.monitor is not None:
+            self.monitor.stop()
+            self.monitor = None
+
+    def mark_dirty(self, connection: Connection) -> None:
+        """
+        Method to mark a connection as having data to be sent on the next tick
+
+        :param connection: Connection to be marked
+        """
+        self._dirty_connections.add(connection)
+
     async def tick(self) -> None:
         """
-        Method representing a `tick`
+        Method representing a `tick`.
+        Runs the expired timers of the :attr:`timer_wheel` and updates the connections marked as dirty.
         """
-        for connection in dict(self.connections).values():
-            await gather(connection.update())
+        start: float = time.perf_counter()
+        for timer in self.timer_wheel.advance(self.clock.monotonic()):
+            try:
+                await timer.callback(*timer.args)
+            except Exception as e:
+                # A failing timer, or a listener it dispatches to, must not stop the timers of the other connections
+                self._loop.call_exception_handler({
+                    'message': f'Exception in timer callback {timer.callback!r}',
+                    'exception': e,
+                })
+        now: float = self.clock.monotonic()
+        dirty: set[Connection] = self._dirty_connections
+        self._dirty_connections = set()
+        for connection in dirty:
+            try:
+                if connection.flush_policy.on_tick(connection, now, self.tick_sleep_time):
+                    await connection.update()
+                else:
+                    self._dirty_connections.add(connection)
+            except Exception as e:
+                self._loop.call_exception_handler({
+                    'message': f'Exception while updating {connection!r}',
+                    'exception': e,
+                })
+        duration: float = time.perf_counter() - start
+        self.metrics.tick_duration.observe(duration)
+        if self.monitor is not None:
+            self.monitor.observe_tick(duration)
+
+    @property
+    def frames_per_datagram(self) -> float:
+        """Average number of frames sent per frame set, across the current connections"""
+        frame_sets_sent: int = sum(connection.frame_sets_sent for connection in self.connections.values())
+        if not frame_sets_sent:
+            return 0.0
+        return sum(connection.frames_sent for connection in self.connections.values()) / frame_sets_sent
 
     async def _handle(self) -> None:
         recv: tuple = await self.socket.recieve()
         if recv[0]:
+            start: int = perf_counter_ns() if self.profiler.enabled else 0
+            await self._dispatch(recv)
+            if start:
+                self.profiler.record(Stage.DISPATCH, start, f'{recv[1][0]}:{recv[1][1]}')
+
+    async def _on_unreachable(self, address: tuple, error: int) -> None:
+        connection: Connection | None = self.connections.get(InternetAddress(address[0], address[1], self.address.version).token)
+        if connection is None:
+            return
+        connection.unreachable_strikes += 1
+        if connection.unreachable_strikes == self.unreachable_strikes:
+            # Nothing sent to the peer would arrive, including a notice of disconnection
+            self._dirty_connections.discard(connection)
+            self.metrics.unreachable_disconnects.inc()
+            await connection.drop()
+
+    async def _dispatch(self, recv: tuple) -> None:
+        if recv[0]:
+            if not self.access_control.is_allowed(recv[1][0]):
+                self.metrics.datagrams_dropped.inc()
+                return
             address: InternetAddress = InternetAddress(recv[1][0], recv[1][1])
             if address.token in self.connections:
-                await (await self.get_connection(address)).handle(recv[0])
+                timestamp: float | None = recv[2] if len(recv) > 2 else None
+                if self.inbound is not None:
+                    self.inbound.submit(await self.get_connection(address), recv[0], timestamp)
+                else:
+                    await (await self.get_connection(address)).handle(recv[0], timestamp=timestamp)
             elif recv[0][0] in [ProtocolInfo.OFFLINE_PING, ProtocolInfo.OFFLINE_PING_OPEN_CONNECTIONS]:
                 data = await self.handler.handle_offline_ping(recv[0], address)
                 await self.send_data(data, address)
             elif recv[0][0] == ProtocolInfo.OPEN_CONNECTION_REQUEST_1:
                 data = await self.handler.handle_open_connection_request_1(recv[0])
-                await self.send_data(data, address)
+                if data is not None:
+                    await self.send_data(data, address)
             elif recv[0][0] == ProtocolInfo.OPEN_CONNECTION_REQUEST_2:
                 data = await self.handler.handle_open_connection_request_2(recv[0], address)
-                await self.send_data(data, address)
+                if data is not None:
+                    await self.send_data(data, address)
 
     async def start(self) -> None:
         """
-        Coroutine to start a handle-Loop for the server
+        Coroutine to start a handle-Loop for the server, along with a tick-Loop running :meth:`tick` every tick.
+        Cancelling it stops the tick-Loop as well
         """
+        self._tick_task = self._loop.create_task(self._tick_loop())
+        try:
+            while True:
+                await self._handle()
+        finally:
+            self._stop_ticking()
+
+    def _stop_ticking(self) -> None:
+        if self._tick_task is not None:
+            self._tick_task.cancel()
+            self._tick_task = None
+
+    async def _tick_loop(self) -> None:
         while True:
-            await self._handle()
-            await sleep(self.tick_sleep_time)
+            start: float = self.clock.monotonic()
+            await self.tick()
+            await self.clock.sleep(max(0.0, self.tick_sleep_time - (self.clock.monotonic() - start)))
 
     def run(self) -> None:
         """
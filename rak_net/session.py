@@ -0,0 +1,572 @@
+from __future__ import annotations
+from collections import deque
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Iterable
+from .protocol.packet import protocol_packets
+from .protocol import ProtocolInfo
+from .frame import Frame
+from .profiler import Stage
+from .stats import ConnectionStats
+from .utils import ReliabilityTool, SequenceTool, RecoveryRing
+if TYPE_CHECKING:
+    from .metrics import RakNetMetrics
+    from .profiler import Profiler
+
+__all__ = 'Session',
+
+
+class Session:
+    """
+    Sans-IO state machine of a connection, owning its sequence numbers, reliability, fragmentation and ordering state.
+    It performs no I/O and never reads a clock, the caller feeds it received datagrams along with the current time,
+    takes out the datagrams to be sent and wakes it up when its next timeout is due::
+
+        frames = session.receive_datagram(data, now)
+        session.flush()
+        for datagram in session.poll_transmit(now):
+            sock.sendto(datagram, address)
+        wake_up_at = session.next_timeout()
+
+    Every method is synchronous, so a session can be driven in batches, from any event loop or without one.
+    :class:`rak_net.Connection` is the asyncio adapter of a session, handling the frames it returns.
+    Times are in seconds, from any monotonic clock as long as it is the same for every call.
+
+    :param mtu_size: MTU-Size of the connection
+    :param resend_timeout: Period (in seconds) after which the reliable frames of an unacknowledged frame set are resent. Defaults to 1
+    :param fragment_timeout: Period (in seconds) after which an incomplete fragmented packet is discarded. Defaults to 10
+    :param recovery_window: Number of unacknowledged frame sets with reliable frames kept for resending, frame sets with reliable frames
+        beyond it are held back until acknowledgements make room. Defaults to 1024
+    :param stats: :class:`rak_net.stats.ConnectionStats` updated by the session. Created for the session if not supplied
+    :param metrics: :class:`rak_net.metrics.RakNetMetrics` updated by the session, if any
+    :param profiler: :class:`rak_net.profiler.Profiler` timing the encoding and decoding of frame sets, if any
+    :param label: Label of the session in the records of the profiler
+    """
+
+    __slots__ = ('mtu_size', 'resend_timeout', 'fragment_timeout', 'recovery_queue', 'pending_frames', 'ack_queue',
+                 'nack_queue', 'fragmented_packets', 'fragment_deadlines', 'compound_id', 'receive_sequence_numbers',
+                 'send_sequence_number', 'receive_sequence_number', 'send_reliable_frame_index',
+                 'receive_reliable_frame_index', 'receive_reliable_frame_indices', 'queue', 'send_order_channel_index',
+                 'send_sequence_channel_index', 'frames_sent', 'frame_sets_sent', 'transmit_queue', 'stats', 'metrics',
+                 'profiler', 'label', '_untracked', '_held')
+
+    receive_window: int = 4096
+    """Number of sequence numbers, behind the highest received, for which duplicate frame sets are detected"""
+    reliable_window: int = 65536
+    """Number of reliable frames received past a missing one after which the missing frame is given up on"""
+
+    def __init__(self, mtu_size: int, *, resend_timeout: float = 1, fragment_timeout: float = 10, recovery_window: int = 1024,
+                 stats: ConnectionStats = None, metrics: RakNetMetrics = None, profiler: Profiler = None, label: str = ''):
+        self.mtu_size: int = mtu_size
+        self.resend_timeout: float = resend_timeout
+        self.fragment_timeout: float = fragment_timeout
+        self.recovery_queue: RecoveryRing = RecoveryRing(recovery_window)
+        """:class:`rak_net.utils.RecoveryRing` holding the reliable frame indices of the sent frame sets awaiting acknowledgement"""
+        self.pending_frames: dict[int, tuple[memoryview, int]] = {}
+        """Encoded reliable frames awaiting acknowledgement, as tuples of the frame and the sequence number it was last sent with,
+        keyed by reliable frame index"""
+        self.ack_queue: list[int] = []
+        self.nack_queue: list[int] = []
+        self.fragmented_packets: dict[int, dict[int, Frame]] = {}
+        self.fragment_deadlines: dict[int, float] = {}
+        """Times at which the incomplete fragmented packets are discarded, oldest first, keyed by compound id"""
+        self.compound_id: int = 0
+        self.receive_sequence_numbers: set[int] = set()
+        """Sequence numbers received within :attr:`receive_window` of :attr:`receive_sequence_number`"""
+        self.send_sequence_number: int = 0
+        self.receive_sequence_number: int = SequenceTool.MASK
+        """Highest sequence number received, the one before 0 until a frame set is received"""
+        self.send_reliable_frame_index: int = 0
+        self.receive_reliable_frame_index: int = 0
+        """Lowest reliable frame index not yet received"""
+        self.receive_reliable_frame_indices: set[int] = set()
+        """Reliable frame indices received ahead of :attr:`receive_reliable_frame_index`"""
+        self.queue: protocol_packets.FrameSet = protocol_packets.FrameSet()
+        self.send_order_channel_index: list[int] = [0] * 32
+        self.send_sequence_channel_index: list[int] = [0] * 32
+        self.frames_sent: int = 0
+        """Number of frames sent in frame sets"""
+        self.frame_sets_sent: int = 0
+        """Number of frame sets sent"""
+        self.transmit_queue: list[bytes] = []
+        """Datagrams waiting to be taken out with :meth:`poll_transmit`"""
+        self.stats: ConnectionStats = stats if stats is not None else ConnectionStats(self)
+        self.metrics: RakNetMetrics | None = metrics
+        self.profiler: Profiler | None = profiler
+        self.label: str = label
+        # Frame sets with reliable frames, tracked for resending once they are taken out and their send time is known
+        self._untracked: list[tuple[int, tuple[int, ...]]] = []
+        # Frame sets, and reliable frame indices to be resent, waiting for room in the recovery window, oldest first
+        self._held: deque[protocol_packets.FrameSet | list[int]] = deque()
+
+    @property
+    def backlog(self) -> int:
+        """Number of frame sets with reliable frames held back, as the recovery window is full of unacknowledged frame sets"""
+        return len(self._held)
+
+    def receive_datagram(self, data: bytes, now: float) -> list[Frame]:
+        """
+        Method to handle a received datagram
+
+        :param data: Datagram received
+        :param now: Current time
+        :return: Frames received, complete and each only once, in the order they arrived
+        """
+        self.stats.datagrams_in += 1
+        self.stats.bytes_in += len(data)
+        if data[0] == ProtocolInfo.ACK:
+            self.receive_ack(data, now)
+        elif data[0] == ProtocolInfo.NACK:
+            self.receive_nack(data)
+        elif (data[0] & ProtocolInfo.FRAME_SET) != 0:
+            return self.receive_frame_set(data, now)
+        return []
+
+    def receive_ack(self, data: bytes, now: float) -> None:
+        """
+        Method to handle an `ACK`, releasing the acknowledged frames
+
+        :param data: Data of the `ACK`
+        :param now: Current time
+        """
+        packet: protocol_packets.Ack = protocol_packets.Ack(data)
+        packet.decode()
+        recovery_queue: RecoveryRing = self.recovery_queue
+        send_time: float | None = None
+        for sequence_number in packet.sequence_numbers:
+            if sequence_number in recovery_queue:
+                send_time = recovery_queue.send_time(sequence_number)
+                for index in recovery_queue.pop(sequence_number):
+                    self.pending_frames.pop(index, None)
+        if send_time is not None:
+            # A single sample per ACK, from the last frame set it acknowledges
+            self.stats.add_rtt((now - send_time) * 1000)
+        if self._held:
+            self._release()
+
+    def receive_nack(self, data: bytes) -> None:
+        """
+        Method to handle a `NACK`, resending the frame sets reported missing
+
+        :param data: Data of the `NACK`
+        """
+        packet: protocol_packets.Nack = protocol_packets.Nack(data)
+        packet.decode()
+        self.stats.nacked_datagrams += len(packet.sequence_numbers)
+        if self.metrics is not None:
+            self.metrics.nacks_received.inc(len(packet.sequence_numbers))
+        for sequence_number in packet.sequence_numbers:
+            self.resend(sequence_number)
+
+    def receive_frame_set(self, data: bytes, now: float) -> list[Frame]:
+        """
+        Method to handle a frame set, queueing its acknowledgement
+
+        :param data: Data of the frame set
+        :param now: Current time
+        :return: Frames received, see :meth:`receive_datagram`
+        """
+        profiler: Profiler | None = self.profiler
+        packet: protocol_packets.FrameSet = protocol_packets.FrameSet(data)
+        start: int = perf_counter_ns() if profiler is not None and profiler.enabled else 0
+        packet.decode()
+        if start:
+            profiler.record(Stage.DECODE, start, f'{self.label} #{packet.sequence_number}')
+        sequence_number: int = packet.sequence_number
+        distance: int = SequenceTool.diff(sequence_number, self.receive_sequence_number)
+        if distance > 0:
+            # The sequence numbers skipped are missing, as far back as the receive window reaches
+            for missing in range(max(1, distance - self.receive_window), distance):
+                self.nack_queue.append(SequenceTool.add(self.receive_sequence_number, missing))
+            self.ack_queue.append(sequence_number)
+            self.receive_sequence_number = sequence_number
+            self.receive_sequence_numbers.add(sequence_number)
+            if len(self.receive_sequence_numbers) > 2 * self.receive_window:
+                self.receive_sequence_numbers = {
+                    number for number in self.receive_sequence_numbers
+                    if SequenceTool.diff(sequence_number, number) < self.receive_window
+                }
+        elif -distance >= self.receive_window or sequence_number in self.receive_sequence_numbers:
+            # Duplicate, or too old to tell
+            return []
+        else:
+            if sequence_number in self.nack_queue:
+                self.nack_queue.remove(sequence_number)
+            self.ack_queue.append(sequence_number)
+            self.receive_sequence_numbers.add(sequence_number)
+        frames: list[Frame] = []
+        for frame in packet.frames:
+            if ReliabilityTool.reliable(frame.reliability) and not self._receive_reliable(frame.reliable_frame_index):
+                continue
+            if frame.fragmented:
+                frame = self.receive_fragment(frame, now)
+                if frame is None:
+                    continue
+            frames.append(frame)
+        return frames
+
+    def _receive_reliable(self, index: int) -> bool:
+        # Reliable frames are handled once, in whichever order they arrive
+        base: int = self.receive_reliable_frame_index
+        distance: int = SequenceTool.diff(index, base)
+        received: set[int] = self.receive_reliable_frame_indices
+        if distance < 0 or index in received:
+            return False
+        if distance > 0:
+            received.add(index)
+            if len(received) <= self.reliable_window:
+                return True
+            # The frames missing for this long are given up on
+            base = min(received, key=lambda number: SequenceTool.diff(number, base))
+            received.remove(base)
+        base = (base + 1) & SequenceTool.MASK
+        while base in received:
+            received.remove(base)
+            base = (base + 1) & SequenceTool.MASK
+        self.receive_reliable_frame_index = base
+        return True
+
+    def receive_fragment(self, frame: Frame, now: float) -> Frame | None:
+        """
+        Method to reassemble a fragmented frame
+
+        :param frame: Fragment received
+        :param now: Current time
+        :return: The reassembled frame once every fragment arrived, ``None`` until then
+        """
+        fragments: dict[int, Frame] | None = self.fragmented_packets.get(frame.compound_id)
+        if fragments is None:
+            fragments = self.fragmented_packets[frame.compound_id] = {}
+            self.fragment_deadlines[frame.compound_id] = now + self.fragment_timeout
+        fragments[frame.index] = frame
+        if len(fragments) != frame.compound_size:
+            return None
+        new_frame: Frame = Frame(reliability=frame.reliability, order_channel=frame.order_channel)
+        new_frame.body = b"".join(fragments[i].body for i in range(0, frame.compound_size))
+        del self.fragmented_packets[frame.compound_id]
+        del self.fragment_deadlines[frame.compound_id]
+        return new_frame
+
+    def split_body(self, body: bytes) -> list[bytes]:
+        """
+        Method to split a frame body into fragments fitting the MTU-Size of the connection,
+        along with the frame set header and the header of a fragmented frame
+
+        :param body: Body to be split
+        :return: List of fragment bodies
+        """
+        # Frame set header (4 bytes) and the largest fragmented frame header (23 bytes)
+        size: int = self.mtu_size - 27
+        return [body[i:i + size] for i in range(0, len(body), size)]
+
+    def send(self, frame: Frame, *, fragments: list[bytes] = None) -> bool:
+        """
+        Method to assign the indices of a frame and queue it for sending.
+        Fragmented frames are encoded into frame sets of their own right away.
+
+        :param frame: Frame to be sent
+        :param fragments: Pre-computed fragments of the frame body, as returned by :meth:`split_body`.
+            In case it is not provided, the body is split only if the frame does not fit the MTU-Size
+        :return: Whether the frame waits in the frame queue, for the caller to decide when to :meth:`flush` it
+        """
+        if ReliabilityTool.ordered(frame.reliability):
+            frame.ordered_frame_index = self.send_order_channel_index[frame.order_channel]
+            self.send_order_channel_index[frame.order_channel] = (frame.ordered_frame_index + 1) & SequenceTool.MASK
+        elif ReliabilityTool.sequenced(frame.reliability):
+            frame.ordered_frame_index = self.send_order_channel_index[frame.order_channel]
+            frame.sequenced_frame_index = self.send_sequence_channel_index[frame.order_channel]
+            self.send_sequence_channel_index[frame.order_channel] = (frame.sequenced_frame_index + 1) & SequenceTool.MASK
+        if fragments is None and frame.size + 4 > self.mtu_size:
+            fragments = self.split_body(frame.body)
+        if fragments is None:
+            if ReliabilityTool.reliable(frame.reliability):
+                frame.reliable_frame_index = self.send_reliable_frame_index
+                self.send_reliable_frame_index = (frame.reliable_frame_index + 1) & SequenceTool.MASK
+            self.append_frame(frame, False)
+            return True
+        for index, body in enumerate(fragments):
+            new_frame: Frame = Frame()
+            new_frame.fragmented = True
+            new_frame.reliability = frame.reliability
+            new_frame.compound_id = self.compound_id
+            new_frame.compound_size = len(fragments)
+            new_frame.index = index
+            new_frame.body = body
+            if ReliabilityTool.reliable(frame.reliability):
+                new_frame.reliable_frame_index = self.send_reliable_frame_index
+                self.send_reliable_frame_index = (new_frame.reliable_frame_index + 1) & SequenceTool.MASK
+            if ReliabilityTool.sequenced_or_ordered(frame.reliability):
+                new_frame.ordered_frame_index = frame.ordered_frame_index
+                new_frame.order_channel = frame.order_channel
+            if ReliabilityTool.sequenced(frame.reliability):
+                new_frame.sequenced_frame_index = frame.sequenced_frame_index
+            self.append_frame(new_frame, True)
+        self.compound_id = (self.compound_id + 1) & 0xFFFF
+        return False
+
+    def send_many(self, payloads: Iterable[bytes], reliability: int = 0, channel: int = 0) -> None:
+        """
+        Method to send many payloads at once.
+        Indices are assigned in bulk and the payloads are packed into as few frame sets as the MTU-Size allows in a single pass.
+        Frames already in the queue are sent first and the queue is flushed at the end, so the order of the payloads is preserved.
+
+        :param payloads: Payloads to be sent
+        :param reliability: Reliability of the frames. Defaults to 0
+        :param channel: Order channel of the frames. Defaults to 0
+        """
+        reliable: bool = ReliabilityTool.reliable(reliability)
+        ordered: bool = ReliabilityTool.ordered(reliability)
+        sequenced: bool = ReliabilityTool.sequenced(reliability)
+        header_size: int = Frame(reliability=reliability).size
+        mtu_size: int = self.mtu_size
+        queue_size: int = self.queue.size
+        for payload in payloads:
+            frame: Frame = Frame(reliability=reliability, order_channel=channel, body=payload)
+            frame_size: int = header_size + len(payload)
+            if frame_size + 4 > mtu_size:
+                # Fragmented frames are sent on their own, the regular path assigns their indices
+                self.flush_queue()
+                self.send(frame)
+                queue_size = self.queue.size
+                continue
+            if ordered:
+                frame.ordered_frame_index = self.send_order_channel_index[channel]
+                self.send_order_channel_index[channel] = (frame.ordered_frame_index + 1) & SequenceTool.MASK
+            elif sequenced:
+                frame.ordered_frame_index = self.send_order_channel_index[channel]
+                frame.sequenced_frame_index = self.send_sequence_channel_index[channel]
+                self.send_sequence_channel_index[channel] = (frame.sequenced_frame_index + 1) & SequenceTool.MASK
+            if reliable:
+                frame.reliable_frame_index = self.send_reliable_frame_index
+                self.send_reliable_frame_index = (frame.reliable_frame_index + 1) & SequenceTool.MASK
+            if frame_size + queue_size >= mtu_size:
+                self.flush_queue()
+                queue_size = self.queue.size
+            self.queue.frames.append(frame)
+            queue_size += frame_size
+        self.flush_queue()
+
+    def append_frame(self, frame: Frame, immediate: bool = False) -> None:
+        """
+        Method to append a frame, whose indices are assigned, to the queue
+
+        :param frame: Frame to be appended
+        :param immediate: Encodes the frame into a frame set of its own right away if True, defaults to False and adds to back of the queue
+        """
+        if immediate:
+            packet: protocol_packets.FrameSet = protocol_packets.FrameSet()
+            packet.frames.append(frame)
+            self._encode(packet)
+        else:
+            if frame.size + self.queue.size >= self.mtu_size:
+                self.flush_queue()
+            self.queue.frames.append(frame)
+
+    def _window_open(self) -> bool:
+        # Storing the next sequence number must not evict an unacknowledged frame set, tracked or about to be
+        sequence_number: int = self.send_sequence_number
+        if not self.recovery_queue.available(sequence_number):
+            return False
+        return not self._untracked or SequenceTool.diff(sequence_number, self._untracked[0][0]) < self.recovery_queue.capacity
+
+    def _release(self) -> None:
+        held: deque[protocol_packets.FrameSet | list[int]] = self._held
+        while held and self._window_open():
+            item: protocol_packets.FrameSet | list[int] = held.popleft()
+            if isinstance(item, list):
+                # Frames acknowledged in the meantime are not resent
+                indices: list[int] = [index for index in item if index in self.pending_frames]
+                if indices:
+                    self._repack_now(indices)
+            else:
+                self._encode_now(item)
+
+    def _encode(self, packet: protocol_packets.FrameSet) -> None:
+        if (self._held or not self._window_open()) and any(
+            ReliabilityTool.reliable(frame.reliability) for frame in packet.frames
+        ):
+            self._held.append(packet)
+            return
+        self._encode_now(packet)
+
+    def _encode_now(self, packet: protocol_packets.FrameSet) -> None:
+        packet.sequence_number = self.send_sequence_number
+        self.send_sequence_number = (self.send_sequence_number + 1) & SequenceTool.MASK
+        self.frames_sent += len(packet.frames)
+        self.frame_sets_sent += 1
+        profiler: Profiler | None = self.profiler
+        start: int = perf_counter_ns() if profiler is not None and profiler.enabled else 0
+        packet.encode()
+        if start:
+            profiler.record(Stage.ENCODE, start, f'{self.label} #{packet.sequence_number}')
+        # Reliable frames are kept as views into the sent datagram, unreliable ones are never resent
+        view: memoryview = memoryview(packet.data)
+        offset: int = 4
+        indices: list[int] = []
+        for frame in packet.frames:
+            size: int = frame.size
+            if ReliabilityTool.reliable(frame.reliability):
+                indices.append(frame.reliable_frame_index)
+                self.pending_frames[frame.reliable_frame_index] = (view[offset:offset + size], packet.sequence_number)
+            offset += size
+        if indices:
+            self._untracked.append((packet.sequence_number, tuple(indices)))
+        self.transmit_queue.append(packet.data)
+
+    def flush_queue(self) -> None:
+        """
+        Method to encode the frame queue into a frame set
+        """
+        if len(self.queue.frames) > 0:
+            self._encode(self.queue)
+            self.queue = protocol_packets.FrameSet()
+
+    def flush_acks(self) -> None:
+        """
+        Method to encode the ACK-Queue into an `ACK`
+        """
+        if len(self.ack_queue) > 0:
+            packet: protocol_packets.Ack = protocol_packets.Ack()
+            packet.sequence_numbers = self.ack_queue.copy()
+            packet.encode()
+            self.ack_queue.clear()
+            self.transmit_queue.append(packet.data)
+
+    def flush_nacks(self) -> None:
+        """
+        Method to encode the NACK-Queue into a `NACK`
+        """
+        if len(self.nack_queue) > 0:
+            packet: protocol_packets.Nack = protocol_packets.Nack()
+            packet.sequence_numbers = self.nack_queue.copy()
+            packet.encode()
+            self.nack_queue.clear()
+            self.transmit_queue.append(packet.data)
+
+    def flush(self) -> None:
+        """
+        Method to encode the ACK-Queue, NACK-Queue and the frame queue
+        """
+        self.flush_acks()
+        self.flush_nacks()
+        self.flush_queue()
+
+    def resend(self, sequence_number: int) -> None:
+        """
+        Method to resend the still unacknowledged reliable frames of a frame set.
+        The frames are repacked into as few new frame sets as the MTU-Size allows.
+
+        :param sequence_number: Sequence number with which the frame set was last sent
+        """
+        indices: tuple[int, ...] | None = self.recovery_queue.pop(sequence_number)
+        if indices is None:
+            return
+        batch: list[int] = []
+        batch_size: int = 4
+        for index in indices:
+            pending: tuple[memoryview, int] | None = self.pending_frames.get(index)
+            if pending is None:
+                continue
+            if batch and batch_size + len(pending[0]) > self.mtu_size:
+                self._repack(batch)
+                batch = []
+                batch_size = 4
+            batch.append(index)
+            batch_size += len(pending[0])
+        if batch:
+            self._repack(batch)
+        if self._held:
+            self._release()
+
+    def _repack(self, indices: list[int]) -> None:
+        if self._held or not self._window_open():
+            self._held.append(indices)
+            return
+        self._repack_now(indices)
+
+    def _repack_now(self, indices: list[int]) -> None:
+        self.stats.resent_datagrams += 1
+        self.stats.resent_frames += len(indices)
+        if self.metrics is not None:
+            self.metrics.resent_datagrams.inc()
+            self.metrics.resent_frames.inc(len(indices))
+        sequence_number: int = self.send_sequence_number
+        self.send_sequence_number = (sequence_number + 1) & SequenceTool.MASK
+        parts: list[bytes | memoryview] = [bytes((ProtocolInfo.FRAME_SET,)), sequence_number.to_bytes(3, 'little')]
+        for index in indices:
+            parts.append(self.pending_frames[index][0])
+        datagram: bytes = b"".join(parts)
+        # Point the pending frames at the new datagram, so the old one can be released
+        view: memoryview = memoryview(datagram)
+        offset: int = 4
+        for index in indices:
+            size: int = len(self.pending_frames[index][0])
+            self.pending_frames[index] = (view[offset:offset + size], sequence_number)
+            offset += size
+        self._untracked.append((sequence_number, tuple(indices)))
+        self.transmit_queue.append(datagram)
+
+    def _track(self, sequence_number: int, indices: tuple[int, ...], now: float) -> None:
+        evicted: tuple[int, tuple[int, ...]] | None = self.recovery_queue.put(sequence_number, indices, now)
+        if evicted is not None:
+            evicted_sequence_number, evicted_indices = evicted
+            for index in evicted_indices:
+                pending: tuple[memoryview, int] | None = self.pending_frames.get(index)
+                if pending is not None and pending[1] == evicted_sequence_number:
+                    del self.pending_frames[index]
+
+    def next_timeout(self) -> float | None:
+        """
+        Method to get the time at which :meth:`handle_timeout` has work to do,
+        either resending the oldest unacknowledged frame set or discarding an incomplete fragmented packet
+
+        :return: Time of the next timeout, ``None`` in case nothing is waiting for one
+        """
+        deadline: float | None = self.recovery_queue.oldest()
+        if deadline is not None:
+            deadline += self.resend_timeout
+        if self.fragment_deadlines:
+            fragment_deadline: float = next(iter(self.fragment_deadlines.values()))
+            if deadline is None or fragment_deadline < deadline:
+                deadline = fragment_deadline
+        return deadline
+
+    def handle_timeout(self, now: float) -> None:
+        """
+        Method to resend the frame sets unacknowledged for the resend timeout
+        and to discard the fragmented packets incomplete for the fragment timeout
+
+        :param now: Current time
+        """
+        for sequence_number in self.recovery_queue.expired(now - self.resend_timeout):
+            self.resend(sequence_number)
+        deadlines: dict[int, float] = self.fragment_deadlines
+        while deadlines:
+            compound_id, deadline = next(iter(deadlines.items()))
+            if deadline > now:
+                break
+            del deadlines[compound_id]
+            del self.fragmented_packets[compound_id]
+            if self.metrics is not None:
+                self.metrics.fragments_expired.inc()
+
+    def poll_transmit(self, now: float) -> list[bytes]:
+        """
+        Method to take out the datagrams to be sent, after handling the timeouts which are due
+
+        :param now: Current time, recorded as the send time of the datagrams
+        :return: Datagrams to be sent, in order
+        """
+        deadline: float | None = self.next_timeout()
+        if deadline is not None and deadline <= now:
+            self.handle_timeout(now)
+        if self._held:
+            self._release()
+        for sequence_number, indices in self._untracked:
+            self._track(sequence_number, indices, now)
+        self._untracked.clear()
+        datagrams: list[bytes] = self.transmit_queue
+        self.transmit_queue = []
+        return datagrams
+
+    def __repr__(self):
+        return f'<Session: {self.label}>' if self.label else '<Session>'
@@ -31,12 +31,41 @@
 
 from __future__ import annotations
 import socket
+import struct
+from errno import ECONNREFUSED, EHOSTUNREACH, ENETUNREACH
+import sys
+import time
+from time import perf_counter_ns
+from typing import TYPE_CHECKING
 from asyncio import (
     AbstractEventLoop as _AbstractEventLoop,
     get_event_loop as _get_event_loop,
     Queue, Event,
     Future as _Future
 )
+from .profiler import Stage
+from .transport import Transport
+# Linux socket option reporting the memory of the socket, the receive queue first
+_SO_MEMINFO: int = getattr(socket, 'SO_MEMINFO', 55)
+# Linux socket option attaching the arrival time of every datagram as a timespec, the control message has the same type
+_SO_TIMESTAMPNS: int | None = getattr(socket, 'SO_TIMESTAMPNS', 35) if sys.platform.startswith('linux') else None
+_TIMESPEC: struct.Struct = struct.Struct('@ll')
+# Linux socket options queueing the ICMP errors of unconnected sockets, read back along with the address they concern
+_IP_RECVERR: int | None = getattr(socket, 'IP_RECVERR', 11) if sys.platform.startswith('linux') else None
+_IPV6_RECVERR: int | None = getattr(socket, 'IPV6_RECVERR', 25) if sys.platform.startswith('linux') else None
+_MSG_ERRQUEUE: int = getattr(socket, 'MSG_ERRQUEUE', 0x2000)
+# The control message of an error is a sock_extended_err, starting with the error number, its origin, ICMP type and code
+_EXTENDED_ERROR: struct.Struct = struct.Struct('=IBBBBII')
+_UNREACHABLE: frozenset[int] = frozenset((ECONNREFUSED, EHOSTUNREACH, ENETUNREACH))
+try:
+    from fcntl import ioctl as _ioctl
+    from termios import FIONREAD as _FIONREAD
+except ImportError:
+    _ioctl = None
+if TYPE_CHECKING:
+    from .capture import Capture
+    from .metrics import RakNetMetrics
+    from .profiler import Profiler
 
 
 class UdpSocket:
@@ -80,7 +109,7 @@ class UdpSocket:
         self.socket.close()
 
 
-class AsyncUDPSocket:
+class AsyncUDPSocket(Transport):
     """
     Async UDP-Socket for Rak-Net
 
@@ -90,17 +119,37 @@ class AsyncUDPSocket:
     :param port: Port of the socket
     :param loop: Loop on which the socket is created. Uses :func:`asyncio.get_event_loop` in case no loop is provided
     :param queue_size: Size for the internal send queu. 0 represents infinite elements. Defaukts to 0
+    :param metrics: :class:`rak_net.metrics.RakNetMetrics` counting the datagrams and bytes sent and received
+    :param profiler: :class:`rak_net.profiler.Profiler` timing the sends and the handoff of received datagrams
+    :param capture: :class:`rak_net.capture.Capture` recording the datagrams sent and received
+    :param timestamps: Whether received datagrams carry their arrival time, as a third element of :meth:`recieve`.
+        Arrival times are taken by the kernel on Linux, with ``SO_TIMESTAMPNS``, elsewhere by the receiving thread. Defaults to False
+    :param unreachable: Whether ICMP errors, such as port-unreachable from a peer which is gone, are read from the error queue
+        of the socket and reported to :attr:`on_unreachable`. Only supported on Linux, with ``IP_RECVERR``. Defaults to False
     """
-    def __init__(self, is_server: bool, version: int, hostname: str = "localhost", port: int = 0, *, loop: _AbstractEventLoop = None, queue_size: int = None):
+    def __init__(self, is_server: bool, version: int, hostname: str = "localhost", port: int = 0, *, loop: _AbstractEventLoop = None, queue_size: int = None,
+                 metrics: RakNetMetrics = None, profiler: Profiler = None, capture: Capture = None,
+                 timestamps: bool = False, unreachable: bool = False):
         if loop is None:
             loop = _get_event_loop()
         if queue_size is None:
             queue_size = 0
         self._loop: _AbstractEventLoop = loop
-        self._queue: Queue = Queue(queue_size, loop=loop)
+        self._queue: Queue = Queue(queue_size)
         self.version: int = version
         self._closed: bool = False
         self._send_event: Event = Event()
+        self.metrics: RakNetMetrics | None = metrics
+        self.profiler: Profiler | None = profiler
+        self.capture: Capture | None = capture
+        """:class:`rak_net.capture.Capture` of the socket, ``None`` in case nothing is captured"""
+        self._local_address: tuple = ('', 0)
+        self.timestamps: bool = timestamps
+        """Whether received datagrams carry their arrival time"""
+        self._kernel_timestamps: bool = False
+        self.unreachable: bool = unreachable
+        """Whether ICMP errors are reported to :attr:`on_unreachable`"""
+        self._error_queue: bool = False
         if is_server:
             self._hostname: str = hostname
             self._port: int = port
@@ -121,6 +170,41 @@ class AsyncUDPSocket:
         """
         return self._closed
 
+    @property
+    def address(self) -> tuple:
+        """
+        Address to which the socket is bound, with the actual port in case it was bound to port 0
+        """
+        return self._socket.getsockname()
+
+    @property
+    def send_queue_depth(self) -> int:
+        """
+        Number of datagrams waiting in the send queue
+        """
+        return self._queue.qsize()
+
+    def receive_backlog(self) -> int | None:
+        """
+        Method to measure the data waiting in the receive buffer of the socket, a growing backlog means the loop falls behind.
+        Linux reports the whole receive queue, including the bookkeeping of the kernel,
+        other Unix systems only the size of the next datagram, so any value above 0 means datagrams are waiting
+
+        :return: Number of bytes waiting, ``None`` in case the system cannot tell
+        """
+        if self._closed:
+            return None
+        try:
+            return struct.unpack_from('I', self._socket.getsockopt(socket.SOL_SOCKET, _SO_MEMINFO, 36))[0]
+        except OSError:
+            pass
+        if _ioctl is None:
+            return None
+        try:
+            return struct.unpack('i', _ioctl(self._socket.fileno(), _FIONREAD, b'\0\0\0\0'))[0]
+        except OSError:
+            return None
+
     def prime(self, hostname: str = None, port: int = None) -> None:
         """
         Primer for the socket. Binds the socket and prepares sending loop
@@ -130,7 +214,24 @@ class AsyncUDPSocket:
         """
         hostname = hostname if hostname is not None else self._hostname
         port = port if port is not None else self._port
+        if not port:
+            # Linux hands out an ephemeral port already bound by another socket in case both allow reuse
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 0)
         self._socket.bind((hostname, port))
+        self._local_address = self._socket.getsockname()[:2]
+        if self.timestamps and _SO_TIMESTAMPNS is not None:
+            try:
+                self._socket.setsockopt(socket.SOL_SOCKET, _SO_TIMESTAMPNS, 1)
+                self._kernel_timestamps = True
+            except OSError:
+                pass
+        option: int | None = _IP_RECVERR if self.version == 4 else _IPV6_RECVERR
+        if self.unreachable and option is not None:
+            try:
+                self._socket.setsockopt(socket.IPPROTO_IP if self.version == 4 else socket.IPPROTO_IPV6, option, 1)
+                self._error_queue = True
+            except OSError:
+                pass
         self._loop.create_task(self._send_loop())
 
     def run(self) -> None:
@@ -145,12 +246,74 @@ class AsyncUDPSocket:
         Method to recieve the data from the socket
 
         :param size: Size of data to be recieved. Defaults to 65535
-        :return: Returns a tuple of data and address in format ``(`data`, (`hostname`, `port`))``
+        :return: Returns a tuple of data and address in format ``(`data`, (`hostname`, `port`))``,
+            followed by the arrival time (in seconds since the epoch) in case :attr:`timestamps` is enabled
         """
         try:
-            return await self._loop.run_in_executor(None, self._socket.recvfrom, size)
+            if self.timestamps:
+                recv, received = await self._loop.run_in_executor(None, self._timestamped_recvfrom, size)
+                if self.profiler is not None and self.profiler.enabled:
+                    self.profiler.record(Stage.RECEIVE, received)
+            elif self.profiler is not None and self.profiler.enabled:
+                recv, received = await self._loop.run_in_executor(None, self._timed_recvfrom, size)
+                self.profiler.record(Stage.RECEIVE, received)
+            else:
+                recv: tuple = await self._loop.run_in_executor(None, self._socket.recvfrom, size)
         except socket.error:
+            if self.metrics is not None:
+                self.metrics.receive_errors.inc()
+            if self._error_queue and not self._closed:
+                # A queued ICMP error fails the pending receive, the error itself is waiting in the error queue
+                await self._read_error_queue()
             return b'', ('', 0)
+        if self.metrics is not None:
+            self.metrics.datagrams_received.inc()
+            self.metrics.bytes_received.inc(len(recv[0]))
+        if self.capture is not None:
+            self.capture.record(recv[0], recv[1][:2], self._local_address, recv[2] if self.timestamps else None)
+        return recv
+
+    def _timed_recvfrom(self, size: int) -> tuple[tuple, int]:
+        recv: tuple = self._socket.recvfrom(size)
+        return recv, perf_counter_ns()
+
+    def _timestamped_recvfrom(self, size: int) -> tuple[tuple, int]:
+        if not self._kernel_timestamps:
+            data, address = self._socket.recvfrom(size)
+            return (data, address, time.time()), perf_counter_ns()
+        data, ancillary, _, address = self._socket.recvmsg(size, socket.CMSG_SPACE(_TIMESPEC.size))
+        received: int = perf_counter_ns()
+        for level, kind, value in ancillary:
+            if level == socket.SOL_SOCKET and kind == _SO_TIMESTAMPNS:
+                seconds, nanoseconds = _TIMESPEC.unpack_from(value)
+                return (data, address, seconds + nanoseconds * 1e-9), received
+        return (data, address, time.time()), received
+
+    async def _read_error_queue(self) -> None:
+        while True:
+            try:
+                _, ancillary, _, address = self._socket.recvmsg(1, 512, _MSG_ERRQUEUE | socket.MSG_DONTWAIT)
+            except OSError:
+                # Drained
+                return
+            for level, kind, value in ancillary:
+                if (level, kind) not in ((socket.IPPROTO_IP, _IP_RECVERR), (socket.IPPROTO_IPV6, _IPV6_RECVERR)):
+                    continue
+                error: int = _EXTENDED_ERROR.unpack_from(value)[0]
+                if error not in _UNREACHABLE:
+                    continue
+                if self.metrics is not None:
+                    self.metrics.unreachable_errors.inc()
+                if self.on_unreachable is not None:
+                    try:
+                        # The address is the destination of the datagram which caused the error
+                        await self.on_unreachable(address[:2], error)
+                    except Exception as e:
+                        # Sending and receiving go on whatever the callback, or the listeners it dispatches to, raise
+                        self._loop.call_exception_handler({
+                            'message': f'Exception in unreachable callback for {address[0]}:{address[1]}',
+                            'exception': e,
+                        })
 
     async def send(self, data: bytes, hostname: str = "localhost", port: int = 0) -> None:
         """
@@ -191,15 +354,44 @@ class AsyncUDPSocket:
             try:
                 while self._queue.qsize():
                     data, address = await self._queue.get()
-                    await self._socket_send(data, address)
+                    start: int = perf_counter_ns() if self.profiler is not None and self.profiler.enabled else 0
+                    try:
+                        await self._socket_send(data, address)
+                    except OSError:
+                        # A failed datagram must not stop the loop from sending the others
+                        if self.metrics is not None:
+                            self.metrics.send_errors.inc()
+                        if self._error_queue and not self._closed:
+                            await self._read_error_queue()
+                        continue
+                    finally:
+                        self._queue.task_done()
+                    if start:
+                        self.profiler.record(Stage.SEND, start, f'{address[0]}:{address[1]}')
+                    if self.metrics is not None:
+                        self.metrics.datagrams_sent.inc()
+                        self.metrics.bytes_sent.inc(len(data))
+                    if self.capture is not None:
+                        self.capture.record(data, self._local_address, address)
             finally:
                 self._send_event.clear()
 
+    async def drain(self) -> None:
+        """
+        Coroutine waiting until every queued datagram is sent
+        """
+        await self._queue.join()
+
     async def close(self) -> None:
         """
         Method for closing the socket
         """
         self._closed = True
+        try:
+            # Wakes up a receive blocked in the executor, closing alone leaves it waiting
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
         self._socket.close()
 
 
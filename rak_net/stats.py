@@ -0,0 +1,143 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .connection import Connection
+    from .session import Session
+
+__all__ = 'ConnectionStats',
+
+
+class ConnectionStats:
+    """
+    Quality statistics of a connection.
+    Counters are plain attributes updated in place on the hot path, so they can be read at any time without locking.
+    Round-trip times are smoothed as in RFC 6298 and jitter as in RFC 3550, from the time taken for frame sets
+    to be acknowledged and for online pings to be answered.
+
+    :param connection: Connection, or :class:`rak_net.session.Session`, for which the statistics are kept
+    """
+
+    __slots__ = ('connection', 'srtt', 'rttvar', 'min_rtt', 'last_rtt', 'jitter', 'rtt_samples',
+                 'datagrams_in', 'bytes_in', 'datagrams_out', 'bytes_out', 'nacked_datagrams',
+                 'resent_datagrams', 'resent_frames', 'queueing_latency', 'max_queueing_latency', 'queueing_samples')
+
+    def __init__(self, connection: Connection | Session):
+        self.connection: Connection | Session = connection
+        """Connection for which the statistics are kept"""
+        self.srtt: float = 0.0
+        """Smoothed round-trip time (in milliseconds)"""
+        self.rttvar: float = 0.0
+        """Smoothed round-trip time variation (in milliseconds)"""
+        self.min_rtt: float = 0.0
+        """Lowest round-trip time sampled (in milliseconds)"""
+        self.last_rtt: float = 0.0
+        """Latest round-trip time sampled (in milliseconds)"""
+        self.jitter: float = 0.0
+        """Smoothed difference between consecutive round-trip times (in milliseconds)"""
+        self.rtt_samples: int = 0
+        """Number of round-trip times sampled"""
+        self.datagrams_in: int = 0
+        """Number of datagrams received"""
+        self.bytes_in: int = 0
+        """Number of bytes received"""
+        self.datagrams_out: int = 0
+        """Number of datagrams sent, including ACKs, NACKs and resends"""
+        self.bytes_out: int = 0
+        """Number of bytes sent"""
+        self.nacked_datagrams: int = 0
+        """Number of sent frame sets reported missing by the peer"""
+        self.resent_datagrams: int = 0
+        """Number of frame sets sent to resend reliable frames"""
+        self.resent_frames: int = 0
+        """Number of reliable frames resent"""
+        self.queueing_latency: float = 0.0
+        """Smoothed time (in milliseconds) received datagrams waited in the process before being handled,
+        measured from their arrival time in case the socket has timestamps enabled"""
+        self.max_queueing_latency: float = 0.0
+        """Longest time (in milliseconds) a received datagram waited in the process before being handled"""
+        self.queueing_samples: int = 0
+        """Number of queueing latencies sampled"""
+
+    def add_rtt(self, rtt: float) -> None:
+        """
+        Method to add a round-trip time sample
+
+        :param rtt: Round-trip time (in milliseconds)
+        """
+        if self.rtt_samples:
+            self.jitter += (abs(rtt - self.last_rtt) - self.jitter) / 16
+            self.rttvar += (abs(self.srtt - rtt) - self.rttvar) / 4
+            self.srtt += (rtt - self.srtt) / 8
+            if rtt < self.min_rtt:
+                self.min_rtt = rtt
+        else:
+            self.srtt = self.min_rtt = rtt
+            self.rttvar = rtt / 2
+        self.last_rtt = rtt
+        self.rtt_samples += 1
+
+    def add_queueing_latency(self, latency: float) -> None:
+        """
+        Method to add the time a received datagram waited in the process, between its arrival and its handling
+
+        :param latency: Queueing latency (in milliseconds)
+        """
+        if self.queueing_samples:
+            self.queueing_latency += (latency - self.queueing_latency) / 8
+        else:
+            self.queueing_latency = latency
+        if latency > self.max_queueing_latency:
+            self.max_queueing_latency = latency
+        self.queueing_samples += 1
+
+    @property
+    def rto(self) -> float:
+        """Retransmission timeout (in milliseconds) suggested by the round-trip time estimates"""
+        return self.srtt + 4 * self.rttvar
+
+    @property
+    def loss_rate(self) -> float:
+        """Fraction of the sent frame sets reported missing by the peer"""
+        frame_sets: int = self.connection.frame_sets_sent + self.resent_datagrams
+        return self.nacked_datagrams / frame_sets if frame_sets else 0.0
+
+    @property
+    def resend_ratio(self) -> float:
+        """Fraction of the sent frame sets which were resends"""
+        frame_sets: int = self.connection.frame_sets_sent + self.resent_datagrams
+        return self.resent_datagrams / frame_sets if frame_sets else 0.0
+
+    @property
+    def send_queue_depth(self) -> int:
+        """Number of frames waiting in the frame queue"""
+        return len(self.connection.queue.frames)
+
+    @property
+    def unacknowledged_frames(self) -> int:
+        """Number of reliable frames awaiting acknowledgement"""
+        return len(self.connection.pending_frames)
+
+    @property
+    def recovery_depth(self) -> int:
+        """Number of sent frame sets awaiting acknowledgement"""
+        return len(self.connection.recovery_queue)
+
+    @property
+    def ack_queue_depth(self) -> int:
+        """Number of sequence numbers waiting to be acknowledged"""
+        return len(self.connection.ack_queue)
+
+    @property
+    def nack_queue_depth(self) -> int:
+        """Number of sequence numbers waiting to be reported missing"""
+        return len(self.connection.nack_queue)
+
+    @property
+    def inbound_queue_depth(self) -> int:
+        """Number of received datagrams waiting to be handled, in case the server uses an inbound scheduler"""
+        inbound_queue = getattr(self.connection, 'inbound_queue', None)
+        return 0 if inbound_queue is None else inbound_queue.depth
+
+    def __repr__(self):
+        return (f'<ConnectionStats: srtt={self.srtt:.1f}ms rttvar={self.rttvar:.1f}ms '
+                f'loss={self.loss_rate:.2%} resend={self.resend_ratio:.2%}>')
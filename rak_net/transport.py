@@ -0,0 +1,212 @@
+from __future__ import annotations
+from asyncio import Queue
+from typing import Any, Awaitable, Callable
+from .clock import Clock
+
+__all__ = 'Transport', 'MemoryNetwork', 'MemoryTransport'
+
+
+class Transport:
+    """
+    Base-Class for datagram transports of a server.
+    A transport is bound once with :meth:`prime`, then datagrams are exchanged with :meth:`recieve` and :meth:`send`.
+    :class:`rak_net.AsyncUDPSocket` is the transport over UDP, :class:`MemoryTransport` passes datagrams in-process.
+    """
+
+    on_unreachable: Callable[[tuple, int], Awaitable[Any]] | None = None
+    """Coroutine function awaited by transports learning that a peer is unreachable, with its address and the error number"""
+
+    @property
+    def is_closed(self) -> bool:
+        """
+        Whether the transport is closed or not
+        """
+        raise NotImplementedError
+
+    @property
+    def address(self) -> tuple:
+        """
+        Address to which the transport is bound, as ``(hostname, port)``
+        """
+        raise NotImplementedError
+
+    @property
+    def send_queue_depth(self) -> int:
+        """
+        Number of datagrams waiting to be sent
+        """
+        return 0
+
+    def receive_backlog(self) -> int | None:
+        """
+        Method to measure the data received but not yet taken out with :meth:`recieve`
+
+        :return: Number of bytes waiting, ``None`` in case the transport cannot tell
+        """
+        return None
+
+    def prime(self, hostname: str = None, port: int = None) -> None:
+        """
+        Method to bind the transport
+
+        :param hostname: Hostname to which the transport is to be bound
+        :param port: Port to which the transport is to be bound, 0 for any free port
+        """
+        raise NotImplementedError
+
+    async def recieve(self, *, size: int = 65535) -> tuple:
+        """
+        Coroutine to receive a datagram
+
+        :param size: Largest size of data to be received. Defaults to 65535
+        :return: Returns a tuple of data and address in format ``(`data`, (`hostname`, `port`))``, data is empty on errors.
+            Transports which know the arrival time of the datagram (in seconds since the epoch) add it as a third element
+        """
+        raise NotImplementedError
+
+    async def send(self, data: bytes, hostname: str = "localhost", port: int = 0) -> None:
+        """
+        Coroutine to send a datagram
+
+        :param data: Data to be sent
+        :param hostname: Host to which the data is to be sent
+        :param port: Port to which the data is to be sent
+        """
+        raise NotImplementedError
+
+    async def drain(self) -> None:
+        """
+        Coroutine waiting until every queued datagram is sent
+        """
+
+    async def close(self) -> None:
+        """
+        Coroutine to close the transport
+        """
+        raise NotImplementedError
+
+
+class MemoryNetwork:
+    """
+    In-process network connecting :class:`MemoryTransport` instances by address.
+    Datagrams are handed over without copies or syscalls, after an optional latency measured by a clock,
+    so protocol code can be exercised and benchmarked without the cost of real sockets.
+
+    :param latency: One-way latency (in seconds) of every datagram. Defaults to 0
+    :param clock: :class:`rak_net.clock.Clock` measuring the latency, required in case there is a latency
+    """
+
+    __slots__ = 'latency', 'clock', 'endpoints', 'delivered', 'undeliverable', '_next_port'
+
+    def __init__(self, *, latency: float = 0.0, clock: Clock = None):
+        if latency and clock is None:
+            raise ValueError("A clock is required for a latency")
+        self.latency: float = latency
+        self.clock: Clock | None = clock
+        self.endpoints: dict[tuple[str, int], MemoryTransport] = {}
+        """Bound transports, by address"""
+        self.delivered: int = 0
+        """Number of datagrams delivered"""
+        self.undeliverable: int = 0
+        """Number of datagrams sent to addresses no transport is bound to"""
+        self._next_port: int = 49152
+
+    def bind(self, transport: MemoryTransport, hostname: str, port: int) -> int:
+        """
+        Method to bind a transport to an address
+
+        :param transport: Transport to be bound
+        :param hostname: Hostname of the address
+        :param port: Port of the address, 0 for any free port
+        :return: Port bound
+        """
+        if not port:
+            while (hostname, self._next_port) in self.endpoints:
+                self._next_port += 1
+            port = self._next_port
+            self._next_port += 1
+        if (hostname, port) in self.endpoints:
+            raise OSError(f"Address {hostname}:{port} is already in use")
+        self.endpoints[(hostname, port)] = transport
+        return port
+
+    def unbind(self, address: tuple[str, int]) -> None:
+        """
+        Method to unbind a transport
+
+        :param address: Address the transport is bound to
+        """
+        self.endpoints.pop(address, None)
+
+    def deliver(self, data: bytes, source: tuple[str, int], destination: tuple[str, int]) -> None:
+        """
+        Method to deliver a datagram
+
+        :param data: Data of the datagram
+        :param source: Address of the sender
+        :param destination: Address of the recipient
+        """
+        if self.latency:
+            self.clock.call_later(self.latency, self._arrive, data, source, destination)
+        else:
+            self._arrive(data, source, destination)
+
+    def _arrive(self, data: bytes, source: tuple[str, int], destination: tuple[str, int]) -> None:
+        transport: MemoryTransport | None = self.endpoints.get(destination)
+        if transport is None:
+            self.undeliverable += 1
+            return
+        self.delivered += 1
+        transport._queue.put_nowait((data, source))
+
+
+class MemoryTransport(Transport):
+    """
+    Transport exchanging datagrams through a :class:`MemoryNetwork`, for deterministic and fast protocol tests::
+
+        network = MemoryNetwork()
+        server = Server(10, '10.0.0.1', 19132, transport=MemoryTransport(network))
+        client = Client(10, '10.0.0.2', transport=MemoryTransport(network))
+
+    :param network: Network the transport is attached to
+    """
+
+    def __init__(self, network: MemoryNetwork):
+        self.network: MemoryNetwork = network
+        """Network the transport is attached to"""
+        self._address: tuple[str, int] | None = None
+        self._queue: Queue = Queue()
+        self._closed: bool = False
+
+    @property
+    def is_closed(self) -> bool:
+        return self._closed
+
+    @property
+    def address(self) -> tuple:
+        return self._address
+
+    @property
+    def pending(self) -> int:
+        """Number of datagrams delivered and waiting to be received"""
+        return self._queue.qsize()
+
+    def prime(self, hostname: str = None, port: int = None) -> None:
+        hostname = hostname if hostname is not None else '127.0.0.1'
+        self._address = (hostname, self.network.bind(self, hostname, port or 0))
+
+    async def recieve(self, *, size: int = 65535) -> tuple:
+        data, address = await self._queue.get()
+        return (data[:size] if len(data) > size else data), address
+
+    async def send(self, data: bytes, hostname: str = "localhost", port: int = 0) -> None:
+        if not isinstance(data, (bytes, bytearray)):
+            raise TypeError("Data should be of type `bytes` or `bytesarray`")
+        if not self._closed:
+            self.network.deliver(bytes(data), self._address, (hostname, port))
+
+    async def close(self) -> None:
+        self._closed = True
+        self.network.unbind(self._address)
+        # Wakes up a pending receive, empty data is ignored like a socket error
+        self._queue.put_nowait((b'', ('', 0)))
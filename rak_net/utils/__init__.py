@@ -31,10 +31,19 @@
 
 from .internet_address import InternetAddress
 from .reliability_tool import ReliabilityTool
+from .sequence_tool import SequenceTool
 from .read_only import ReadOnly
+from .prefix_trie import PrefixTrie
+from .timer_wheel import Timer, TimerWheel
+from .recovery_ring import RecoveryRing
 
 __all__ = (
     "InternetAddress",
     "ReliabilityTool",
+    'SequenceTool',
     'ReadOnly',
+    'PrefixTrie',
+    'Timer',
+    'TimerWheel',
+    'RecoveryRing',
 )
@@ -0,0 +1,151 @@
+from __future__ import annotations
+from typing import Any
+
+__all__ = 'PrefixTrie',
+
+
+# Indices of a trie node, nodes are plain lists for fast indexing
+_ZERO: int = 0
+_ONE: int = 1
+_VALUE: int = 2
+
+
+class PrefixTrie:
+    """
+    Binary prefix (radix) trie over packed IPv4 and IPv6 addresses.
+    Lookups walk at most one node per bit of the address, so a lookup costs O(prefix-length)
+    regardless of how many prefixes are stored.
+    """
+
+    __slots__ = '_roots', '_size'
+
+    def __init__(self) -> None:
+        self._roots: dict[int, list] = {4: [None, None, None], 16: [None, None, None]}
+        self._size: int = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _root(self, packed: bytes) -> list:
+        try:
+            return self._roots[len(packed)]
+        except KeyError:
+            raise ValueError(f"Packed address should be 4 or 16 bytes long, got {len(packed)}") from None
+
+    def insert(self, packed: bytes, prefix_length: int, value: Any) -> None:
+        """
+        Method to insert a prefix into the trie, replacing the value of an existing identical prefix
+
+        :param packed: Packed network address of the prefix
+        :param prefix_length: Length (in bits) of the prefix
+        :param value: Value to store for the prefix, must not be ``None``
+        """
+        node: list = self._root(packed)
+        bits: int = len(packed) * 8
+        if not 0 <= prefix_length <= bits:
+            raise ValueError(f"Prefix length should be between 0 and {bits}, got {prefix_length}")
+        number: int = int.from_bytes(packed, 'big')
+        for shift in range(bits - 1, bits - 1 - prefix_length, -1):
+            bit: int = (number >> shift) & 1
+            child: list | None = node[bit]
+            if child is None:
+                child = node[bit] = [None, None, None]
+            node = child
+        if node[_VALUE] is None:
+            self._size += 1
+        node[_VALUE] = value
+
+    def remove(self, packed: bytes, prefix_length: int) -> Any:
+        """
+        Method to remove a prefix from the trie. Empty branches are pruned.
+
+        :param packed: Packed network address of the prefix
+        :param prefix_length: Length (in bits) of the prefix
+        :return: Value stored for the prefix, ``None`` if the prefix did not exist
+        """
+        node: list = self._root(packed)
+        bits: int = len(packed) * 8
+        number: int = int.from_bytes(packed, 'big')
+        path: list[tuple[list, int]] = []
+        for shift in range(bits - 1, bits - 1 - prefix_length, -1):
+            bit: int = (number >> shift) & 1
+            child: list | None = node[bit]
+            if child is None:
+                return None
+            path.append((node, bit))
+            node = child
+        value: Any = node[_VALUE]
+        if value is None:
+            return None
+        node[_VALUE] = None
+        self._size -= 1
+        for parent, bit in reversed(path):
+            if node[_ZERO] is not None or node[_ONE] is not None or node[_VALUE] is not None:
+                break
+            parent[bit] = None
+            node = parent
+        return value
+
+    def get(self, packed: bytes, prefix_length: int) -> Any:
+        """
+        Method to get the value stored for an exact prefix
+
+        :param packed: Packed network address of the prefix
+        :param prefix_length: Length (in bits) of the prefix
+        :return: Value stored for the prefix, ``None`` if the prefix does not exist
+        """
+        node: list | None = self._root(packed)
+        bits: int = len(packed) * 8
+        number: int = int.from_bytes(packed, 'big')
+        for shift in range(bits - 1, bits - 1 - prefix_length, -1):
+            node = node[(number >> shift) & 1]
+            if node is None:
+                return None
+        return node[_VALUE]
+
+    def longest_match(self, packed: bytes) -> tuple[int, Any] | None:
+        """
+        Method to find the longest stored prefix containing an address
+
+        :param packed: Packed address to look up
+        :return: A tuple of ``(prefix_length, value)`` for the longest matching prefix, ``None`` if nothing matches
+        """
+        node: list | None = self._roots.get(len(packed))
+        if node is None:
+            return None
+        bits: int = len(packed) * 8
+        number: int = int.from_bytes(packed, 'big')
+        match: tuple[int, Any] | None = None if node[_VALUE] is None else (0, node[_VALUE])
+        depth: int = 0
+        for shift in range(bits - 1, -1, -1):
+            node = node[(number >> shift) & 1]
+            if node is None:
+                break
+            depth += 1
+            if node[_VALUE] is not None:
+                match = (depth, node[_VALUE])
+        return match
+
+    def items(self):
+        """
+        Generator over all stored prefixes
+
+        :return: Yields tuples of ``(packed, prefix_length, value)``
+        """
+        for size, root in self._roots.items():
+            bits: int = size * 8
+            stack: list[tuple[list, int, int]] = [(root, 0, 0)]
+            while stack:
+                node, number, depth = stack.pop()
+                if node[_VALUE] is not None:
+                    yield (number << (bits - depth)).to_bytes(size, 'big'), depth, node[_VALUE]
+                for bit in (_ONE, _ZERO):
+                    if node[bit] is not None:
+                        stack.append((node[bit], (number << 1) | bit, depth + 1))
+
+    def clear(self) -> None:
+        """
+        Method to remove all prefixes from the trie
+        """
+        self._roots = {4: [None, None, None], 16: [None, None, None]}
+        self._size = 0
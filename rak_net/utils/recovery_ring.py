@@ -0,0 +1,154 @@
+from __future__ import annotations
+from typing import Any
+from .sequence_tool import SequenceTool
+
+__all__ = 'RecoveryRing',
+
+
+class RecoveryRing:
+    """
+    Fixed-capacity store of sent datagrams awaiting acknowledgement, indexed by ``sequence_number % capacity``.
+    Each datagram is kept as an entry, such as the reliable frame indices it carried, along with the time it was sent.
+    Storing a datagram in an occupied slot evicts the older datagram, bounding the memory used per connection.
+    Sequence numbers are 24-bit and wrap around, see :class:`SequenceTool`.
+
+    :param capacity: Number of datagrams the ring can hold, rounded up to a power of two. Defaults to 1024
+    """
+
+    __slots__ = 'capacity', 'evicted', '_sequence_numbers', '_entries', '_send_times', '_size', '_oldest', '_newest'
+
+    def __init__(self, capacity: int = 1024):
+        # A power of two divides 2 ** 24, so a slot keeps mapping to the same numbers across wraps
+        capacity = 1 << max(0, capacity - 1).bit_length()
+        if capacity > SequenceTool.HALF:
+            raise ValueError(f"Capacity must not exceed {SequenceTool.HALF}")
+        self.capacity: int = capacity
+        """Number of datagrams the ring can hold"""
+        self.evicted: int = 0
+        """Number of unacknowledged datagrams evicted by newer ones"""
+        self._sequence_numbers: list[int | None] = [None] * capacity
+        self._entries: list[Any] = [None] * capacity
+        self._send_times: list[float] = [0.0] * capacity
+        self._size: int = 0
+        self._oldest: int = 0
+        self._newest: int = SequenceTool.MASK
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, sequence_number: int) -> bool:
+        return self._sequence_numbers[sequence_number % self.capacity] == sequence_number
+
+    def put(self, sequence_number: int, entry: Any, send_time: float) -> tuple[int, Any] | None:
+        """
+        Method to store a sent datagram
+
+        :param sequence_number: Sequence number of the datagram
+        :param entry: Entry kept for the datagram
+        :param send_time: Time at which the datagram was sent
+        :return: Tuple of the sequence number and entry of the datagram evicted from the slot, if any
+        """
+        index: int = sequence_number % self.capacity
+        evicted: tuple[int, Any] | None = None
+        if not self._size:
+            # Nothing older is stored, expiry lookups can start here
+            self._oldest = self._newest = sequence_number
+        if self._sequence_numbers[index] is None:
+            self._size += 1
+        elif self._sequence_numbers[index] != sequence_number:
+            self.evicted += 1
+            evicted = (self._sequence_numbers[index], self._entries[index])
+        self._sequence_numbers[index] = sequence_number
+        self._entries[index] = entry
+        self._send_times[index] = send_time
+        if SequenceTool.diff(sequence_number, self._newest) > 0:
+            self._newest = sequence_number
+        return evicted
+
+    def available(self, sequence_number: int) -> bool:
+        """
+        Method to check whether a datagram can be stored without evicting an unacknowledged one
+
+        :param sequence_number: Sequence number of the datagram
+        :return: Whether the slot of the sequence number is free, or already holds it
+        """
+        stored: int | None = self._sequence_numbers[sequence_number % self.capacity]
+        return stored is None or stored == sequence_number
+
+    def send_time(self, sequence_number: int) -> float | None:
+        """
+        Method to get the time at which a stored datagram was sent
+
+        :param sequence_number: Sequence number of the datagram
+        :return: Time at which the datagram was sent, ``None`` in case it is not stored
+        """
+        index: int = sequence_number % self.capacity
+        if self._sequence_numbers[index] != sequence_number:
+            return None
+        return self._send_times[index]
+
+    def pop(self, sequence_number: int) -> Any:
+        """
+        Method to remove a datagram, on its acknowledgement or to resend it
+
+        :param sequence_number: Sequence number of the datagram
+        :return: Entry of the datagram, ``None`` in case it is not stored
+        """
+        index: int = sequence_number % self.capacity
+        if self._sequence_numbers[index] != sequence_number:
+            return None
+        entry: Any = self._entries[index]
+        self._sequence_numbers[index] = None
+        self._entries[index] = None
+        self._size -= 1
+        return entry
+
+    def oldest(self) -> float | None:
+        """
+        Method to get the time at which the oldest stored datagram was sent, from which the next expiry follows
+
+        :return: Time at which the oldest datagram was sent, ``None`` in case nothing is stored
+        """
+        if not self._size:
+            return None
+        span: int = SequenceTool.diff(self._newest, self._oldest) + 1
+        if span > self.capacity:
+            self._oldest = SequenceTool.add(self._newest, 1 - self.capacity)
+            span = self.capacity
+        for _ in range(span):
+            index: int = self._oldest % self.capacity
+            stored: int | None = self._sequence_numbers[index]
+            if stored is not None and not SequenceTool.less(self._oldest, stored):
+                # Either the datagram itself, or one left behind which is older still
+                return self._send_times[index]
+            self._oldest = SequenceTool.add(self._oldest, 1)
+        return None
+
+    def expired(self, deadline: float) -> list[int]:
+        """
+        Method to get the sequence numbers of datagrams sent at or before a deadline
+
+        :param deadline: Time at or before which the datagrams were sent
+        :return: List of sequence numbers, oldest first
+        """
+        expired: list[int] = []
+        span: int = SequenceTool.diff(self._newest, self._oldest) + 1
+        if span > self.capacity:
+            self._oldest = SequenceTool.add(self._newest, 1 - self.capacity)
+            span = self.capacity
+        sequence_number: int = self._oldest
+        for _ in range(span):
+            index: int = sequence_number % self.capacity
+            stored: int | None = self._sequence_numbers[index]
+            if stored == sequence_number:
+                if self._send_times[index] > deadline:
+                    break
+                expired.append(sequence_number)
+            elif stored is not None and SequenceTool.less(stored, sequence_number):
+                # Left behind, as the newer sequence numbers of this slot were not stored, so older than any deadline
+                expired.append(stored)
+            elif sequence_number == self._oldest:
+                # Nothing older than this is stored, skip it for the next lookups
+                self._oldest = SequenceTool.add(self._oldest, 1)
+            sequence_number = SequenceTool.add(sequence_number, 1)
+        return expired
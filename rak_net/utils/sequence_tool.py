@@ -0,0 +1,87 @@
+################################################################################
+#                                                                              #
+#  ____           _                                                            #
+# |  _ \ ___   __| |_ __ _   _ _ __ ___                                        #
+# | |_) / _ \ / _` | '__| | | | '_ ` _ \                                       #
+# |  __/ (_) | (_| | |  | |_| | | | | | |                                      #
+# |_|   \___/ \__,_|_|   \__,_|_| |_| |_|                                      #
+#                                                                              #
+# Copyright 2021 Podrum Studios                                                #
+#                                                                              #
+# Permission is hereby granted, free of charge, to any person                  #
+# obtaining a copy of this software and associated documentation               #
+# files (the "Software"), to deal in the Software without restriction,         #
+# including without limitation the rights to use, copy, modify, merge,         #
+# publish, distribute, sublicense, and/or sell copies of the Software,         #
+# and to permit persons to whom the Software is furnished to do so,            #
+# subject to the following conditions:                                         #
+#                                                                              #
+# The above copyright notice and this permission notice shall be included      #
+# in all copies or substantial portions of the Software.                       #
+#                                                                              #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR   #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,     #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE  #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER       #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING      #
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS #
+# IN THE SOFTWARE.                                                             #
+#                                                                              #
+################################################################################
+
+
+from __future__ import annotations
+
+
+class SequenceTool:
+    """
+    Sequence Tool for serial-number arithmetic on 24-bit sequence numbers and frame indices,
+    which wrap around after ``0xFFFFFF``. Two numbers are compared by their distance modulo ``2 ** 24``,
+    so the comparisons hold as long as the numbers compared are less than ``2 ** 23`` apart.
+    """
+
+    MASK: int = 0xFFFFFF
+    """Mask of a 24-bit number"""
+    HALF: int = 0x800000
+    """Half of the 24-bit number space, the largest distance that can be compared"""
+
+    @staticmethod
+    def add(number: int, delta: int) -> int:
+        """
+        Function to add to a 24-bit number
+        :param number: 24-bit number
+        :param delta: Number to be added, may be negative
+        :return: Sum wrapped around to 24 bits
+        """
+        return (number + delta) & 0xFFFFFF
+
+    @staticmethod
+    def diff(number: int, other: int) -> int:
+        """
+        Function to get the signed distance between two 24-bit numbers
+        :param number: 24-bit number
+        :param other: 24-bit number to be subtracted
+        :return: Distance from `other` to `number`, between ``-2 ** 23`` and ``2 ** 23 - 1``
+        """
+        return ((number - other + 0x800000) & 0xFFFFFF) - 0x800000
+
+    @staticmethod
+    def less(number: int, other: int) -> bool:
+        """
+        Function to check if a 24-bit number precedes another
+        :param number: 24-bit number
+        :param other: 24-bit number to be compared with
+        :return: Boolean depicting whether `number` comes before `other`
+        """
+        return ((number - other) & 0xFFFFFF) >= 0x800000
+
+    @staticmethod
+    def in_window(number: int, start: int, size: int) -> bool:
+        """
+        Function to check if a 24-bit number lies in a window
+        :param number: 24-bit number
+        :param start: First number of the window
+        :param size: Size of the window
+        :return: Boolean depicting whether `number` lies in ``[start, start + size)``, wrapping around
+        """
+        return ((number - start) & 0xFFFFFF) < size
@@ -0,0 +1,159 @@
+from __future__ import annotations
+from typing import Any, Callable
+from math import ceil
+
+__all__ = 'Timer', 'TimerWheel'
+
+
+class Timer:
+    """
+    Timer scheduled on a :class:`TimerWheel`
+
+    :param tick: Wheel-tick on which the timer expires
+    :param callback: Callback of the timer
+    :param args: Arguments for the callback
+    """
+
+    __slots__ = 'tick', 'callback', 'args', 'cancelled', '_wheel'
+
+    def __init__(self, tick: int, callback: Callable, args: tuple, wheel: TimerWheel = None):
+        self.tick: int = tick
+        """Wheel-tick on which the timer expires"""
+        self.callback: Callable = callback
+        """Callback of the timer"""
+        self.args: tuple = args
+        """Arguments for the callback"""
+        self.cancelled: bool = False
+        """Whether the timer has been cancelled"""
+        self._wheel: TimerWheel | None = wheel
+
+    def cancel(self) -> None:
+        """
+        Method to cancel the timer. Cancelled timers are discarded lazily by the wheel.
+        """
+        if not self.cancelled:
+            self.cancelled = True
+            if self._wheel is not None:
+                self._wheel._count -= 1
+                self._wheel = None
+
+    def __repr__(self):
+        return f'<Timer: tick={self.tick} cancelled={self.cancelled}>'
+
+
+class TimerWheel:
+    """
+    Hierarchical timer wheel.
+    Scheduling and cancelling is O(1) and advancing the wheel only touches timers that expire,
+    plus an occasional cascade of a higher level slot into the lower levels.
+
+    :param resolution: Duration (in seconds) of a single wheel-tick
+    :param now: Current time, timers are scheduled relative to it
+    :param slot_bits: Number of bits for slots of a level, each level has ``2 ** slot_bits`` slots. Defaults to 8
+    :param levels: Number of levels of the wheel. Defaults to 4
+    """
+
+    __slots__ = 'resolution', '_start', '_tick', '_bits', '_mask', '_levels', '_range', '_count'
+
+    def __init__(self, resolution: float, now: float, *, slot_bits: int = 8, levels: int = 4):
+        self.resolution: float = resolution
+        """Duration (in seconds) of a single wheel-tick"""
+        self._start: float = now
+        self._tick: int = 0
+        self._bits: int = slot_bits
+        self._mask: int = (1 << slot_bits) - 1
+        self._levels: list[list[list[Timer]]] = [[[] for _ in range(1 << slot_bits)] for _ in range(levels)]
+        self._range: int = 1 << (slot_bits * levels)
+        self._count: int = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def now(self) -> float:
+        """Time up to which the wheel has been advanced"""
+        return self._start + self._tick * self.resolution
+
+    def _place(self, timer: Timer) -> None:
+        tick: int = timer.tick
+        delta: int = tick - self._tick
+        if delta <= 0:
+            # Cascaded onto the current tick, whose slot is expired right after the cascade
+            self._levels[0][self._tick & self._mask].append(timer)
+            return
+        if delta >= self._range:
+            tick = self._tick + self._range - 1
+            delta = self._range - 1
+        level: int = 0
+        bits: int = self._bits
+        while delta >> (bits * (level + 1)):
+            level += 1
+        self._levels[level][(tick >> (bits * level)) & self._mask].append(timer)
+
+    def schedule(self, delay: float, callback: Callable, *args: Any) -> Timer:
+        """
+        Method to schedule a callback after a delay
+
+        :param delay: Delay (in seconds) after which the timer expires, rounded up to the wheel resolution
+        :param callback: Callback of the timer
+        :param args: Arguments for the callback
+        :return: The scheduled :class:`Timer`
+        """
+        timer: Timer = Timer(self._tick + max(1, ceil(delay / self.resolution)), callback, args, self)
+        self._place(timer)
+        self._count += 1
+        return timer
+
+    def _cascade(self, level: int) -> None:
+        index: int = (self._tick >> (self._bits * level)) & self._mask
+        slot: list[Timer] = self._levels[level][index]
+        if slot:
+            self._levels[level][index] = []
+            for timer in slot:
+                if not timer.cancelled:
+                    self._place(timer)
+
+    def advance(self, now: float) -> list[Timer]:
+        """
+        Method to advance the wheel up to a time
+
+        :param now: Current time
+        :return: List of expired timers in order of expiry, expired timers are not kept by the wheel
+        """
+        target: int = int((now - self._start) / self.resolution)
+        expired: list[Timer] = []
+        if target <= self._tick:
+            return expired
+        if not self._count:
+            self._tick = target
+            return expired
+        bits: int = self._bits
+        mask: int = self._mask
+        wheel: list[list[Timer]] = self._levels[0]
+        while self._tick < target:
+            self._tick += 1
+            tick: int = self._tick
+            if not tick & mask:
+                level: int = 1
+                while level < len(self._levels):
+                    self._cascade(level)
+                    if (tick >> (bits * level)) & mask:
+                        break
+                    level += 1
+            slot: list[Timer] = wheel[tick & mask]
+            if slot:
+                wheel[tick & mask] = []
+                for timer in slot:
+                    if not timer.cancelled:
+                        if timer.tick > tick:
+                            # Clamped timer which was beyond the range of the wheel
+                            self._place(timer)
+                            continue
+                        timer._wheel = None
+                        timer.cancelled = True
+                        self._count -= 1
+                        expired.append(timer)
+                if not self._count:
+                    self._tick = target
+                    break
+        return expired